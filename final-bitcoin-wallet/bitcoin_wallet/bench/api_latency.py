@@ -0,0 +1,206 @@
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass
+
+import httpx
+import typer
+from fastapi import APIRouter, FastAPI
+
+from bitcoin_wallet.bench.seeding import Population, seed_population
+from bitcoin_wallet.core.currencyconverter.price_feed import (
+    PriceSnapshot,
+    SnapshotConverter,
+)
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.executor import DatabaseExecutor
+from bitcoin_wallet.core.database.schema import SchemaBootstrapper
+from bitcoin_wallet.core.money.satoshi import btc_to_satoshi
+from bitcoin_wallet.core.repository.async_repository import (
+    AsyncTransactionRepository,
+    AsyncUserRepository,
+    AsyncWalletRepository,
+)
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.repository.user_repository import BtcUserRepository
+from bitcoin_wallet.core.repository.wallet_repository import BtcWalletRepository
+from bitcoin_wallet.infra.fastapi.api.api import api
+
+
+@dataclass
+class LatencyResult:
+    variant: str
+    requests: int
+    p50_ms: float
+    p99_ms: float
+    requests_per_second: float
+
+
+class SlowUpstreamConverter:
+    # Stands in for the blocking Bitfinex call the sync handlers used to make.
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    def convert_btc_to_usd(self) -> float:
+        time.sleep(self.latency)
+        return 50_000.0
+
+
+def sync_app(pool: ConnectionPool, upstream_latency: float) -> FastAPI:
+    # The pre-async shape: sync handlers on Starlette's thread pool calling
+    # blocking repositories and a blocking price lookup.
+    router = APIRouter()
+    wallets = BtcWalletRepository(
+        pool=pool, converter=SlowUpstreamConverter(upstream_latency)
+    )
+    transactions = BtcTransactionRepository(pool=pool)
+    users = BtcUserRepository(pool=pool)
+
+    @router.get("/wallets/{address}")
+    def get_wallet_info(user_id: int, address: int) -> dict[str, object]:
+        owner = users.load_auth_context(user_id)
+        wallet = wallets.retrieve_wallet_info(owner, address)
+        return {"wallet_id": wallet.wallet_id if wallet else None}
+
+    @router.post("/transactions", status_code=201)
+    def make_transaction(
+        from_wallet_id: int, to_wallet_id: int, amount_transferred: float, user_id: int
+    ) -> dict[str, int | None]:
+        transactions.authorize_transaction(from_wallet_id, user_id)
+        return {
+            "transaction_id": transactions.make_transaction(
+                from_wallet_id, to_wallet_id, btc_to_satoshi(amount_transferred)
+            )
+        }
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+def async_app(pool: ConnectionPool, executor: DatabaseExecutor) -> FastAPI:
+    snapshot = PriceSnapshot()
+    snapshot.publish(50_000.0)
+    converter = SnapshotConverter(snapshot, max_staleness=3600.0)
+
+    app = FastAPI()
+    app.include_router(api)
+    app.state.users = AsyncUserRepository(BtcUserRepository(pool=pool), executor)
+    app.state.wallets = AsyncWalletRepository(
+        BtcWalletRepository(pool=pool, converter=converter), executor, converter
+    )
+    app.state.transactions = AsyncTransactionRepository(
+        BtcTransactionRepository(pool=pool), executor
+    )
+    return app
+
+
+async def load(
+    app: FastAPI,
+    owned: list[tuple[int, int]],
+    clients: int,
+    requests_per_client: int,
+) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    limits = httpx.Limits(max_connections=None)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", limits=limits
+    ) as client:
+
+        async def run_client(seed: int) -> None:
+            rng = random.Random(seed)
+            for _ in range(requests_per_client):
+                user_id, wallet_id = rng.choice(owned)
+                started = time.perf_counter()
+                if rng.random() < 0.8:
+                    await client.get(
+                        f"/wallets/{wallet_id}", params={"user_id": user_id}
+                    )
+                else:
+                    await client.post(
+                        "/transactions",
+                        params=_transfer(rng, user_id, wallet_id, len(owned)),
+                    )
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_client(seed) for seed in range(clients)))
+        return latencies, time.perf_counter() - started
+
+
+def summarize(variant: str, latencies: list[float], elapsed: float) -> LatencyResult:
+    percentiles = statistics.quantiles(latencies, n=100)
+    return LatencyResult(
+        variant=variant,
+        requests=len(latencies),
+        p50_ms=percentiles[49] * 1000,
+        p99_ms=percentiles[98] * 1000,
+        requests_per_second=len(latencies) / elapsed,
+    )
+
+
+def main(
+    clients: int = 1000,
+    requests_per_client: int = 5,
+    users: int = 1000,
+    upstream_latency_ms: float = 50.0,
+) -> None:
+    results: list[LatencyResult] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for variant in ("sync", "async"):
+            pool = ConnectionPool(
+                os.path.join(tmp_dir, f"{variant}.db"),
+                max_size=8,
+                timeout=60.0,
+                pragmas={"journal_mode": "wal", "synchronous": "normal"},
+            )
+            SchemaBootstrapper(pool).create()
+            with pool.connection() as conn:
+                seed_population(conn, Population(users, 0))
+                owned = conn.execute(
+                    "SELECT user_id, wallet_id FROM user_wallets"
+                ).fetchall()
+
+            executor = DatabaseExecutor(readers=pool.max_size - 1)
+            app = (
+                sync_app(pool, upstream_latency_ms / 1000)
+                if variant == "sync"
+                else async_app(pool, executor)
+            )
+            latencies, elapsed = asyncio.run(
+                load(app, owned, clients, requests_per_client)
+            )
+            results.append(summarize(variant, latencies, elapsed))
+            executor.shutdown()
+            pool.close()
+
+    for result in results:
+        typer.echo(
+            f"{result.variant:<6} requests={result.requests:<6} "
+            f"p50={result.p50_ms:>9.1f} ms  p99={result.p99_ms:>9.1f} ms  "
+            f"{result.requests_per_second:>8.1f} req/s"
+        )
+
+
+def _transfer(
+    rng: random.Random, user_id: int, wallet_id: int, wallets: int
+) -> dict[str, float]:
+    # Seeded wallet ids run from 1 to the wallet count.
+    to_wallet_id = rng.randrange(1, wallets)
+    return {
+        "from_wallet_id": wallet_id,
+        "to_wallet_id": to_wallet_id + (to_wallet_id >= wallet_id),
+        "amount_transferred": 0.0001,
+        "user_id": user_id,
+    }
+
+
+if __name__ == "__main__":
+    typer.run(main)
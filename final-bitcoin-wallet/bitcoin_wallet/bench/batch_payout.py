@@ -0,0 +1,55 @@
+import os
+import tempfile
+import time
+
+import typer
+
+from bitcoin_wallet.bench.transfer_throughput import (
+    INITIAL_BALANCE,
+    TRANSFER_AMOUNT,
+    create_database,
+)
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.transfer.batch_transfer import BatchMode, TransferLeg
+from bitcoin_wallet.core.transfer.reconciliation import LedgerReconciler
+
+PRAGMAS: dict[str, str | int] = {"journal_mode": "wal", "synchronous": "normal"}
+
+
+def main(recipients: int = 5000) -> None:
+    # The payer needs enough balance for every leg of the payout.
+    amount = min(TRANSFER_AMOUNT, INITIAL_BALANCE // recipients)
+    legs = [TransferLeg(wallet_id, amount) for wallet_id in range(2, recipients + 2)]
+
+    runs: dict[str, BatchMode | None] = {"one_by_one": None}
+    runs.update((mode.value, mode) for mode in BatchMode)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, mode in runs.items():
+            db_path = os.path.join(tmp_dir, f"{name}.db")
+            create_database(db_path, recipients + 1)
+            pool = ConnectionPool(db_path, max_size=1, pragmas=PRAGMAS)
+            repository = BtcTransactionRepository(pool=pool)
+
+            started = time.perf_counter()
+            if mode is not None:
+                repository.make_batch_transaction(1, legs, mode)
+            else:
+                for leg in legs:
+                    repository.make_transaction(1, leg.to_wallet_id, amount)
+            elapsed = time.perf_counter() - started
+
+            balanced = LedgerReconciler(pool).reconcile().balanced
+            pool.close()
+            typer.echo(
+                f"{name:<16} "
+                f"{recipients} legs in {elapsed * 1000:>9.1f} ms  "
+                f"{recipients / elapsed:>10.0f} legs/s  balanced={balanced}"
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
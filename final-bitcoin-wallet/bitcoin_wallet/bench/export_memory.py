@@ -0,0 +1,69 @@
+import json
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import typer
+
+from bitcoin_wallet.bench.seeding import Population, seed_population
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.schema import SchemaBootstrapper
+from bitcoin_wallet.core.export.ledger_export import ExportFormat, export_transactions
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.infra.fastapi.response.formatting import transaction_response
+
+MODES = ("list", "ndjson", "csv")
+
+
+def export(
+    db_path: str, wallet_id: int, mode: str, batch_size: int
+) -> tuple[float, float]:
+    # Runs in a fresh process so its peak RSS belongs to this export alone.
+    repository = BtcTransactionRepository(pool=ConnectionPool(db_path, max_size=1))
+    started = time.perf_counter()
+    with open(os.devnull, "w") as sink:
+        if mode == "list":
+            # What an export built on get_wallet_transactions has to do.
+            history = repository.get_wallet_transactions(wallet_id)
+            sink.write(json.dumps([transaction_response(tx) for tx in history]))
+        else:
+            batches = repository.iter_wallet_transactions(wallet_id, batch_size)
+            sink.writelines(export_transactions(batches, ExportFormat(mode)))
+    elapsed = time.perf_counter() - started
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(transactions: int = 5_000_000, users: int = 2, batch_size: int = 1000) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "export.db")
+        pool = ConnectionPool(db_path, max_size=1)
+        SchemaBootstrapper(pool).create()
+        with pool.connection() as conn:
+            # Few users, so the busiest wallet's history is most of the ledger.
+            seed_population(conn, Population(users, transactions))
+            wallet_id, history = conn.execute(
+                "SELECT wallet_id, COUNT(*) FROM ("
+                "SELECT from_wallet_id AS wallet_id FROM transactions "
+                "UNION ALL SELECT to_wallet_id FROM transactions) "
+                "GROUP BY wallet_id ORDER BY 2 DESC LIMIT 1"
+            ).fetchone()
+        pool.close()
+        typer.echo(f"exporting {history} transactions of wallet {wallet_id}")
+
+        for mode in MODES:
+            with ProcessPoolExecutor(max_workers=1) as process:
+                elapsed, peak_mib = process.submit(
+                    export, db_path, wallet_id, mode, batch_size
+                ).result()
+            typer.echo(
+                f"{mode:<7} peak rss={peak_mib:>8.1f} MiB  time={elapsed:>6.1f} s  "
+                f"{history / elapsed:>10.0f} rows/s"
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,79 @@
+import os
+import tempfile
+
+import typer
+
+from bitcoin_wallet.bench.transfer_throughput import (
+    ThroughputResult,
+    Transfer,
+    create_database,
+    engine_transfer,
+    measure,
+)
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.transfer.group_commit import GroupCommitWriter
+
+PRAGMAS: dict[str, str | int] = {"journal_mode": "wal", "synchronous": "normal"}
+
+
+def writer_transfer(writer: GroupCommitWriter) -> Transfer:
+    def transfer(from_wallet_id: int, to_wallet_id: int, amount: int) -> None:
+        writer.submit(from_wallet_id, to_wallet_id, amount).result()
+
+    return transfer
+
+
+def main(
+    transfers: int = 5000,
+    wallets: int = 100,
+    threads: int = 64,
+    batch_sizes: str = "1,8,32,128",
+    linger_ms: float = 2.0,
+) -> None:
+    rows: list[tuple[ThroughputResult, str]] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine_db = os.path.join(tmp_dir, "engine.db")
+        create_database(engine_db, wallets)
+        pool = ConnectionPool(engine_db, max_size=threads, timeout=60, pragmas=PRAGMAS)
+        repository = BtcTransactionRepository(pool=pool)
+        result = measure(
+            "engine", engine_db, engine_transfer(repository), transfers, threads
+        )
+        rows.append((result, "one transaction per transfer"))
+        pool.close()
+
+        for batch_size in (int(size) for size in batch_sizes.split(",")):
+            db_path = os.path.join(tmp_dir, f"group-{batch_size}.db")
+            create_database(db_path, wallets)
+            pool = ConnectionPool(db_path, max_size=1, pragmas=PRAGMAS)
+            writer = GroupCommitWriter(
+                pool, batch_size=batch_size, linger=linger_ms / 1000
+            )
+            writer.start()
+            result = measure(
+                f"group-{batch_size}",
+                db_path,
+                writer_transfer(writer),
+                transfers,
+                threads,
+            )
+            writer.stop()
+            metrics = writer.metrics()
+            rows.append(
+                (result, f"avg batch {metrics.transfers / max(metrics.batches, 1):.1f}")
+            )
+            pool.close()
+
+    for result, note in rows:
+        typer.echo(
+            f"{result.implementation:<10} threads={result.threads:<3} "
+            f"{result.transfers_per_second:>10.1f} transfers/s  "
+            f"errors={result.errors:<5} conserved={result.conserved}  {note}"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
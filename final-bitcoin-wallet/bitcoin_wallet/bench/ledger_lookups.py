@@ -0,0 +1,107 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from typing import Callable
+
+import typer
+
+from bitcoin_wallet.bench.seeding import Population, drop_indexes, seed_population
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.schema import SchemaBootstrapper
+from bitcoin_wallet.core.entity.user import BtcUser
+from bitcoin_wallet.core.exception.mail_already_present import (
+    MailAlreadyPresentException,
+)
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.repository.user_repository import BtcUserRepository
+
+# The statements the repositories issued before the index set existed.
+LEGACY_WALLET_TRANSACTIONS = (
+    "SELECT id, from_wallet_id, to_wallet_id, amount_transferred, lost_amount "
+    "FROM transactions WHERE from_wallet_id = ? OR to_wallet_id = ?"
+)
+LEGACY_MAIL_CHECK = "SELECT * FROM users WHERE mail = ?"
+
+
+def timed(operation: Callable[[int], object], keys: list[int]) -> float:
+    started = time.perf_counter()
+    for key in keys:
+        operation(key)
+    return (time.perf_counter() - started) / len(keys) * 1000
+
+
+def report(name: str, before_ms: float, after_ms: float) -> None:
+    typer.echo(
+        f"{name:<24} before={before_ms:>10.3f} ms  after={after_ms:>8.3f} ms  "
+        f"speedup={before_ms / max(after_ms, 1e-9):>9.1f}x"
+    )
+
+
+def main(
+    transactions: int = 10_000_000,
+    users: int = 100_000,
+    lookups: int = 20,
+) -> None:
+    rng = random.Random(7)
+    keys = [rng.randrange(1, users + 1) for _ in range(lookups)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pool = ConnectionPool(os.path.join(tmp_dir, "ledger.db"), max_size=2)
+        schema = SchemaBootstrapper(pool)
+        schema.create()
+
+        started = time.perf_counter()
+        with pool.connection() as conn:
+            drop_indexes(conn)
+            seed_population(conn, Population(users, transactions))
+        typer.echo(f"seeded {transactions} transfers in {_since(started):.1f} s")
+
+        with pool.connection() as conn:
+            before_history = timed(
+                lambda w: conn.execute(LEGACY_WALLET_TRANSACTIONS, (w, w)).fetchall(),
+                keys,
+            )
+            before_mail = timed(
+                lambda u: _legacy_mail_check(conn, f"user{u}@bench.io"), keys
+            )
+
+        started = time.perf_counter()
+        schema.create()
+        typer.echo(f"built indexes in {_since(started):.1f} s")
+
+        transaction_repository = BtcTransactionRepository(pool=pool)
+        user_repository = BtcUserRepository(pool=pool)
+        report(
+            "wallet transactions",
+            before_history,
+            timed(transaction_repository.get_wallet_transactions, keys),
+        )
+        report(
+            "create user (duplicate)",
+            before_mail,
+            timed(lambda u: _create_duplicate(user_repository, u), keys),
+        )
+        pool.close()
+
+
+def _legacy_mail_check(conn: sqlite3.Connection, mail: str) -> None:
+    conn.execute(LEGACY_MAIL_CHECK, (mail,)).fetchone()
+
+
+def _create_duplicate(repository: BtcUserRepository, user_id: int) -> None:
+    try:
+        repository.create(BtcUser(0, f"user{user_id}@bench.io"))
+    except MailAlreadyPresentException:
+        pass
+
+
+def _since(started: float) -> float:
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,195 @@
+import math
+import random
+import sqlite3
+import time
+from dataclasses import dataclass
+from itertools import chain, repeat
+from operator import add, floordiv, mod, mul, ne, rshift
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.schema import SchemaBootstrapper
+from bitcoin_wallet.core.money.satoshi import transfer_fee
+from bitcoin_wallet.core.statistics.platform_statistics import rebuild_statistics
+
+LEDGER_INDEXES = (
+    "idx_transactions_from_wallet",
+    "idx_transactions_to_wallet",
+    "idx_wallets_user",
+    "idx_users_mail",
+)
+
+WALLETS_PER_USER = (1, 2, 3)
+WALLETS_PER_USER_WEIGHTS = (60, 30, 10)
+DAY = 86_400
+MIN_AMOUNT = 1_000
+MAX_AMOUNT = SATOSHIS_PER_BTC // 2
+AMOUNT_LEVELS = 1 << 16
+MIN_MINTED = SATOSHIS_PER_BTC // 100
+MAX_MINTED = 10 * SATOSHIS_PER_BTC
+SCATTER = 2_147_483_647
+
+
+@dataclass(frozen=True)
+class Population:
+    users: int
+    transactions: int
+    seed: int = 42
+    days: int = 30
+
+
+def drop_indexes(conn: sqlite3.Connection) -> None:
+    for index in LEDGER_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+def seed_database(
+    pool: ConnectionPool, population: Population, now: int | None = None
+) -> None:
+    # Building the secondary indexes once at the end is far cheaper than
+    # maintaining them through millions of inserts.
+    with pool.connection() as conn:
+        drop_indexes(conn)
+        seed_population(conn, population, now)
+    SchemaBootstrapper(pool).create()
+
+
+def seed_population(
+    conn: sqlite3.Connection,
+    population: Population,
+    now: int | None = None,
+    batch_size: int = 200_000,
+) -> None:
+    # Users own one to three wallets and a few wallets carry most of the
+    # traffic. Each wallet is minted enough to cover everything it sends, so
+    # the ledger is valid in any order and whole columns can be drawn at once;
+    # balances, fees and statistics are then derived from the rows written.
+    rng = random.Random(population.seed)
+    owners = [
+        user_id
+        for user_id, wallets in enumerate(
+            rng.choices(WALLETS_PER_USER, WALLETS_PER_USER_WEIGHTS, k=population.users),
+            start=1,
+        )
+        for _ in range(wallets)
+    ]
+    wallet_count = len(owners)
+    # Index 0 is unused so wallet ids index these lists directly.
+    owners.insert(0, 0)
+    base = [0] + _uniform(rng, wallet_count, MIN_MINTED, MAX_MINTED)
+    sent = [0] * (wallet_count + 1)
+    received = [0] * (wallet_count + 1)
+    activity = _activity_table(wallet_count)
+    amounts = _amount_table()
+    fee_table = list(map(transfer_fee, amounts))
+    end = int(time.time()) if now is None else now
+    span = population.days * DAY
+    start = end - span
+
+    conn.execute("PRAGMA synchronous = OFF")
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (id, mail) VALUES (?, ?)",
+            ((i, f"user{i}@bench.io") for i in range(1, population.users + 1)),
+        )
+
+    for first in range(0, population.transactions, batch_size):
+        count = min(batch_size, population.transactions - first)
+        senders = activity.draw(rng, count)
+        receivers = [
+            receiver if receiver != sender else sender % wallet_count + 1
+            for sender, receiver in zip(senders, activity.draw(rng, count))
+        ]
+        levels = memoryview(rng.randbytes(2 * count)).cast("H")
+        amounts_transferred = list(map(amounts.__getitem__, levels))
+        # Transfers between a user's own wallets are free, as in TransferEngine.
+        fees = list(
+            map(
+                mul,
+                map(fee_table.__getitem__, levels),
+                map(
+                    ne,
+                    map(owners.__getitem__, senders),
+                    map(owners.__getitem__, receivers),
+                ),
+            )
+        )
+        for sender, receiver, amount, fee in zip(
+            senders, receivers, amounts_transferred, fees
+        ):
+            sent[sender] += amount
+            received[receiver] += amount - fee
+        # Spread evenly over the window: start + i * span // transactions.
+        created_at = map(
+            floordiv,
+            range(
+                start * population.transactions + first * span,
+                start * population.transactions + (first + count) * span,
+                span,
+            ),
+            repeat(population.transactions),
+        )
+        with conn:
+            conn.executemany(
+                "INSERT INTO transactions (from_wallet_id, to_wallet_id, "
+                "amount_transferred, lost_amount, created_at) VALUES (?, ?, ?, ?, ?)",
+                zip(senders, receivers, amounts_transferred, fees, created_at),
+            )
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO wallets (id, user_id, balance, minted) VALUES (?, ?, ?, ?)",
+            (
+                (i, owners[i], base[i] + received[i], base[i] + sent[i])
+                for i in range(1, wallet_count + 1)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO user_wallets (user_id, wallet_id) VALUES (?, ?)",
+            ((owners[i], i) for i in range(1, wallet_count + 1)),
+        )
+        rebuild_statistics(conn)
+
+
+@dataclass(frozen=True)
+class _SamplingTable:
+    # Wallet ids repeated in proportion to their weight; a draw is a table
+    # lookup on random bits, so a whole batch is sampled without a Python loop.
+    slots: list[int]
+    shift: int
+
+    def draw(self, rng: random.Random, count: int) -> list[int]:
+        bits = memoryview(rng.randbytes(4 * count)).cast("I")
+        return list(map(self.slots.__getitem__, map(rshift, bits, repeat(self.shift))))
+
+
+def _activity_table(wallet_count: int) -> _SamplingTable:
+    # Zipf-like weights over scattered wallets; every wallet keeps at least
+    # one slot so cold wallets still see the occasional transfer.
+    size_bits = max(16, (2 * wallet_count).bit_length())
+    size = 1 << size_bits
+    weights = [1 / rank**0.8 for rank in range(1, wallet_count + 1)]
+    scale = (size - wallet_count) / sum(weights)
+    counts = [1 + int(weight * scale) for weight in weights]
+    counts[0] += size - sum(counts)
+    # Scatter the busiest ranks over the id space; SCATTER is a prime larger
+    # than any wallet count, so this is a permutation.
+    wallets = map(
+        add,
+        map(mod, range(0, wallet_count * SCATTER, SCATTER), repeat(wallet_count)),
+        repeat(1),
+    )
+    slots = list(chain.from_iterable(map(repeat, wallets, counts)))
+    return _SamplingTable(slots, 32 - size_bits)
+
+
+def _uniform(rng: random.Random, count: int, low: int, high: int) -> list[int]:
+    bits = memoryview(rng.randbytes(4 * count)).cast("I")
+    spread = map(rshift, map(mul, bits, repeat(high - low)), repeat(32))
+    return list(map(add, spread, repeat(low)))
+
+
+def _amount_table() -> list[int]:
+    # Log-uniform between MIN_AMOUNT and MAX_AMOUNT, indexed by 16 random bits.
+    ratio = math.log(MAX_AMOUNT / MIN_AMOUNT) / AMOUNT_LEVELS
+    return [int(MIN_AMOUNT * math.exp(level * ratio)) for level in range(AMOUNT_LEVELS)]
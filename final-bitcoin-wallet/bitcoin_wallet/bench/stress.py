@@ -0,0 +1,284 @@
+import multiprocessing
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+
+import httpx
+from fastapi.testclient import TestClient
+
+from bitcoin_wallet.bench.suite import bench_app
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.schema import SchemaBootstrapper
+from bitcoin_wallet.core.statistics.platform_statistics import LEDGER_TOTALS
+from bitcoin_wallet.core.transfer.reconciliation import LedgerReconciler
+
+LOCKED = "locked"
+# Attempts per transfer when the connection drops, e.g. while a worker recycles.
+ATTEMPTS = 5
+# Amounts go up to twice the average starting balance, so overdrafts are tried
+# all the time and the balance guard is exercised under contention.
+MAX_AMOUNT_FACTOR = 2
+
+
+@dataclass(frozen=True)
+class StressConfig:
+    wallets: int = 20
+    requests: int = 2000
+    threads: int = 8
+    processes: int = 2
+    seed: int = 42
+    url: str | None = None
+
+
+@dataclass
+class WorkerResult:
+    statuses: Counter[int] = field(default_factory=Counter)
+    locked: int = 0
+    transport_errors: int = 0
+    unresolved: int = 0
+    transaction_ids: list[int] = field(default_factory=list)
+
+    def merge(self, other: "WorkerResult") -> None:
+        self.statuses.update(other.statuses)
+        self.locked += other.locked
+        self.transport_errors += other.transport_errors
+        self.unresolved += other.unresolved
+        self.transaction_ids.extend(other.transaction_ids)
+
+
+@dataclass(frozen=True)
+class StressReport:
+    config: StressConfig
+    elapsed: float
+    result: WorkerResult
+    violations: list[str]
+
+    @property
+    def requests_per_second(self) -> float:
+        return sum(self.result.statuses.values()) / self.elapsed
+
+    @property
+    def transfers_per_second(self) -> float:
+        return len(self.result.transaction_ids) / self.elapsed
+
+
+@dataclass(frozen=True)
+class _Wallet:
+    wallet_id: int
+    user_id: int
+
+
+def run_stress(config: StressConfig, db_path: str) -> StressReport:
+    pool = ConnectionPool.from_settings(DatabaseSettings(db_path=db_path))
+    try:
+        prepare_database(pool, config)
+        with pool.connection() as conn:
+            baseline = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM transactions"
+            ).fetchone()[0]
+    finally:
+        pool.close()
+
+    shares = _split(config.requests, config.processes)
+    # Idempotency keys are unique per run, so a database can be stressed again.
+    run = uuid.uuid4().hex
+    started = time.perf_counter()
+    if config.processes == 1:
+        results = [run_worker(config, db_path, run, 0, shares[0])]
+    else:
+        # Spawned, not forked: every worker builds its own pool, writer and
+        # executor, like separate server processes sharing one file.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(config.processes, mp_context=context) as executor:
+            results = list(
+                executor.map(
+                    run_worker,
+                    [config] * config.processes,
+                    [db_path] * config.processes,
+                    [run] * config.processes,
+                    range(config.processes),
+                    shares,
+                )
+            )
+    elapsed = time.perf_counter() - started
+
+    total = WorkerResult()
+    for result in results:
+        total.merge(result)
+    return StressReport(
+        config, elapsed, total, check_invariants(db_path, baseline, total)
+    )
+
+
+def prepare_database(pool: ConnectionPool, config: StressConfig) -> None:
+    # An existing ledger (from `seed`, or a copy of production) is stressed as
+    # it is; an empty one gets a small set of wallets so transfers collide.
+    SchemaBootstrapper(pool).create()
+    with pool.connection() as conn:
+        if conn.execute("SELECT 1 FROM wallets LIMIT 1").fetchone() is not None:
+            return
+        rng = random.Random(config.seed)
+        users = max(1, config.wallets // 2)
+        conn.executemany(
+            "INSERT INTO users (id, mail) VALUES (?, ?)",
+            [(i, f"stress{i}@bench.io") for i in range(1, users + 1)],
+        )
+        balances = [
+            rng.randrange(SATOSHIS_PER_BTC // 10, SATOSHIS_PER_BTC)
+            for _ in range(config.wallets)
+        ]
+        conn.executemany(
+            "INSERT INTO wallets (id, user_id, balance, minted) VALUES (?, ?, ?, ?)",
+            [
+                (i, i % users + 1, balance, balance)
+                for i, balance in enumerate(balances, start=1)
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO user_wallets (user_id, wallet_id) VALUES (?, ?)",
+            [(i % users + 1, i) for i in range(1, config.wallets + 1)],
+        )
+
+
+def run_worker(
+    config: StressConfig, db_path: str, run: str, worker: int, requests: int
+) -> WorkerResult:
+    pool = ConnectionPool(db_path, max_size=1)
+    with pool.connection() as conn:
+        wallets = [
+            _Wallet(wallet_id, user_id)
+            for wallet_id, user_id in conn.execute(
+                "SELECT id, user_id FROM wallets ORDER BY id LIMIT ?",
+                (max(config.wallets, 2),),
+            )
+        ]
+        average = conn.execute(
+            "SELECT AVG(balance) FROM wallets WHERE id <= ?", (wallets[-1].wallet_id,)
+        ).fetchone()[0]
+    pool.close()
+    max_amount = max(1, int(average * MAX_AMOUNT_FACTOR))
+    result = WorkerResult()
+    lock = threading.Lock()
+
+    with ExitStack() as stack:
+        if config.url is None:
+            client: httpx.Client = stack.enter_context(TestClient(bench_app(db_path)))
+        else:
+            client = stack.enter_context(httpx.Client(base_url=config.url))
+
+        def hammer(thread: int, count: int) -> None:
+            rng = random.Random(f"{config.seed}-{worker}-{thread}")
+            local = WorkerResult()
+            for request in range(count):
+                sender, receiver = rng.sample(wallets, 2)
+                amount = rng.randrange(1, max_amount)
+                key = f"{run}-{worker}-{thread}-{request}"
+                _post_transfer(client, local, key, sender, receiver, amount)
+            with lock:
+                result.merge(local)
+
+        shares = _split(requests, config.threads)
+        with ThreadPoolExecutor(config.threads) as executor:
+            list(executor.map(hammer, range(config.threads), shares))
+    return result
+
+
+def check_invariants(db_path: str, baseline: int, result: WorkerResult) -> list[str]:
+    violations: list[str] = []
+    pool = ConnectionPool(db_path, max_size=1)
+    reconciler = LedgerReconciler(pool)
+    try:
+        with pool.connection() as conn:
+            negative = conn.execute(
+                "SELECT id, balance FROM wallets WHERE balance < 0 ORDER BY id"
+            ).fetchall()
+            written = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT id FROM transactions WHERE id > ?", (baseline,)
+                )
+            }
+            totals = conn.execute(
+                "SELECT transactions, fees, volume FROM platform_statistics"
+            ).fetchone()
+            ledger = conn.execute(LEDGER_TOTALS).fetchone()
+        reconciliation = reconciler.reconcile()
+        drifted = reconciler.drifted_wallets()
+    finally:
+        pool.close()
+
+    for wallet_id, balance in negative:
+        violations.append(f"wallet {wallet_id} has a negative balance of {balance}")
+    if not reconciliation.balanced:
+        drift = reconciliation.balances + reconciliation.fees - reconciliation.minted
+        violations.append(f"balances plus fees differ from minted by {drift}")
+    for wallet in drifted:
+        violations.append(
+            f"wallet {wallet.wallet_id} holds {wallet.balance}, "
+            f"its ledger says {wallet.expected}"
+        )
+    acknowledged = set(result.transaction_ids)
+    if len(acknowledged) != len(result.transaction_ids):
+        violations.append("one transaction id was acknowledged twice")
+    if acknowledged - written:
+        violations.append(
+            f"{len(acknowledged - written)} acknowledged transfer(s) missing "
+            f"from the ledger"
+        )
+    if len(written - acknowledged) > result.unresolved:
+        violations.append(
+            f"{len(written - acknowledged)} ledger row(s) no client was told about"
+        )
+    if tuple(totals) != tuple(ledger):
+        violations.append(
+            f"platform statistics {tuple(totals)} disagree with the ledger "
+            f"{tuple(ledger)}"
+        )
+    return violations
+
+
+def _post_transfer(
+    client: httpx.Client,
+    result: WorkerResult,
+    key: str,
+    sender: _Wallet,
+    receiver: _Wallet,
+    amount: int,
+) -> None:
+    # A dropped connection leaves the outcome unknown; retrying under the same
+    # Idempotency-Key either commits the transfer or replays the commit.
+    for attempt in range(ATTEMPTS):
+        try:
+            response = client.post(
+                "/transactions",
+                params={
+                    "from_wallet_id": sender.wallet_id,
+                    "to_wallet_id": receiver.wallet_id,
+                    "amount_transferred": f"{amount / SATOSHIS_PER_BTC:.8f}",
+                    "user_id": sender.user_id,
+                },
+                headers={"Idempotency-Key": key},
+            )
+            break
+        except httpx.TransportError:
+            result.transport_errors += 1
+            time.sleep(0.05 * (attempt + 1))
+    else:
+        result.unresolved += 1
+        return
+    result.statuses[response.status_code] += 1
+    if response.status_code == 201:
+        result.transaction_ids.append(response.json()["transaction_id"])
+    elif LOCKED in response.text:
+        result.locked += 1
+
+
+def _split(total: int, parts: int) -> list[int]:
+    return [total // parts + (part < total % parts) for part in range(parts)]
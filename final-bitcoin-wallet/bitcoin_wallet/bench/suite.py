@@ -0,0 +1,524 @@
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Iterator, TypeVar
+
+import httpx
+from fastapi import FastAPI
+
+from bitcoin_wallet.bench.seeding import DAY, Population, seed_database
+from bitcoin_wallet.core.config.constants import ADMIN_API_KEY, SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+from bitcoin_wallet.core.currencyconverter.price_feed import (
+    PriceSnapshot,
+    SnapshotConverter,
+)
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.schema import SchemaBootstrapper
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.core.dto.page_request import PageRequest
+from bitcoin_wallet.core.dto.statistics_window import StatisticsWindow
+from bitcoin_wallet.core.entity.user import BtcUser
+from bitcoin_wallet.core.repository.statistics_repository import (
+    BtcStatisticsRepository,
+)
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.repository.user_repository import BtcUserRepository
+from bitcoin_wallet.core.repository.wallet_repository import BtcWalletRepository
+from bitcoin_wallet.core.statistics.platform_statistics import Granularity
+from bitcoin_wallet.core.transfer.batch_transfer import BatchMode, TransferLeg
+from bitcoin_wallet.runner.setup import init_app
+
+PAGE = PageRequest(limit=100)
+SENDER_MIN_BALANCE = BTC // 100
+TRANSFER_AMOUNT = 1_000
+BATCH_LEGS = 10
+# Whole-table reads and exports of hot wallets run this many times fewer.
+HEAVY_DIVISOR = 20
+BENCH_PRICE = 50_000.0
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CaseResult:
+    name: str
+    iterations: int
+    errors: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+@dataclass(frozen=True)
+class SuiteResult:
+    population: Population
+    environment: dict[str, str]
+    results: list[CaseResult]
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), indent=2) + "\n"
+
+    @classmethod
+    def from_json(cls, text: str) -> "SuiteResult":
+        data = json.loads(text)
+        return cls(
+            Population(**data["population"]),
+            data["environment"],
+            [CaseResult(**result) for result in data["results"]],
+        )
+
+
+@dataclass(frozen=True)
+class Comparison:
+    name: str
+    base_ms: float
+    head_ms: float
+
+    @property
+    def change(self) -> float:
+        return self.head_ms / self.base_ms - 1 if self.base_ms else 0.0
+
+
+@dataclass(frozen=True)
+class Workload:
+    # Drawn from the seeded data with a fixed seed, so two runs against the
+    # same population ask for the same users and wallets.
+    owners: list[AuthContext]
+    senders: list[tuple[int, int]]
+    wallets: list[int]
+
+    def owner(self, iteration: int) -> AuthContext:
+        return self.owners[iteration % len(self.owners)]
+
+    def wallet(self, iteration: int) -> int:
+        return min(self.owner(iteration).wallet_ids)
+
+    def sender(self, iteration: int) -> tuple[int, int]:
+        return self.senders[iteration % len(self.senders)]
+
+    def receiver(self, iteration: int) -> int:
+        return self.wallets[iteration % len(self.wallets)]
+
+
+def run_suite(
+    population: Population, iterations: int, database: str | None = None
+) -> SuiteResult:
+    with _database(database) as db_path:
+        settings = DatabaseSettings(db_path=db_path)
+        pool = ConnectionPool.from_settings(settings)
+        SchemaBootstrapper(pool).create()
+        with pool.connection() as conn:
+            empty = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+        if empty:
+            seed_database(pool, population)
+        workload = load_workload(pool, population.seed, iterations)
+        results = time_repositories(pool, workload, iterations)
+        pool.close()
+        results += asyncio.run(time_routes(db_path, workload, iterations))
+    return SuiteResult(population, environment(), results)
+
+
+def load_workload(pool: ConnectionPool, seed: int, size: int) -> Workload:
+    rng = random.Random(seed)
+    users = BtcUserRepository(pool=pool)
+    with pool.connection() as conn:
+        user_ids = [row[0] for row in conn.execute("SELECT id FROM users ORDER BY id")]
+        senders = conn.execute(
+            "SELECT id, user_id FROM wallets WHERE balance >= ? ORDER BY id",
+            (SENDER_MIN_BALANCE,),
+        ).fetchall()
+        wallets = [row[0] for row in conn.execute("SELECT id FROM wallets")]
+    owners = [
+        owner
+        for owner in map(users.load_auth_context, _sample(rng, user_ids, size))
+        if owner.wallet_ids
+    ]
+    return Workload(
+        owners,
+        [(wallet_id, user_id) for wallet_id, user_id in _sample(rng, senders, size)],
+        _sample(rng, wallets, size),
+    )
+
+
+def time_repositories(
+    pool: ConnectionPool, workload: Workload, iterations: int
+) -> list[CaseResult]:
+    users = BtcUserRepository(pool=pool)
+    wallets = BtcWalletRepository(pool=pool, converter=_converter())
+    transactions = BtcTransactionRepository(pool=pool)
+    statistics_repository = BtcStatisticsRepository(pool=pool)
+    heavy = max(1, iterations // HEAVY_DIVISOR)
+    run = _run_token()
+    created: list[int] = []
+    now = int(time.time())
+    last_day = StatisticsWindow(now - DAY, now, Granularity.HOUR)
+
+    def create_user(i: int) -> None:
+        created.append(users.create(BtcUser(0, f"repo-{run}-{i}@bench.io")))
+
+    def transfer(i: int) -> None:
+        from_wallet_id, _ = workload.sender(i)
+        transactions.make_transaction(
+            from_wallet_id, workload.receiver(i), TRANSFER_AMOUNT
+        )
+
+    def batch_transfer(i: int) -> None:
+        from_wallet_id, _ = workload.sender(i)
+        legs = [
+            TransferLeg(workload.receiver(i + leg), TRANSFER_AMOUNT)
+            for leg in range(BATCH_LEGS)
+        ]
+        transactions.make_batch_transaction(from_wallet_id, legs, BatchMode.BEST_EFFORT)
+
+    cases: list[tuple[str, Callable[[int], object], int]] = [
+        ("BtcUserRepository.read", lambda i: users.read(workload.owner(i).user_id), 0),
+        (
+            "BtcUserRepository.load_auth_context",
+            lambda i: users.load_auth_context(workload.owner(i).user_id),
+            0,
+        ),
+        ("BtcUserRepository.read_all", lambda i: users.read_all(), heavy),
+        ("BtcUserRepository.create", create_user, 0),
+        (
+            "BtcWalletRepository.retrieve_wallet_info",
+            lambda i: wallets.retrieve_wallet_info(
+                workload.owner(i), workload.wallet(i)
+            ),
+            0,
+        ),
+        (
+            "BtcWalletRepository.authorize_user",
+            lambda i: wallets.authorize_user(workload.owner(i).user_id),
+            0,
+        ),
+        (
+            "BtcWalletRepository.create_wallet",
+            lambda i: wallets.create_wallet(
+                AuthContext(created[i % len(created)], frozenset()), BTC
+            ),
+            0,
+        ),
+        (
+            "BtcTransactionRepository.get_user_transactions",
+            lambda i: transactions.get_user_transactions(workload.owner(i), PAGE),
+            0,
+        ),
+        (
+            "BtcTransactionRepository.get_wallet_transactions",
+            lambda i: transactions.get_wallet_transactions(workload.wallet(i), PAGE),
+            0,
+        ),
+        (
+            "BtcTransactionRepository.iter_user_transactions",
+            lambda i: sum(
+                map(len, transactions.iter_user_transactions(workload.owner(i)))
+            ),
+            heavy,
+        ),
+        (
+            "BtcTransactionRepository.iter_wallet_transactions",
+            lambda i: sum(
+                map(len, transactions.iter_wallet_transactions(workload.wallet(i)))
+            ),
+            heavy,
+        ),
+        (
+            "BtcTransactionRepository.authorize_transaction",
+            lambda i: transactions.authorize_transaction(*workload.sender(i)),
+            0,
+        ),
+        ("BtcTransactionRepository.make_transaction", transfer, 0),
+        ("BtcTransactionRepository.make_batch_transaction", batch_transfer, 0),
+        (
+            "BtcTransactionRepository.sweep_idempotency_keys",
+            lambda i: transactions.sweep_idempotency_keys(0, 1000),
+            0,
+        ),
+        ("BtcTransactionRepository.read_all", lambda i: transactions.read_all(), heavy),
+        ("BtcStatisticsRepository.read", lambda i: statistics_repository.read(), 0),
+        (
+            "BtcStatisticsRepository.read_buckets",
+            lambda i: statistics_repository.read_buckets(last_day),
+            0,
+        ),
+        (
+            "BtcStatisticsRepository.rebuild",
+            lambda i: statistics_repository.rebuild(),
+            heavy,
+        ),
+    ]
+    return [time_calls(name, call, count or iterations) for name, call, count in cases]
+
+
+async def time_routes(
+    db_path: str, workload: Workload, iterations: int
+) -> list[CaseResult]:
+    app = bench_app(db_path)
+    heavy = max(1, iterations // HEAVY_DIVISOR)
+    run = _run_token()
+    created: list[int] = []
+    now = int(time.time())
+    hourly: dict[str, str | int] = {
+        "admin_api_key": ADMIN_API_KEY,
+        "from": now - DAY,
+        "to": now,
+        "granularity": "hour",
+    }
+    admin = {"admin_api_key": ADMIN_API_KEY}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+
+            def caller(i: int) -> dict[str, int]:
+                return {"user_id": workload.owner(i).user_id}
+
+            async def create_user(i: int) -> httpx.Response:
+                response = await client.post(
+                    "/users", json={"mail": f"http-{run}-{i}@bench.io"}
+                )
+                if response.status_code == 201:
+                    created.append(response.json()["api_key"])
+                return response
+
+            def transfer(i: int) -> Awaitable[httpx.Response]:
+                from_wallet_id, user_id = workload.sender(i)
+                return client.post(
+                    "/transactions",
+                    params={
+                        "from_wallet_id": from_wallet_id,
+                        "to_wallet_id": workload.receiver(i),
+                        "amount_transferred": TRANSFER_AMOUNT / BTC,
+                        "user_id": user_id,
+                    },
+                )
+
+            def batch_transfer(i: int) -> Awaitable[httpx.Response]:
+                from_wallet_id, user_id = workload.sender(i)
+                legs = [
+                    {
+                        "to_wallet_id": workload.receiver(i + leg),
+                        "amount_transferred": TRANSFER_AMOUNT / BTC,
+                    }
+                    for leg in range(BATCH_LEGS)
+                ]
+                return client.post(
+                    "/transactions/batch",
+                    json={
+                        "user_id": user_id,
+                        "from_wallet_id": from_wallet_id,
+                        "mode": BatchMode.BEST_EFFORT.value,
+                        "transfers": legs,
+                    },
+                )
+
+            cases: list[tuple[str, Callable[[int], Awaitable[httpx.Response]], int]] = [
+                ("POST /users", create_user, 0),
+                (
+                    "POST /wallets",
+                    lambda i: client.post(
+                        "/wallets",
+                        json={
+                            "user_id": created[i % len(created)],
+                            "initial_balance": 1,
+                        },
+                    ),
+                    0,
+                ),
+                (
+                    "GET /wallets/{address}",
+                    lambda i: client.get(
+                        f"/wallets/{workload.wallet(i)}", params=caller(i)
+                    ),
+                    0,
+                ),
+                ("POST /transactions", transfer, 0),
+                ("POST /transactions/batch", batch_transfer, 0),
+                (
+                    "GET /transactions",
+                    lambda i: client.get(
+                        "/transactions", params={**caller(i), "limit": PAGE.limit}
+                    ),
+                    0,
+                ),
+                (
+                    "GET /transactions/export",
+                    lambda i: client.get("/transactions/export", params=caller(i)),
+                    heavy,
+                ),
+                (
+                    "GET /wallets/{address}/transactions",
+                    lambda i: client.get(
+                        f"/wallets/{workload.wallet(i)}/transactions",
+                        params={**caller(i), "limit": PAGE.limit},
+                    ),
+                    0,
+                ),
+                (
+                    "GET /wallets/{address}/transactions/export",
+                    lambda i: client.get(
+                        f"/wallets/{workload.wallet(i)}/transactions/export",
+                        params=caller(i),
+                    ),
+                    heavy,
+                ),
+                (
+                    "GET /statistics",
+                    lambda i: client.get("/statistics", params=admin),
+                    0,
+                ),
+                (
+                    "GET /statistics?granularity=hour",
+                    lambda i: client.get("/statistics", params=hourly),
+                    0,
+                ),
+                ("GET /metrics", lambda i: client.get("/metrics", params=admin), 0),
+                (
+                    "GET /admin/slow-queries",
+                    lambda i: client.get("/admin/slow-queries", params=admin),
+                    0,
+                ),
+            ]
+            return [
+                await time_requests(name, call, count or iterations)
+                for name, call, count in cases
+            ]
+
+
+def bench_app(db_path: str) -> FastAPI:
+    # The production wiring, minus the network: prices come from a fixed quote.
+    with _environment(DB_PATH=db_path, PRICE_POLL_INTERVAL_S="0"):
+        app = init_app()
+    converter = _converter()
+    app.state.wallets.converter = converter
+    app.state.wallets.repository.converter = converter
+    return app
+
+
+def time_calls(name: str, call: Callable[[int], object], iterations: int) -> CaseResult:
+    durations: list[float] = []
+    errors = 0
+    for i in range(iterations):
+        started = time.perf_counter()
+        try:
+            call(i)
+        except Exception:
+            errors += 1
+        durations.append(time.perf_counter() - started)
+    return summarize(name, durations, errors)
+
+
+async def time_requests(
+    name: str, call: Callable[[int], Awaitable[httpx.Response]], iterations: int
+) -> CaseResult:
+    durations: list[float] = []
+    errors = 0
+    for i in range(iterations):
+        started = time.perf_counter()
+        response = await call(i)
+        durations.append(time.perf_counter() - started)
+        errors += response.status_code >= 400
+    return summarize(name, durations, errors)
+
+
+def summarize(name: str, durations: list[float], errors: int) -> CaseResult:
+    milliseconds = sorted(duration * 1000 for duration in durations)
+    if len(milliseconds) > 1:
+        percentiles = statistics.quantiles(milliseconds, n=100, method="inclusive")
+    else:
+        percentiles = milliseconds * 99
+    return CaseResult(
+        name=name,
+        iterations=len(milliseconds),
+        errors=errors,
+        mean_ms=round(statistics.fmean(milliseconds), 4),
+        p50_ms=round(percentiles[49], 4),
+        p95_ms=round(percentiles[94], 4),
+        p99_ms=round(percentiles[98], 4),
+        max_ms=round(milliseconds[-1], 4),
+    )
+
+
+def compare(base: SuiteResult, head: SuiteResult) -> list[Comparison]:
+    baseline = {result.name: result for result in base.results}
+    return [
+        Comparison(result.name, baseline[result.name].p50_ms, result.p50_ms)
+        for result in head.results
+        if result.name in baseline
+    ]
+
+
+def environment() -> dict[str, str]:
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def _converter() -> SnapshotConverter:
+    snapshot = PriceSnapshot()
+    snapshot.publish(BENCH_PRICE)
+    return SnapshotConverter(snapshot, max_staleness=float("inf"))
+
+
+def _sample(rng: random.Random, population: list[T], size: int) -> list[T]:
+    return rng.sample(population, min(size, len(population)))
+
+
+def _run_token() -> str:
+    # Keeps mails unique when a kept database is benchmarked again.
+    return f"{time.time_ns():x}"
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+@contextmanager
+def _database(path: str | None) -> Iterator[str]:
+    if path is not None:
+        yield path
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        yield os.path.join(tmp_dir, "bench.db")
+
+
+@contextmanager
+def _environment(**overrides: str) -> Iterator[None]:
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
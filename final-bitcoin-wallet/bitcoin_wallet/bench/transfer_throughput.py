@@ -0,0 +1,174 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+import typer
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.money.satoshi import transfer_fee
+from bitcoin_wallet.core.path.db_path_handler import DatabasePathHandler
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+
+INITIAL_BALANCE = 1000 * SATOSHIS_PER_BTC
+TRANSFER_AMOUNT = SATOSHIS_PER_BTC
+
+Transfer = Callable[[int, int, int], None]
+
+
+@dataclass
+class ThroughputResult:
+    implementation: str
+    threads: int
+    transfers_per_second: float
+    errors: int
+    conserved: bool
+
+
+def create_database(db_path: str, wallets: int) -> None:
+    schema_path = DatabasePathHandler.get_schema_path()
+    with open(schema_path) as schema, sqlite3.connect(db_path) as conn:
+        conn.executescript(schema.read())
+        conn.executemany(
+            "INSERT INTO users (id, mail) VALUES (?, ?)",
+            [(i, f"user{i}@bench.io") for i in range(1, wallets + 1)],
+        )
+        conn.executemany(
+            "INSERT INTO wallets (id, user_id, balance, minted) VALUES (?, ?, ?, ?)",
+            [(i, i, INITIAL_BALANCE, INITIAL_BALANCE) for i in range(1, wallets + 1)],
+        )
+
+
+def legacy_transfer(db_path: str) -> Transfer:
+    # The pre-engine read-modify-write path: a connection per balance read and
+    # absolute balance writes computed in Python.
+    def balance(wallet_id: int) -> int:
+        with sqlite3.connect(db_path) as conn:
+            row = conn.execute("SELECT balance FROM wallets WHERE id = ?", (wallet_id,))
+            return int(row.fetchone()[0])
+
+    def transfer(from_wallet_id: int, to_wallet_id: int, amount: int) -> None:
+        with sqlite3.connect(db_path) as conn:
+            owners = conn.execute(
+                "SELECT user_id FROM wallets WHERE id IN (?, ?)",
+                (from_wallet_id, to_wallet_id),
+            ).fetchall()
+            fee = transfer_fee(amount) if len(set(owners)) != 1 else 0
+            if balance(from_wallet_id) < amount:
+                return
+            conn.execute(
+                "UPDATE wallets SET balance = ? WHERE id = ?",
+                (balance(to_wallet_id) + amount - fee, to_wallet_id),
+            )
+            conn.execute(
+                "UPDATE wallets SET balance = ? WHERE id = ?",
+                (balance(from_wallet_id) - amount, from_wallet_id),
+            )
+            conn.execute(
+                "INSERT INTO transactions (from_wallet_id, to_wallet_id, "
+                "amount_transferred, lost_amount) VALUES (?, ?, ?, ?)",
+                (from_wallet_id, to_wallet_id, amount, fee),
+            )
+
+    return transfer
+
+
+def engine_transfer(repository: BtcTransactionRepository) -> Transfer:
+    def transfer(from_wallet_id: int, to_wallet_id: int, amount: int) -> None:
+        repository.make_transaction(from_wallet_id, to_wallet_id, amount)
+
+    return transfer
+
+
+def measure(
+    name: str, db_path: str, transfer: Transfer, transfers: int, threads: int
+) -> ThroughputResult:
+    wallets = _wallet_count(db_path)
+    rng = random.Random(42)
+    pairs = [tuple(rng.sample(range(1, wallets + 1), 2)) for _ in range(transfers)]
+
+    def run(pair: tuple[int, ...]) -> bool:
+        try:
+            transfer(pair[0], pair[1], TRANSFER_AMOUNT)
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        errors = transfers - sum(executor.map(run, pairs))
+    elapsed = time.perf_counter() - started
+
+    return ThroughputResult(
+        implementation=name,
+        threads=threads,
+        transfers_per_second=transfers / elapsed,
+        errors=errors,
+        conserved=_is_conserved(db_path, wallets),
+    )
+
+
+def _wallet_count(db_path: str) -> int:
+    with sqlite3.connect(db_path) as conn:
+        return int(conn.execute("SELECT COUNT(*) FROM wallets").fetchone()[0])
+
+
+def _is_conserved(db_path: str, wallets: int) -> bool:
+    with sqlite3.connect(db_path) as conn:
+        balances = int(conn.execute("SELECT SUM(balance) FROM wallets").fetchone()[0])
+        fees = int(
+            conn.execute(
+                "SELECT COALESCE(SUM(lost_amount), 0) FROM transactions"
+            ).fetchone()[0]
+        )
+    return balances + fees == wallets * INITIAL_BALANCE
+
+
+def main(transfers: int = 2000, wallets: int = 100, threads: int = 8) -> None:
+    results: list[ThroughputResult] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for thread_count in sorted({1, threads}):
+            legacy_db = os.path.join(tmp_dir, f"legacy-{thread_count}.db")
+            create_database(legacy_db, wallets)
+            results.append(
+                measure(
+                    "legacy",
+                    legacy_db,
+                    legacy_transfer(legacy_db),
+                    transfers,
+                    thread_count,
+                )
+            )
+
+            engine_db = os.path.join(tmp_dir, f"engine-{thread_count}.db")
+            create_database(engine_db, wallets)
+            pool = ConnectionPool(engine_db, max_size=thread_count, timeout=30.0)
+            repository = BtcTransactionRepository(pool=pool)
+            results.append(
+                measure(
+                    "engine",
+                    engine_db,
+                    engine_transfer(repository),
+                    transfers,
+                    thread_count,
+                )
+            )
+            pool.close()
+
+    for result in results:
+        typer.echo(
+            f"{result.implementation:<8} threads={result.threads:<3} "
+            f"{result.transfers_per_second:>10.1f} transfers/s  "
+            f"errors={result.errors:<5} conserved={result.conserved}"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
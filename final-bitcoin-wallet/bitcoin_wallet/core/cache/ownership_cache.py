@@ -0,0 +1,103 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Callable
+
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+
+
+@dataclass
+class OwnershipCacheMetrics:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass(frozen=True)
+class _Entry:
+    context: AuthContext
+    generation: int
+    expires_at: float
+
+
+class OwnershipCache:
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = OwnershipCacheMetrics()
+
+    def get(
+        self, user_id: int, current_generation: Callable[[], int | None]
+    ) -> AuthContext | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.expires_at <= self.clock():
+                del self._entries[user_id]
+                entry = None
+            if entry is None:
+                self._metrics.misses += 1
+                return None
+
+        # Another worker may have added a wallet since this entry was cached;
+        # its generation in SQLite is the shared source of truth.
+        if current_generation() != entry.generation:
+            with self._lock:
+                if self._entries.get(user_id) is entry:
+                    del self._entries[user_id]
+                self._metrics.misses += 1
+                self._metrics.stale += 1
+            return None
+
+        with self._lock:
+            if user_id in self._entries:
+                self._entries.move_to_end(user_id)
+            self._metrics.hits += 1
+        return entry.context
+
+    def put(self, context: AuthContext, generation: int) -> None:
+        entry = _Entry(context, generation, self.clock() + self.ttl)
+        with self._lock:
+            self._entries[context.user_id] = entry
+            self._entries.move_to_end(context.user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._metrics.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._metrics.invalidations += 1
+
+    def metrics(self) -> OwnershipCacheMetrics:
+        with self._lock:
+            return replace(self._metrics)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def bump_wallets_generation(conn: sqlite3.Connection, user_id: int) -> bool:
+    # Runs in the transaction that changes ownership, so every worker's cached
+    # copy stops matching as soon as the change commits. False: no such user.
+    cursor = conn.execute(
+        "UPDATE users SET wallets_generation = wallets_generation + 1 WHERE id = ?",
+        (user_id,),
+    )
+    return cursor.rowcount > 0
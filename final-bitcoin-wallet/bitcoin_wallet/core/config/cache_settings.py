@@ -0,0 +1,19 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class OwnershipCacheSettings:
+    enabled: bool = True
+    max_entries: int = 10_000
+    ttl: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "OwnershipCacheSettings":
+        defaults = cls()
+        return cls(
+            enabled=os.getenv("OWNERSHIP_CACHE_ENABLED", str(defaults.enabled)).lower()
+            in ("1", "true", "yes"),
+            max_entries=int(os.getenv("OWNERSHIP_CACHE_SIZE", defaults.max_entries)),
+            ttl=float(os.getenv("OWNERSHIP_CACHE_TTL_S", defaults.ttl)),
+        )
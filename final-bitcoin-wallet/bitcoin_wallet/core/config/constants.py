@@ -3,6 +3,14 @@ ADMIN_API_KEY: str = "bfec1b29e1df4d798c31f699a9e6747e"
 
 # constants
 USER_DEFAULT_ID: int = 0
+DB_FILENAME: str = "bitcoin_wallet.db"
 INITIAL_BALANCE = 1
+MAX_WALLETS_PER_USER: int = 3
+SATOSHIS_PER_BTC: int = 100_000_000
+TRANSFER_FEE_BASIS_POINTS: int = 150
+DEFAULT_PAGE_SIZE: int = 100
+MAX_PAGE_SIZE: int = 1000
+MAX_BATCH_LEGS: int = 10_000
+MAX_IDEMPOTENCY_KEY_LENGTH: int = 255
 WALLET_NOT_FOUND_MSG = "Wallet not found"
 NOT_FOUNT_CODE = 404
@@ -0,0 +1,47 @@
+import os
+from dataclasses import dataclass
+
+from bitcoin_wallet.core.config.constants import DB_FILENAME
+from bitcoin_wallet.core.path.db_path_handler import DatabasePathHandler
+
+PragmaValue = str | int
+
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    db_path: str
+    journal_mode: str = "wal"
+    synchronous: str = "normal"
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size: int = -64 * 1024
+    busy_timeout: int = 5000
+    pool_size: int = 8
+    # Off in workers started by `run --workers`, which migrates once up front.
+    bootstrap_schema: bool = True
+
+    @classmethod
+    def from_env(cls) -> "DatabaseSettings":
+        defaults = cls(db_path="")
+        return cls(
+            db_path=os.getenv("DB_PATH")
+            or DatabasePathHandler.get_db_path(DB_FILENAME),
+            journal_mode=os.getenv("DB_JOURNAL_MODE", defaults.journal_mode),
+            synchronous=os.getenv("DB_SYNCHRONOUS", defaults.synchronous),
+            mmap_size=int(os.getenv("DB_MMAP_SIZE", defaults.mmap_size)),
+            cache_size=int(os.getenv("DB_CACHE_SIZE", defaults.cache_size)),
+            busy_timeout=int(os.getenv("DB_BUSY_TIMEOUT_MS", defaults.busy_timeout)),
+            pool_size=int(os.getenv("DB_POOL_SIZE", defaults.pool_size)),
+            bootstrap_schema=os.getenv(
+                "DB_BOOTSTRAP_SCHEMA", str(defaults.bootstrap_schema)
+            ).lower()
+            in ("1", "true", "yes"),
+        )
+
+    def pragmas(self) -> dict[str, PragmaValue]:
+        return {
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "mmap_size": self.mmap_size,
+            "cache_size": self.cache_size,
+            "busy_timeout": self.busy_timeout,
+        }
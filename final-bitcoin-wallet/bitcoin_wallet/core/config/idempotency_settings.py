@@ -0,0 +1,24 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class IdempotencySettings:
+    ttl: float = 86_400.0
+    cache_size: int = 10_000
+    sweep_interval: float = 60.0
+    sweep_batch_size: int = 1000
+
+    @classmethod
+    def from_env(cls) -> "IdempotencySettings":
+        defaults = cls()
+        return cls(
+            ttl=float(os.getenv("IDEMPOTENCY_TTL_S", defaults.ttl)),
+            cache_size=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", defaults.cache_size)),
+            sweep_interval=float(
+                os.getenv("IDEMPOTENCY_SWEEP_INTERVAL_S", defaults.sweep_interval)
+            ),
+            sweep_batch_size=int(
+                os.getenv("IDEMPOTENCY_SWEEP_BATCH_SIZE", defaults.sweep_batch_size)
+            ),
+        )
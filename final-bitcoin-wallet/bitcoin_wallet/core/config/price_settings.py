@@ -0,0 +1,34 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PriceSettings:
+    source_url: str = "https://api.bitfinex.com/v2/ticker/tBTCUSD"
+    request_timeout: float = 2.0
+    ttl: float = 30.0
+    stale_ttl: float = 300.0
+    retry_interval: float = 5.0
+    poll_interval: float = 10.0
+    max_staleness: float = 120.0
+
+    @classmethod
+    def from_env(cls) -> "PriceSettings":
+        defaults = cls()
+        return cls(
+            source_url=os.getenv("PRICE_SOURCE_URL", defaults.source_url),
+            request_timeout=float(
+                os.getenv("PRICE_REQUEST_TIMEOUT_S", defaults.request_timeout)
+            ),
+            ttl=float(os.getenv("PRICE_CACHE_TTL_S", defaults.ttl)),
+            stale_ttl=float(os.getenv("PRICE_CACHE_STALE_TTL_S", defaults.stale_ttl)),
+            retry_interval=float(
+                os.getenv("PRICE_RETRY_INTERVAL_S", defaults.retry_interval)
+            ),
+            poll_interval=float(
+                os.getenv("PRICE_POLL_INTERVAL_S", defaults.poll_interval)
+            ),
+            max_staleness=float(
+                os.getenv("PRICE_MAX_STALENESS_S", defaults.max_staleness)
+            ),
+        )
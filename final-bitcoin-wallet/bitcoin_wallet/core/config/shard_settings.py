@@ -0,0 +1,26 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ShardSettings:
+    catalog: str = ""
+    relay_interval: float = 0.1
+    relay_batch_size: int = 500
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.catalog)
+
+    @classmethod
+    def from_env(cls) -> "ShardSettings":
+        defaults = cls()
+        return cls(
+            catalog=os.getenv("SHARD_MAP", defaults.catalog),
+            relay_interval=float(
+                os.getenv("SHARD_RELAY_INTERVAL_S", defaults.relay_interval)
+            ),
+            relay_batch_size=int(
+                os.getenv("SHARD_RELAY_BATCH_SIZE", defaults.relay_batch_size)
+            ),
+        )
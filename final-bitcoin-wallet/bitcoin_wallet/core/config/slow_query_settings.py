@@ -0,0 +1,21 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class SlowQuerySettings:
+    enabled: bool = False
+    threshold_ms: float = 100.0
+    max_entries: int = 200
+
+    @classmethod
+    def from_env(cls) -> "SlowQuerySettings":
+        defaults = cls()
+        return cls(
+            enabled=os.getenv("SLOW_QUERY_LOG_ENABLED", str(defaults.enabled)).lower()
+            in ("1", "true", "yes"),
+            threshold_ms=float(
+                os.getenv("SLOW_QUERY_THRESHOLD_MS", defaults.threshold_ms)
+            ),
+            max_entries=int(os.getenv("SLOW_QUERY_LOG_SIZE", defaults.max_entries)),
+        )
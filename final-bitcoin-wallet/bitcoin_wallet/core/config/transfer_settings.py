@@ -0,0 +1,16 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TransferSettings:
+    batch_size: int = 64
+    linger_ms: float = 2.0
+
+    @classmethod
+    def from_env(cls) -> "TransferSettings":
+        defaults = cls()
+        return cls(
+            batch_size=int(os.getenv("TRANSFER_BATCH_SIZE", defaults.batch_size)),
+            linger_ms=float(os.getenv("TRANSFER_BATCH_LINGER_MS", defaults.linger_ms)),
+        )
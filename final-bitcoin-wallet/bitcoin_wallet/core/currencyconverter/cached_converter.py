@@ -0,0 +1,124 @@
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable
+
+from bitcoin_wallet.core.currencyconverter.convert_api import ConvertBitcoinToUsd
+from bitcoin_wallet.core.exception.price_unavailable import PriceUnavailableException
+
+
+@dataclass
+class PriceCacheMetrics:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    fallbacks: int = 0
+    upstream_calls: int = 0
+    upstream_failures: int = 0
+    upstream_seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class _Quote:
+    price: float
+    fetched_at: float
+
+
+class CachedConverter:
+    def __init__(
+        self,
+        source: ConvertBitcoinToUsd,
+        ttl: float = 30.0,
+        stale_ttl: float = 300.0,
+        retry_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.source = source
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.retry_interval = retry_interval
+        self.clock = clock
+        self._quote: _Quote | None = None
+        self._failed_at: float | None = None
+        self._refresh_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = PriceCacheMetrics()
+
+    def convert_btc_to_usd(self) -> float:
+        quote = self._quote
+        if quote is not None:
+            age = self.clock() - quote.fetched_at
+            if age < self.ttl:
+                self._count("hits")
+                return quote.price
+            if age < self.ttl + self.stale_ttl:
+                # Serve the old price now and let one background thread refresh it.
+                self._count("stale")
+                if not self._backing_off():
+                    self._refresh_in_background()
+                return quote.price
+
+        self._count("misses")
+        return self._refresh_blocking()
+
+    def metrics(self) -> PriceCacheMetrics:
+        with self._metrics_lock:
+            return replace(self._metrics)
+
+    def _refresh_blocking(self) -> float:
+        with self._refresh_lock:
+            # Concurrent misses queue on the lock; whoever gets it after the
+            # first caller finds a fresh quote and skips the upstream call.
+            quote = self._quote
+            if quote is not None and self.clock() - quote.fetched_at < self.ttl:
+                return quote.price
+            # After a failed call, waiters share its outcome until the retry
+            # window passes instead of each hitting the upstream in turn.
+            if self._backing_off():
+                return self._fallback("upstream failed recently")
+            return self._fetch()
+
+    def _refresh_in_background(self) -> None:
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        def refresh() -> None:
+            try:
+                self._fetch()
+            except PriceUnavailableException:
+                pass
+            finally:
+                self._refresh_lock.release()
+
+        threading.Thread(target=refresh, name="price-refresh", daemon=True).start()
+
+    def _fetch(self) -> float:
+        self._count("upstream_calls")
+        started = time.perf_counter()
+        try:
+            price = float(self.source.convert_btc_to_usd())
+        except Exception as ex:
+            self._count("upstream_failures")
+            self._count("upstream_seconds", time.perf_counter() - started)
+            self._failed_at = self.clock()
+            return self._fallback(str(ex))
+
+        self._count("upstream_seconds", time.perf_counter() - started)
+        self._quote = _Quote(price, self.clock())
+        self._failed_at = None
+        return price
+
+    def _fallback(self, reason: str) -> float:
+        quote = self._quote
+        if quote is None:
+            raise PriceUnavailableException(reason)
+        self._count("fallbacks")
+        return quote.price
+
+    def _backing_off(self) -> bool:
+        failed_at = self._failed_at
+        return failed_at is not None and self.clock() - failed_at < self.retry_interval
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._metrics_lock:
+            setattr(self._metrics, name, getattr(self._metrics, name) + amount)
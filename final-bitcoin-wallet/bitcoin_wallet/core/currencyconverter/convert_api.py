@@ -1,5 +1,6 @@
 from typing import Protocol
 
+import httpx
 import requests
 
 
@@ -11,6 +12,36 @@ class ConvertBitcoinToUsd(Protocol):
 class BitfinexConverter:
     _URL = "https://api.bitfinex.com/v2/ticker/tBTCUSD"
 
+    def __init__(self, url: str = _URL, timeout: float = 2.0) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
     def convert_btc_to_usd(self) -> float:
-        ans: float = requests.get(self._URL).json()[0]
-        return ans
+        response = self.session.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return float(response.json()[0])
+
+
+class AsyncConvertBitcoinToUsd(Protocol):
+    async def convert_btc_to_usd(self) -> float:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+class AsyncBitfinexConverter:
+    def __init__(self, url: str = BitfinexConverter._URL, timeout: float = 2.0) -> None:
+        self.url = url
+        self.client = httpx.AsyncClient(
+            timeout=timeout, limits=httpx.Limits(max_keepalive_connections=4)
+        )
+
+    async def convert_btc_to_usd(self) -> float:
+        response = await self.client.get(self.url)
+        response.raise_for_status()
+        return float(response.json()[0])
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
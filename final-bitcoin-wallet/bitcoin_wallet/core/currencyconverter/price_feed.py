@@ -0,0 +1,106 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Callable
+
+from fastapi import FastAPI
+
+from bitcoin_wallet.core.currencyconverter.convert_api import AsyncConvertBitcoinToUsd
+from bitcoin_wallet.core.exception.price_unavailable import PriceUnavailableException
+
+
+@dataclass(frozen=True)
+class PriceQuote:
+    price: float
+    published_at: float
+
+
+@dataclass
+class PriceFeedMetrics:
+    polls: int = 0
+    failures: int = 0
+    upstream_seconds: float = 0.0
+
+
+class PriceSnapshot:
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self._quote: PriceQuote | None = None
+
+    def publish(self, price: float) -> None:
+        # A single reference swap, so readers on any thread see a whole quote.
+        self._quote = PriceQuote(price, self.clock())
+
+    def latest(self) -> PriceQuote | None:
+        return self._quote
+
+
+class SnapshotConverter:
+    def __init__(self, snapshot: PriceSnapshot, max_staleness: float) -> None:
+        self.snapshot = snapshot
+        self.max_staleness = max_staleness
+
+    def convert_btc_to_usd(self) -> float:
+        quote = self.snapshot.latest()
+        if quote is None:
+            raise PriceUnavailableException("no quote received yet")
+
+        age = self.snapshot.clock() - quote.published_at
+        if age > self.max_staleness:
+            raise PriceUnavailableException(f"last quote is {age:.0f}s old")
+        return quote.price
+
+
+class PriceFeed:
+    def __init__(
+        self,
+        source: AsyncConvertBitcoinToUsd,
+        snapshot: PriceSnapshot,
+        interval: float = 10.0,
+        startup_timeout: float = 5.0,
+    ) -> None:
+        self.source = source
+        self.snapshot = snapshot
+        self.interval = interval
+        self.startup_timeout = startup_timeout
+        self._metrics = PriceFeedMetrics()
+
+    async def poll_once(self) -> bool:
+        self._metrics.polls += 1
+        started = time.perf_counter()
+        try:
+            price = await self.source.convert_btc_to_usd()
+        except Exception:
+            # Keep the previous quote; the staleness guard decides when it expires.
+            self._metrics.failures += 1
+            return False
+        finally:
+            self._metrics.upstream_seconds += time.perf_counter() - started
+
+        self.snapshot.publish(float(price))
+        return True
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.poll_once()
+
+    def metrics(self) -> PriceFeedMetrics:
+        return replace(self._metrics)
+
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI) -> AsyncIterator[None]:
+        # Try for a first quote before serving; if the source is down, the app
+        # still starts and wallet endpoints answer 503 until a poll succeeds.
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.poll_once(), self.startup_timeout)
+
+        task = asyncio.create_task(self.run())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+            await self.source.aclose()
@@ -0,0 +1,175 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from queue import Empty, LifoQueue
+from typing import Iterator, Mapping
+
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings, PragmaValue
+from bitcoin_wallet.core.database.slow_query_log import SlowQueryLog, TracedConnection
+from bitcoin_wallet.core.exception.database_misconfigured import (
+    DatabaseMisconfiguredException,
+)
+from bitcoin_wallet.core.exception.pool_exhausted import (
+    ConnectionPoolExhaustedException,
+)
+
+SYNCHRONOUS_LEVELS = {"off": 0, "normal": 1, "full": 2, "extra": 3}
+
+
+@dataclass
+class PoolMetrics:
+    checkouts: int = 0
+    connections_created: int = 0
+    connections_discarded: int = 0
+    in_use: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+@dataclass
+class _PooledConnection:
+    connection: sqlite3.Connection
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        db_path: str,
+        max_size: int = 8,
+        timeout: float = 5.0,
+        pragmas: Mapping[str, PragmaValue] | None = None,
+        health_check_interval: float = 30.0,
+        slow_query_log: SlowQueryLog | None = None,
+    ) -> None:
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pragmas: dict[str, PragmaValue] = dict(pragmas or {})
+        self.health_check_interval = health_check_interval
+        self.slow_query_log = slow_query_log
+        self._idle: LifoQueue[_PooledConnection] = LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._metrics = PoolMetrics()
+        self._closed = False
+
+    @classmethod
+    def from_settings(
+        cls, settings: DatabaseSettings, slow_query_log: SlowQueryLog | None = None
+    ) -> "ConnectionPool":
+        return cls(
+            settings.db_path,
+            max_size=settings.pool_size,
+            pragmas=settings.pragmas(),
+            slow_query_log=slow_query_log,
+        )
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        pooled = self._checkout()
+        try:
+            with pooled.connection:
+                yield pooled.connection
+        finally:
+            self._checkin(pooled)
+
+    def verify_pragmas(self) -> None:
+        with self.connection() as conn:
+            for name, expected in self.pragmas.items():
+                actual = conn.execute(f"PRAGMA {name}").fetchone()[0]
+                if _normalize(name, actual) != _normalize(name, expected):
+                    raise DatabaseMisconfiguredException(name, expected, actual)
+
+    def metrics(self) -> PoolMetrics:
+        with self._lock:
+            return replace(self._metrics)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().connection.close()
+            except Empty:
+                return
+
+    def _checkout(self) -> _PooledConnection:
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ConnectionPoolExhaustedException(self.timeout)
+        waited = time.monotonic() - started
+
+        try:
+            pooled = self._take_idle() or self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._metrics.checkouts += 1
+            self._metrics.in_use += 1
+            self._metrics.total_wait_seconds += waited
+            self._metrics.max_wait_seconds = max(self._metrics.max_wait_seconds, waited)
+        return pooled
+
+    def _checkin(self, pooled: _PooledConnection) -> None:
+        with self._lock:
+            self._metrics.in_use -= 1
+
+        if self._closed:
+            pooled.connection.close()
+        else:
+            pooled.last_used = time.monotonic()
+            self._idle.put(pooled)
+        self._slots.release()
+
+    def _take_idle(self) -> _PooledConnection | None:
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                return None
+            if self._is_healthy(pooled):
+                return pooled
+            self._discard(pooled)
+
+    def _is_healthy(self, pooled: _PooledConnection) -> bool:
+        if time.monotonic() - pooled.last_used < self.health_check_interval:
+            return True
+        try:
+            pooled.connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        try:
+            pooled.connection.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._metrics.connections_discarded += 1
+
+    def _connect(self) -> _PooledConnection:
+        # Connections are handed to one thread at a time, never shared concurrently.
+        if self.slow_query_log is None:
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        else:
+            connection = sqlite3.connect(
+                self.db_path, check_same_thread=False, factory=TracedConnection
+            )
+            connection.slow_query_log = self.slow_query_log
+        for name, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            self._metrics.connections_created += 1
+        return _PooledConnection(connection)
+
+
+def _normalize(name: str, value: PragmaValue) -> str:
+    text = str(value).lower()
+    if name == "synchronous":
+        return str(SYNCHRONOUS_LEVELS.get(text, text))
+    return text
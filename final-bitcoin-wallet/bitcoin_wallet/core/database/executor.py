@@ -0,0 +1,95 @@
+import asyncio
+import functools
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+from bitcoin_wallet.core.metrics.registry import MetricsRegistry
+
+T = TypeVar("T")
+
+
+class DatabaseExecutor:
+    def __init__(
+        self, readers: int = 4, registry: MetricsRegistry | None = None
+    ) -> None:
+        # SQLite takes one writer at a time anyway; funnelling writes through a
+        # single thread turns lock contention into an in-process queue.
+        self.readers = readers
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._reader = ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix="db-reader"
+        )
+        self._metrics = None if registry is None else _ExecutorMetrics(registry)
+
+    @classmethod
+    def from_settings(
+        cls, settings: DatabaseSettings, registry: MetricsRegistry | None = None
+    ) -> "DatabaseExecutor":
+        # Two pooled connections stay free: this writer and the transfer writer.
+        return cls(readers=max(1, settings.pool_size - 2), registry=registry)
+
+    async def read(self, operation: Callable[..., T], *args: object) -> T:
+        return await self._run(self._reader, "read", operation, *args)
+
+    async def write(self, operation: Callable[..., T], *args: object) -> T:
+        return await self._run(self._writer, "write", operation, *args)
+
+    def shutdown(self) -> None:
+        self._writer.shutdown(wait=True)
+        self._reader.shutdown(wait=True)
+
+    async def _run(
+        self,
+        executor: ThreadPoolExecutor,
+        queue: str,
+        operation: Callable[..., T],
+        *args: object,
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        call: Callable[[], T] = functools.partial(operation, *args)
+        if self._metrics is not None:
+            call = self._metrics.instrument(queue, operation, call)
+        return await loop.run_in_executor(executor, call)
+
+
+class _ExecutorMetrics:
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.duration = registry.histogram(
+            "db_operation_duration_seconds",
+            "Time a repository method spent on its database thread.",
+            ("operation",),
+        )
+        self.queue_wait = registry.histogram(
+            "db_queue_wait_seconds",
+            "Time an operation waited for a reader thread or the single writer.",
+            ("queue",),
+        )
+        self.locked = registry.counter(
+            "db_locked_errors_total",
+            'Operations that failed with "database is locked".',
+            ("operation",),
+        )
+
+    def instrument(
+        self, queue: str, operation: Callable[..., T], call: Callable[[], T]
+    ) -> Callable[[], T]:
+        # Bound methods report as e.g. BtcUserRepository.load_auth_context.
+        name = getattr(operation, "__qualname__", type(operation).__name__)
+        submitted = time.perf_counter()
+
+        def timed() -> T:
+            started = time.perf_counter()
+            self.queue_wait.labels(queue).observe(started - submitted)
+            try:
+                return call()
+            except sqlite3.OperationalError as ex:
+                if "locked" in str(ex):
+                    self.locked.labels(name).inc()
+                raise
+            finally:
+                self.duration.labels(name).observe(time.perf_counter() - started)
+
+        return timed
@@ -0,0 +1,176 @@
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _move_wallet_ownership(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS user_wallets("
+        "user_id INTEGER NOT NULL REFERENCES users(id), "
+        "wallet_id INTEGER NOT NULL REFERENCES wallets(id), "
+        "PRIMARY KEY (user_id, wallet_id)) WITHOUT ROWID"
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO user_wallets (user_id, wallet_id) "
+        "SELECT id, first_wallet_id FROM users WHERE first_wallet_id != 0 "
+        "UNION SELECT id, second_wallet_id FROM users WHERE second_wallet_id != 0 "
+        "UNION SELECT id, third_wallet_id FROM users WHERE third_wallet_id != 0 "
+        "UNION SELECT user_id, id FROM wallets WHERE user_id IS NOT NULL"
+    )
+    for column in ("first_wallet_id", "second_wallet_id", "third_wallet_id"):
+        conn.execute(f"ALTER TABLE users DROP COLUMN {column}")
+
+
+def _store_money_as_satoshis(conn: sqlite3.Connection) -> None:
+    # Columns cannot change type in place, so both money tables are rebuilt.
+    conn.execute(
+        "CREATE TABLE wallets_satoshi("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "user_id INTEGER REFERENCES users(id), "
+        "balance INTEGER NOT NULL DEFAULT 100000000, "
+        "minted INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.execute(
+        "INSERT INTO wallets_satoshi (id, user_id, balance) "
+        f"SELECT id, user_id, {_to_satoshis('balance')} FROM wallets"
+    )
+    conn.execute(
+        "CREATE TABLE transactions_satoshi("
+        "id INTEGER PRIMARY KEY, from_wallet_id INTEGER, to_wallet_id INTEGER, "
+        "amount_transferred INTEGER NOT NULL DEFAULT 0, "
+        "lost_amount INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.execute(
+        "INSERT INTO transactions_satoshi SELECT id, from_wallet_id, to_wallet_id, "
+        f"{_to_satoshis('amount_transferred')}, {_to_satoshis('lost_amount')} "
+        "FROM transactions"
+    )
+    # Deposits were never recorded, so each wallet's minted amount is rebuilt
+    # from its converted balance and ledger; reconciliation then holds exactly.
+    conn.execute(
+        "UPDATE wallets_satoshi SET minted = balance "
+        "+ (SELECT COALESCE(SUM(amount_transferred), 0) FROM transactions_satoshi "
+        "WHERE from_wallet_id = wallets_satoshi.id) "
+        "- (SELECT COALESCE(SUM(amount_transferred - lost_amount), 0) "
+        "FROM transactions_satoshi WHERE to_wallet_id = wallets_satoshi.id)"
+    )
+    for table in ("wallets", "transactions"):
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_satoshi RENAME TO {table}")
+
+
+def _maintain_platform_statistics(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS platform_statistics("
+        "id INTEGER PRIMARY KEY CHECK (id = 1), "
+        "transactions INTEGER NOT NULL DEFAULT 0, "
+        "fees INTEGER NOT NULL DEFAULT 0, "
+        "volume INTEGER NOT NULL DEFAULT 0)"
+    )
+    # Spelled out: LEDGER_TOTALS reads transfer_inbox, which migration 7 adds.
+    conn.execute(
+        "INSERT INTO platform_statistics (id, transactions, fees, volume) "
+        "SELECT 1, COUNT(*), COALESCE(SUM(lost_amount), 0), "
+        "COALESCE(SUM(amount_transferred), 0) FROM transactions"
+    )
+
+
+def _roll_up_statistics_by_hour(conn: sqlite3.Connection) -> None:
+    # Existing transfers keep a NULL created_at: their time was never recorded.
+    conn.execute("ALTER TABLE transactions ADD COLUMN created_at INTEGER")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS statistics_rollups("
+        "bucket_start INTEGER PRIMARY KEY, "
+        "transactions INTEGER NOT NULL DEFAULT 0, "
+        "fees INTEGER NOT NULL DEFAULT 0, "
+        "volume INTEGER NOT NULL DEFAULT 0)"
+    )
+
+
+def _version_wallet_ownership(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "ALTER TABLE users ADD COLUMN wallets_generation INTEGER NOT NULL DEFAULT 0"
+    )
+
+
+def _persist_idempotency_keys(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS idempotency_keys("
+        "user_id INTEGER NOT NULL, "
+        "idempotency_key TEXT NOT NULL, "
+        "from_wallet_id INTEGER NOT NULL, "
+        "to_wallet_id INTEGER NOT NULL, "
+        "amount_transferred INTEGER NOT NULL, "
+        "transaction_id INTEGER NOT NULL, "
+        "created_at INTEGER NOT NULL, "
+        "PRIMARY KEY (user_id, idempotency_key)) WITHOUT ROWID"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created "
+        "ON idempotency_keys(created_at)"
+    )
+
+
+def _route_transfers_across_shards(conn: sqlite3.Connection) -> None:
+    # Both stay empty unless the database is one shard of several.
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS transfer_outbox("
+        "transaction_id INTEGER PRIMARY KEY)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS transfer_inbox(transaction_id INTEGER PRIMARY KEY)"
+    )
+
+
+def _to_satoshis(column: str) -> str:
+    return f"CAST(ROUND(COALESCE({column}, 0) * {SATOSHIS_PER_BTC}) AS INTEGER)"
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "move wallet ownership into user_wallets", _move_wallet_ownership),
+    Migration(2, "store money as integer satoshis", _store_money_as_satoshis),
+    Migration(3, "maintain platform statistics", _maintain_platform_statistics),
+    Migration(4, "record created_at and hourly rollups", _roll_up_statistics_by_hour),
+    Migration(5, "version wallet ownership per user", _version_wallet_ownership),
+    Migration(6, "persist idempotency keys", _persist_idempotency_keys),
+    Migration(7, "route transfers across shards", _route_transfers_across_shards),
+)
+
+
+class SchemaMigrator:
+    def __init__(
+        self, pool: ConnectionPool, migrations: tuple[Migration, ...] = MIGRATIONS
+    ) -> None:
+        self.pool = pool
+        self.migrations = migrations
+
+    def current_version(self) -> int:
+        with self.pool.connection() as conn:
+            return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+    def migrate(self) -> list[Migration]:
+        applied: list[Migration] = []
+        for migration in self.migrations:
+            with self.pool.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if migration.version <= version:
+                    continue
+                migration.apply(conn)
+                conn.execute(f"PRAGMA user_version = {migration.version}")
+            applied.append(migration)
+        return applied
+
+    def stamp(self) -> None:
+        with self.pool.connection() as conn:
+            conn.execute(f"PRAGMA user_version = {self.migrations[-1].version}")
@@ -0,0 +1,38 @@
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.migrations import SchemaMigrator
+from bitcoin_wallet.core.path.db_path_handler import DatabasePathHandler
+
+
+class SchemaBootstrapper:
+    def __init__(self, pool: ConnectionPool, schema_path: str | None = None) -> None:
+        self.pool = pool
+        self.schema_path = schema_path or DatabasePathHandler.get_schema_path()
+
+    def create(self) -> None:
+        migrator = SchemaMigrator(self.pool)
+        if self._is_empty():
+            self._apply_schema()
+            migrator.stamp()
+        else:
+            migrator.migrate()
+            self._apply_schema()
+
+    def drop(self) -> None:
+        with self.pool.connection() as conn:
+            tables = conn.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            ).fetchall()
+            for (table,) in tables:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def _is_empty(self) -> bool:
+        with self.pool.connection() as conn:
+            users = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'"
+            ).fetchone()
+        return users is None
+
+    def _apply_schema(self) -> None:
+        with open(self.schema_path) as schema, self.pool.connection() as conn:
+            conn.executescript(schema.read())
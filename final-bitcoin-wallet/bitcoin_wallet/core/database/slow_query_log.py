@@ -0,0 +1,187 @@
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Iterable, Mapping, Sequence
+
+PLANNED_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+# "SCAN wallets" reads every row; index scans say USING, and "SCAN json_each
+# VIRTUAL TABLE" or "SCAN CONSTANT ROW" are not tables.
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?[^\s(]+$")
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+Parameters = Sequence[Any] | Mapping[str, Any]
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    parameters: str
+    calls: int
+    total_seconds: float
+    max_seconds: float
+    plan: tuple[str, ...]
+
+    @property
+    def full_scan(self) -> bool:
+        return any(FULL_SCAN.match(step) for step in self.plan)
+
+
+class SlowQueryLog:
+    def __init__(self, threshold: float = 0.1, max_entries: int = 200) -> None:
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, SlowQuery] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        conn: sqlite3.Connection,
+        statement: str,
+        parameters: Parameters,
+        elapsed: float,
+    ) -> None:
+        redacted = _redact_statement(statement)
+        with self._lock:
+            entry = self._entries.get(redacted)
+            if entry is not None:
+                entry.calls += 1
+                entry.total_seconds += elapsed
+                entry.max_seconds = max(entry.max_seconds, elapsed)
+                self._entries.move_to_end(redacted)
+                return
+
+        # The plan is captured once per statement, on the connection that ran
+        # it, so it sees the same schema and statistics.
+        plan = _explain(conn, statement, parameters)
+        with self._lock:
+            self._entries[redacted] = SlowQuery(
+                redacted, _redact_parameters(parameters), 1, elapsed, elapsed, plan
+            )
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def extend(self, statement: str, elapsed: float) -> None:
+        # Rows fetched after the statement was already logged as slow.
+        with self._lock:
+            entry = self._entries.get(_redact_statement(statement))
+            if entry is not None:
+                entry.total_seconds += elapsed
+
+    def entries(self) -> list[SlowQuery]:
+        with self._lock:
+            entries = [replace(entry) for entry in self._entries.values()]
+        return sorted(entries, key=lambda entry: entry.total_seconds, reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TracedCursor(sqlite3.Cursor):
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        super().__init__(connection)
+        self._log: SlowQueryLog | None = getattr(connection, "slow_query_log", None)
+        self._statement: str | None = None
+        self._parameters: Parameters = ()
+        self._elapsed = 0.0
+        self._logged = False
+
+    def execute(self, sql: str, parameters: Any = (), /) -> "TracedCursor":
+        self._start(sql, parameters)
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._add(time.perf_counter() - started)
+        return self
+
+    def executemany(self, sql: str, batch: Iterable[Any], /) -> "TracedCursor":
+        rows = list(batch)
+        self._start(sql, rows[0] if rows else ())
+        started = time.perf_counter()
+        super().executemany(sql, rows)
+        self._add(time.perf_counter() - started)
+        return self
+
+    def fetchone(self) -> Any:
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._add(time.perf_counter() - started)
+        return row
+
+    def fetchmany(self, size: int | None = None) -> list[Any]:
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add(time.perf_counter() - started)
+        return rows
+
+    def fetchall(self) -> list[Any]:
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._add(time.perf_counter() - started)
+        return rows
+
+    def _start(self, sql: str, parameters: Parameters) -> None:
+        self._statement = sql
+        self._parameters = parameters
+        self._elapsed = 0.0
+        self._logged = False
+
+    def _add(self, elapsed: float) -> None:
+        # A statement's cost is its execute plus every fetch, since SQLite
+        # does most of the work while stepping through rows.
+        log = self._log
+        if log is None or self._statement is None:
+            return
+        self._elapsed += elapsed
+        if self._logged:
+            log.extend(self._statement, elapsed)
+        elif self._elapsed >= log.threshold:
+            self._logged = True
+            log.record(
+                self.connection, self._statement, self._parameters, self._elapsed
+            )
+
+
+class TracedConnection(sqlite3.Connection):
+    slow_query_log: SlowQueryLog | None = None
+
+    def cursor(self, factory: Any = TracedCursor) -> Any:
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+        return TracedCursor(self).execute(sql, parameters)
+
+    def executemany(self, sql: str, parameters: Iterable[Any], /) -> sqlite3.Cursor:
+        return TracedCursor(self).executemany(sql, parameters)
+
+
+def _explain(
+    conn: sqlite3.Connection, statement: str, parameters: Parameters
+) -> tuple[str, ...]:
+    if not statement.lstrip().upper().startswith(PLANNED_STATEMENTS):
+        return ()
+    try:
+        # A plain cursor, so the EXPLAIN itself is never traced.
+        rows = sqlite3.Cursor(conn).execute(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        )
+        return tuple(row[3] for row in rows)
+    except sqlite3.Error:
+        return ()
+
+
+def _redact_statement(statement: str) -> str:
+    return STRING_LITERAL.sub("'?'", " ".join(statement.split()))
+
+
+def _redact_parameters(parameters: Parameters) -> str:
+    if isinstance(parameters, Mapping):
+        return ", ".join(
+            f":{name} {type(value).__name__}" for name, value in parameters.items()
+        )
+    return ", ".join(type(value).__name__ for value in parameters)
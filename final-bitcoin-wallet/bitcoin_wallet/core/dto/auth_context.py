@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class AuthContext:
+    user_id: int
+    wallet_ids: frozenset[int]
+
+    def owns(self, wallet_id: int) -> bool:
+        return wallet_id in self.wallet_ids
@@ -0,0 +1,20 @@
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True)
+class PageRequest:
+    limit: int | None = None
+    after: int | None = None
+    before: int | None = None
+
+    @property
+    def backwards(self) -> bool:
+        # Only a bare "before" walks towards older rows; with both bounds the
+        # page is read forwards from "after".
+        return self.before is not None and self.after is None
+
+    def with_lookahead(self) -> "PageRequest":
+        # One extra row tells whether another page exists without a COUNT.
+        if self.limit is None:
+            return self
+        return replace(self, limit=self.limit + 1)
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+from bitcoin_wallet.core.statistics.platform_statistics import Granularity
+
+
+@dataclass(frozen=True)
+class StatisticsWindow:
+    start: int
+    end: int
+    granularity: Granularity
@@ -4,5 +4,5 @@ from dataclasses import dataclass
 @dataclass
 class WalletDTO:
     wallet_id: int
-    balance_in_btc: float
-    balance_in_usd: float
+    balance: int
+    btc_to_usd: float
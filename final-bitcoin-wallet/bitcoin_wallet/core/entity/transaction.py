@@ -6,7 +6,7 @@ class BaseTransaction:
     id: int
     from_wallet_id: int
     to_wallet_id: int
-    amount_transferred: float
+    amount_transferred: int
 
     def __init__(self) -> None:
         pass
@@ -17,8 +17,8 @@ class BtcTransaction(BaseTransaction):
     id: int
     from_wallet_id: int
     to_wallet_id: int
-    amount_transferred: float
-    lost_amount: float
+    amount_transferred: int
+    lost_amount: int
 
     def __hash__(self) -> int:
         return hash(self.id)
@@ -14,9 +14,7 @@ class BaseUser:
 class BtcUser(BaseUser):
     id: int
     mail: str
-    first_wallet_id: int = field(default=0)
-    second_wallet_id: int = field(default=0)
-    third_wallet_id: int = field(default=0)
+    wallet_ids: list[int] = field(default_factory=list)
 
     def __hash__(self) -> int:
         return hash(self.id)
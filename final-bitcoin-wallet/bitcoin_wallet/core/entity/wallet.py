@@ -13,7 +13,7 @@ class BaseWallet:
 class BtcWallet(BaseWallet):
     id: int
     user_id: int
-    balance: float
+    balance: int
 
     def __hash__(self) -> int:
         return hash(self.id)
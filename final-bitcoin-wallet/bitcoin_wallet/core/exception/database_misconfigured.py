@@ -0,0 +1,6 @@
+class DatabaseMisconfiguredException(Exception):
+    def __init__(self, pragma: str, expected: object, actual: object) -> None:
+        self.pragma = pragma
+        self.expected = expected
+        self.actual = actual
+        super().__init__(f"PRAGMA {pragma} is {actual}, expected {expected}")
@@ -0,0 +1,6 @@
+class IdempotencyKeyReusedException(Exception):
+    def __init__(self, key: str) -> None:
+        self.key = key
+        super().__init__(
+            f"Idempotency key {key!r} was already used for a different transfer."
+        )
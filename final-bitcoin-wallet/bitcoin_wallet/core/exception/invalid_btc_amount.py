@@ -0,0 +1,6 @@
+class InvalidBtcAmountException(Exception):
+    def __init__(self, amount: object) -> None:
+        self.amount = amount
+        super().__init__(
+            f"BTC amounts must be finite with at most 8 decimal places, got {amount}"
+        )
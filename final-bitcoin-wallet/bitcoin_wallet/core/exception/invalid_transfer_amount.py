@@ -0,0 +1,4 @@
+class InvalidTransferAmountException(Exception):
+    def __init__(self, amount: int) -> None:
+        self.amount = amount
+        super().__init__(f"Transfer amount must be positive, got {amount}")
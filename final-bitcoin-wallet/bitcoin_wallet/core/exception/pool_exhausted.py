@@ -0,0 +1,4 @@
+class ConnectionPoolExhaustedException(Exception):
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        super().__init__(f"No database connection became available in {timeout}s")
@@ -0,0 +1,4 @@
+class PriceUnavailableException(Exception):
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+        super().__init__(f"BTC/USD price is unavailable: {reason}")
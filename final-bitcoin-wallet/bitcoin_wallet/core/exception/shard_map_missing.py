@@ -0,0 +1,4 @@
+class ShardMapMissingException(Exception):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        super().__init__(f"No shard map at {path}; run `shard init` first.")
@@ -0,0 +1,5 @@
+class ShardNotSplittableException(Exception):
+    def __init__(self, shard: str, reason: str) -> None:
+        self.shard = shard
+        self.reason = reason
+        super().__init__(f"Cannot split {shard}: {reason}")
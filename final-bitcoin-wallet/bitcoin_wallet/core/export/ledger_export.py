@@ -0,0 +1,56 @@
+from enum import Enum
+from typing import Iterable, Iterator
+
+from bitcoin_wallet.core.entity.transaction import BtcTransaction
+
+EXPORT_FIELDS = (
+    "transaction_id",
+    "from_wallet_id",
+    "to_wallet_id",
+    "amount_transferred",
+    "lost_amount",
+)
+# Every exported column is an integer (amounts in satoshis), so neither format
+# needs escaping and a row template is enough.
+NDJSON_ROW = "{" + ",".join(f'"{name}":%d' for name in EXPORT_FIELDS) + "}\n"
+CSV_ROW = ",".join("%d" for _ in EXPORT_FIELDS) + "\n"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        return "application/x-ndjson" if self is ExportFormat.NDJSON else "text/csv"
+
+
+def export_header(export_format: ExportFormat) -> str:
+    if export_format is ExportFormat.CSV:
+        return ",".join(EXPORT_FIELDS) + "\n"
+    return ""
+
+
+def export_batch(batch: list[BtcTransaction], export_format: ExportFormat) -> str:
+    row = NDJSON_ROW if export_format is ExportFormat.NDJSON else CSV_ROW
+    return "".join(
+        row
+        % (
+            transaction.id,
+            transaction.from_wallet_id,
+            transaction.to_wallet_id,
+            transaction.amount_transferred,
+            transaction.lost_amount,
+        )
+        for transaction in batch
+    )
+
+
+def export_transactions(
+    batches: Iterable[list[BtcTransaction]], export_format: ExportFormat
+) -> Iterator[str]:
+    header = export_header(export_format)
+    if header:
+        yield header
+    for batch in batches:
+        yield export_batch(batch, export_format)
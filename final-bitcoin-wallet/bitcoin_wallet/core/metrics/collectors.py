@@ -0,0 +1,137 @@
+from typing import Callable, Protocol
+
+from bitcoin_wallet.core.currencyconverter.cached_converter import CachedConverter
+from bitcoin_wallet.core.currencyconverter.price_feed import PriceFeed
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.metrics.registry import MetricsRegistry
+from bitcoin_wallet.core.shard.outbox import OutboxRelay
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+from bitcoin_wallet.core.transfer.group_commit import TransferWriter
+
+# Components keep their own counters; these read them when /metrics is scraped,
+# so the hot paths pay nothing extra.
+
+
+class CacheCounts(Protocol):
+    hits: int
+    misses: int
+
+
+class Cache(Protocol):
+    def metrics(self) -> CacheCounts:
+        pass
+
+
+def track_pool(registry: MetricsRegistry, pool: ConnectionPool) -> None:
+    _track_pool(registry, pool)
+
+
+def track_shard_pools(registry: MetricsRegistry, pools: ShardPools) -> None:
+    for shard, pool in pools.items():
+        _track_pool(registry, pool, shard)
+
+
+def _track_pool(
+    registry: MetricsRegistry, pool: ConnectionPool, shard: str | None = None
+) -> None:
+    label_names = () if shard is None else ("shard",)
+    labels = () if shard is None else (shard,)
+    registry.counter(
+        "sqlite_pool_checkouts_total",
+        "Connections handed out by the pool.",
+        label_names,
+    ).labels(*labels).set_function(lambda: pool.metrics().checkouts)
+    registry.gauge(
+        "sqlite_pool_in_use", "Connections currently checked out.", label_names
+    ).labels(*labels).set_function(lambda: pool.metrics().in_use)
+    registry.counter(
+        "sqlite_pool_wait_seconds_total",
+        "Time spent waiting for a free connection.",
+        label_names,
+    ).labels(*labels).set_function(lambda: pool.metrics().total_wait_seconds)
+    registry.gauge(
+        "sqlite_pool_max_wait_seconds",
+        "Longest wait for a free connection.",
+        label_names,
+    ).labels(*labels).set_function(lambda: pool.metrics().max_wait_seconds)
+
+
+def track_group_commit(registry: MetricsRegistry, writer: TransferWriter) -> None:
+    registry.counter(
+        "transfer_batches_total", "Group-commit batches written."
+    ).labels().set_function(lambda: writer.metrics().batches)
+    registry.counter(
+        "transfer_batch_transfers_total", "Transfers committed through the writer."
+    ).labels().set_function(lambda: writer.metrics().transfers)
+    registry.counter(
+        "transfer_batch_failures_total", "Batches rolled back as a whole."
+    ).labels().set_function(lambda: writer.metrics().failed_batches)
+    registry.counter(
+        "transfer_batch_locked_total",
+        "Batches rolled back because the database was locked.",
+    ).labels().set_function(lambda: writer.metrics().locked_batches)
+    registry.counter(
+        "transfer_batch_commit_seconds_total", "Time spent writing batches."
+    ).labels().set_function(lambda: writer.metrics().commit_seconds)
+
+
+def track_outbox(registry: MetricsRegistry, relay: OutboxRelay) -> None:
+    registry.counter(
+        "shard_transfers_relayed_total", "Cross-shard credits delivered."
+    ).labels().set_function(lambda: relay.metrics().delivered)
+    registry.counter(
+        "shard_relay_failures_total", "Relay passes that hit a database error."
+    ).labels().set_function(lambda: relay.metrics().failures)
+
+
+def track_cache(registry: MetricsRegistry, name: str, cache: Cache) -> None:
+    registry.counter("cache_hits_total", "Cache lookups served.", ("cache",)).labels(
+        name
+    ).set_function(lambda: cache.metrics().hits)
+    registry.counter(
+        "cache_misses_total", "Cache lookups that fell through.", ("cache",)
+    ).labels(name).set_function(lambda: cache.metrics().misses)
+    registry.gauge(
+        "cache_hit_ratio", "Hits over lookups since start.", ("cache",)
+    ).labels(name).set_function(lambda: _hit_ratio(cache.metrics()))
+
+
+def track_price_cache(registry: MetricsRegistry, converter: CachedConverter) -> None:
+    track_cache(registry, "price", converter)
+    _track_upstream(
+        registry,
+        lambda: converter.metrics().upstream_calls,
+        lambda: converter.metrics().upstream_failures,
+        lambda: converter.metrics().upstream_seconds,
+    )
+
+
+def track_price_feed(registry: MetricsRegistry, feed: PriceFeed) -> None:
+    _track_upstream(
+        registry,
+        lambda: feed.metrics().polls,
+        lambda: feed.metrics().failures,
+        lambda: feed.metrics().upstream_seconds,
+    )
+
+
+def _track_upstream(
+    registry: MetricsRegistry,
+    calls: Callable[[], float],
+    failures: Callable[[], float],
+    seconds: Callable[[], float],
+) -> None:
+    registry.counter(
+        "price_upstream_requests_total", "Requests made to the price source."
+    ).labels().set_function(calls)
+    registry.counter(
+        "price_upstream_failures_total", "Price source requests that failed."
+    ).labels().set_function(failures)
+    registry.counter(
+        "price_upstream_seconds_total", "Time spent waiting on the price source."
+    ).labels().set_function(seconds)
+
+
+def _hit_ratio(counts: CacheCounts) -> float:
+    lookups = counts.hits + counts.misses
+    return counts.hits / lookups if lookups else 0.0
@@ -0,0 +1,29 @@
+from decimal import Decimal, InvalidOperation
+
+from bitcoin_wallet.core.config.constants import (
+    SATOSHIS_PER_BTC,
+    TRANSFER_FEE_BASIS_POINTS,
+)
+from bitcoin_wallet.core.exception.invalid_btc_amount import InvalidBtcAmountException
+
+BASIS_POINTS = 10_000
+
+
+def btc_to_satoshi(amount: float | int | str) -> int:
+    # Parsed through str so 0.1 means 10_000_000 satoshis, not the binary float.
+    try:
+        satoshis = Decimal(str(amount)) * SATOSHIS_PER_BTC
+    except InvalidOperation as ex:
+        raise InvalidBtcAmountException(amount) from ex
+    if not satoshis.is_finite() or satoshis != satoshis.to_integral_value():
+        raise InvalidBtcAmountException(amount)
+    return int(satoshis)
+
+
+def satoshi_to_btc(satoshis: int) -> float:
+    return satoshis / SATOSHIS_PER_BTC
+
+
+def transfer_fee(amount: int) -> int:
+    # Rounded half up to the nearest satoshi.
+    return (amount * TRANSFER_FEE_BASIS_POINTS + BASIS_POINTS // 2) // BASIS_POINTS
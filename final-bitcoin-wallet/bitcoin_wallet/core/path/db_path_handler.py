@@ -1,5 +1,11 @@
 import os
 
+# db_init.sql ships next to the bitcoin_wallet package.
+PACKAGE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+SCHEMA_PATH = os.path.join(os.path.dirname(PACKAGE_DIR), "db_init.sql")
+
 
 class DatabasePathHandler:
     @staticmethod
@@ -7,3 +13,7 @@ class DatabasePathHandler:
         db_filename = f"../../{db_filename}"
         main_dir = os.path.dirname(os.path.abspath(__file__))
         return os.path.join(main_dir, db_filename)
+
+    @staticmethod
+    def get_schema_path() -> str:
+        return SCHEMA_PATH
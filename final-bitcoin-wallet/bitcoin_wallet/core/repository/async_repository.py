@@ -0,0 +1,225 @@
+import asyncio
+from typing import AsyncIterator, Generator, List
+
+from bitcoin_wallet.core.currencyconverter.convert_api import ConvertBitcoinToUsd
+from bitcoin_wallet.core.database.executor import DatabaseExecutor
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.core.dto.page_request import PageRequest
+from bitcoin_wallet.core.dto.statistics_window import StatisticsWindow
+from bitcoin_wallet.core.dto.wallet_dto import WalletDTO
+from bitcoin_wallet.core.entity.transaction import BtcTransaction
+from bitcoin_wallet.core.entity.user import BaseUser
+from bitcoin_wallet.core.repository.statistics_repository import (
+    BaseStatisticsRepository,
+)
+from bitcoin_wallet.core.repository.transaction_repository import (
+    EXPORT_BATCH_SIZE,
+    UNBOUNDED_PAGE,
+    BaseTransactionRepository,
+)
+from bitcoin_wallet.core.repository.user_repository import BaseUserRepository
+from bitcoin_wallet.core.repository.wallet_repository import BaseWalletRepository
+from bitcoin_wallet.core.statistics.platform_statistics import (
+    PlatformStatistics,
+    StatisticsBucket,
+)
+from bitcoin_wallet.core.transfer.batch_transfer import (
+    BatchMode,
+    LegResult,
+    TransferLeg,
+)
+from bitcoin_wallet.core.transfer.group_commit import TransferWriter
+from bitcoin_wallet.core.transfer.idempotency import (
+    IdempotencyCache,
+    IdempotencyKey,
+    IdempotentResult,
+)
+
+
+class AsyncUserRepository:
+    def __init__(
+        self, repository: BaseUserRepository, executor: DatabaseExecutor
+    ) -> None:
+        self.repository = repository
+        self.executor = executor
+
+    async def create(self, user: BaseUser) -> int:
+        return await self.executor.write(self.repository.create, user)
+
+    async def read(self, user_id: int) -> BaseUser:
+        return await self.executor.read(self.repository.read, user_id)
+
+    async def read_all(self) -> list[BaseUser]:
+        return await self.executor.read(self.repository.read_all)
+
+    async def load_auth_context(self, user_id: int) -> AuthContext:
+        return await self.executor.read(self.repository.load_auth_context, user_id)
+
+
+class AsyncWalletRepository:
+    def __init__(
+        self,
+        repository: BaseWalletRepository,
+        executor: DatabaseExecutor,
+        converter: ConvertBitcoinToUsd,
+    ) -> None:
+        self.repository = repository
+        self.executor = executor
+        self.converter = converter
+
+    async def create_wallet(
+        self, owner: AuthContext, initial_balance: int
+    ) -> WalletDTO:
+        # Quoted off the single writer thread: a fallback to the upstream API
+        # would otherwise hold up every write queued behind it.
+        btc_to_usd = await asyncio.to_thread(self.converter.convert_btc_to_usd)
+        return await self.executor.write(
+            self.repository.create_wallet, owner, initial_balance, btc_to_usd
+        )
+
+    async def retrieve_wallet_info(
+        self, owner: AuthContext, wallet_id: int
+    ) -> WalletDTO | None:
+        return await self.executor.read(
+            self.repository.retrieve_wallet_info, owner, wallet_id
+        )
+
+    async def authorize_user(self, user_id: int) -> bool:
+        return await self.executor.read(self.repository.authorize_user, user_id)
+
+
+class AsyncTransactionRepository:
+    def __init__(
+        self,
+        repository: BaseTransactionRepository,
+        executor: DatabaseExecutor,
+        writer: TransferWriter | None = None,
+        idempotency_cache: IdempotencyCache | None = None,
+    ) -> None:
+        self.repository = repository
+        self.executor = executor
+        self.writer = writer
+        self.idempotency_cache = idempotency_cache
+
+    async def make_transaction(
+        self,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+        idempotency_key: IdempotencyKey | None = None,
+    ) -> int | None:
+        cache = self.idempotency_cache
+        if idempotency_key is not None and cache is not None:
+            cached = cache.get(idempotency_key)
+            if cached is not None:
+                return cached.replay(from_wallet_id, to_wallet_id, amount_transferred)
+
+        transaction_id = await self._transfer(
+            from_wallet_id, to_wallet_id, amount_transferred, idempotency_key
+        )
+        if idempotency_key is not None and cache is not None and transaction_id:
+            cache.put(
+                IdempotentResult(
+                    idempotency_key,
+                    from_wallet_id,
+                    to_wallet_id,
+                    amount_transferred,
+                    transaction_id,
+                )
+            )
+        return transaction_id
+
+    async def _transfer(
+        self,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+        idempotency_key: IdempotencyKey | None,
+    ) -> int | None:
+        if self.writer is not None:
+            return await self.writer.transfer(
+                from_wallet_id, to_wallet_id, amount_transferred, idempotency_key
+            )
+        return await self.executor.write(
+            self.repository.make_transaction,
+            from_wallet_id,
+            to_wallet_id,
+            amount_transferred,
+            idempotency_key,
+        )
+
+    async def make_batch_transaction(
+        self, from_wallet_id: int, legs: List[TransferLeg], mode: BatchMode
+    ) -> List[LegResult]:
+        # Already one transaction for the whole batch, so it skips the
+        # group-commit queue.
+        return await self.executor.write(
+            self.repository.make_batch_transaction, from_wallet_id, legs, mode
+        )
+
+    async def get_user_transactions(
+        self, owner: AuthContext, page: PageRequest = UNBOUNDED_PAGE
+    ) -> List[BtcTransaction]:
+        return await self.executor.read(
+            self.repository.get_user_transactions, owner, page
+        )
+
+    async def get_wallet_transactions(
+        self, wallet_id: int, page: PageRequest = UNBOUNDED_PAGE
+    ) -> List[BtcTransaction]:
+        return await self.executor.read(
+            self.repository.get_wallet_transactions, wallet_id, page
+        )
+
+    async def iter_user_transactions(
+        self, owner: AuthContext, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[List[BtcTransaction]]:
+        batches = self.repository.iter_user_transactions(owner, batch_size)
+        return self._iterate(batches)
+
+    async def iter_wallet_transactions(
+        self, wallet_id: int, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[List[BtcTransaction]]:
+        batches = self.repository.iter_wallet_transactions(wallet_id, batch_size)
+        return self._iterate(batches)
+
+    async def _iterate(
+        self, batches: Generator[List[BtcTransaction], None, None]
+    ) -> AsyncIterator[List[BtcTransaction]]:
+        # Each batch is fetched on a reader thread; between batches the
+        # generator holds no connection, so closing it does no I/O.
+        try:
+            while batch := await self.executor.read(next, batches, []):
+                yield batch
+        finally:
+            batches.close()
+
+    async def authorize_transaction(self, from_wallet_id: int, user_id: int) -> bool:
+        return await self.executor.read(
+            self.repository.authorize_transaction, from_wallet_id, user_id
+        )
+
+    async def sweep_idempotency_keys(self, before: int, limit: int) -> int:
+        return await self.executor.write(
+            self.repository.sweep_idempotency_keys, before, limit
+        )
+
+    async def read_all(self) -> list[BtcTransaction]:
+        return await self.executor.read(self.repository.read_all)
+
+
+class AsyncStatisticsRepository:
+    def __init__(
+        self, repository: BaseStatisticsRepository, executor: DatabaseExecutor
+    ) -> None:
+        self.repository = repository
+        self.executor = executor
+
+    async def read(self) -> PlatformStatistics:
+        return await self.executor.read(self.repository.read)
+
+    async def read_buckets(self, window: StatisticsWindow) -> list[StatisticsBucket]:
+        return await self.executor.read(self.repository.read_buckets, window)
+
+    async def rebuild(self) -> PlatformStatistics:
+        return await self.executor.write(self.repository.rebuild)
@@ -0,0 +1,246 @@
+import sqlite3
+from itertools import chain
+from sqlite3 import Cursor
+from typing import Generator, Iterable, List, Optional
+
+from bitcoin_wallet.core.cache.ownership_cache import OwnershipCache
+from bitcoin_wallet.core.currencyconverter.convert_api import ConvertBitcoinToUsd
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.core.dto.page_request import PageRequest
+from bitcoin_wallet.core.dto.statistics_window import StatisticsWindow
+from bitcoin_wallet.core.dto.wallet_dto import WalletDTO
+from bitcoin_wallet.core.entity.transaction import BtcTransaction
+from bitcoin_wallet.core.entity.user import BaseUser
+from bitcoin_wallet.core.repository.statistics_repository import (
+    BtcStatisticsRepository,
+)
+from bitcoin_wallet.core.repository.transaction_repository import (
+    EXPORT_BATCH_SIZE,
+    UNBOUNDED_PAGE,
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.repository.user_repository import BtcUserRepository
+from bitcoin_wallet.core.repository.wallet_repository import BtcWalletRepository
+from bitcoin_wallet.core.shard.placement import ShardPlacement
+from bitcoin_wallet.core.shard.shard_map import (
+    bucket_for_mail,
+    bucket_of,
+    bucket_range,
+)
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+from bitcoin_wallet.core.statistics.platform_statistics import (
+    PlatformStatistics,
+    StatisticsBucket,
+)
+from bitcoin_wallet.core.transfer.batch_transfer import (
+    BatchMode,
+    LegResult,
+    TransferLeg,
+)
+from bitcoin_wallet.core.transfer.idempotency import IdempotencyKey
+
+# Users get ids in their mail's bucket and wallets in their owner's, so all of
+# a user's wallets, and so their whole history, live on one shard. Each id is
+# taken under the statement's own write lock.
+
+
+class BucketUserRepository(BtcUserRepository):
+    def _insert_user(self, cursor: Cursor, mail: str) -> None:
+        first, last = bucket_range(bucket_for_mail(mail))
+        cursor.execute(
+            "INSERT INTO users (id, mail) SELECT COALESCE(MAX(id), ?) + 1, ? "
+            "FROM users WHERE id BETWEEN ? AND ?",
+            (first - 1, mail, first, last),
+        )
+
+
+class BucketWalletRepository(BtcWalletRepository):
+    def _insert_wallet(
+        self, cur: sqlite3.Cursor, user_id: int, initial_balance: int
+    ) -> None:
+        first, last = bucket_range(bucket_of(user_id))
+        cur.execute(
+            "INSERT INTO wallets (id, user_id, balance, minted) "
+            "SELECT COALESCE(MAX(id), ?) + 1, ?, ?, ? FROM wallets "
+            "WHERE id BETWEEN ? AND ?",
+            (first - 1, user_id, initial_balance, initial_balance, first, last),
+        )
+
+
+class ShardedUserRepository:
+    def __init__(
+        self, pools: ShardPools, ownership_cache: Optional[OwnershipCache] = None
+    ) -> None:
+        self.shard_map = pools.shard_map
+        self.shards = {
+            shard: BucketUserRepository(pool=pool, ownership_cache=ownership_cache)
+            for shard, pool in pools.items()
+        }
+
+    def create(self, user: BaseUser) -> int:
+        shard = self.shard_map.shard_for_bucket(bucket_for_mail(user.mail))
+        return self.shards[shard].create(user)
+
+    def read(self, user_id: int) -> BaseUser:
+        return self._for(user_id).read(user_id)
+
+    def read_all(self) -> list[BaseUser]:
+        users = chain.from_iterable(shard.read_all() for shard in self.shards.values())
+        return sorted(users, key=lambda user: user.id)
+
+    def load_auth_context(self, user_id: int) -> AuthContext:
+        return self._for(user_id).load_auth_context(user_id)
+
+    def update(self, user: BaseUser) -> None:
+        pass
+
+    def delete(self, user_id: int) -> None:
+        pass
+
+    def _for(self, user_id: int) -> BucketUserRepository:
+        return self.shards[self.shard_map.shard_for(user_id)]
+
+
+class ShardedWalletRepository:
+    def __init__(
+        self,
+        pools: ShardPools,
+        converter: Optional[ConvertBitcoinToUsd] = None,
+        ownership_cache: Optional[OwnershipCache] = None,
+    ) -> None:
+        self.shard_map = pools.shard_map
+        self.shards = {
+            shard: BucketWalletRepository(
+                pool=pool, converter=converter, ownership_cache=ownership_cache
+            )
+            for shard, pool in pools.items()
+        }
+
+    def create_wallet(
+        self,
+        owner: AuthContext,
+        initial_balance: int,
+        btc_to_usd: Optional[float] = None,
+    ) -> WalletDTO:
+        return self._for(owner.user_id).create_wallet(
+            owner, initial_balance, btc_to_usd
+        )
+
+    def retrieve_wallet_info(
+        self, owner: AuthContext, wallet_id: int
+    ) -> WalletDTO | None:
+        # An owned wallet is on the owner's shard; any other is refused there.
+        return self._for(owner.user_id).retrieve_wallet_info(owner, wallet_id)
+
+    def authorize_user(self, user_id: int) -> bool:
+        return self._for(user_id).authorize_user(user_id)
+
+    def _for(self, user_id: int) -> BucketWalletRepository:
+        return self.shards[self.shard_map.shard_for(user_id)]
+
+
+class ShardedTransactionRepository:
+    def __init__(self, pools: ShardPools, idempotency_ttl: float = 86_400.0) -> None:
+        self.shard_map = pools.shard_map
+        self.shards = {
+            shard: BtcTransactionRepository(
+                pool=pool,
+                placement=ShardPlacement(pools, shard),
+                idempotency_ttl=idempotency_ttl,
+            )
+            for shard, pool in pools.items()
+        }
+
+    def make_transaction(
+        self,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+        idempotency_key: Optional[IdempotencyKey] = None,
+    ) -> Optional[int]:
+        return self._for(from_wallet_id).make_transaction(
+            from_wallet_id, to_wallet_id, amount_transferred, idempotency_key
+        )
+
+    def make_batch_transaction(
+        self, from_wallet_id: int, legs: List[TransferLeg], mode: BatchMode
+    ) -> List[LegResult]:
+        return self._for(from_wallet_id).make_batch_transaction(
+            from_wallet_id, legs, mode
+        )
+
+    def get_user_transactions(
+        self, owner: AuthContext, page: PageRequest = UNBOUNDED_PAGE
+    ) -> List[BtcTransaction]:
+        return self._for(owner.user_id).get_user_transactions(owner, page)
+
+    def get_wallet_transactions(
+        self, wallet_id: int, page: PageRequest = UNBOUNDED_PAGE
+    ) -> List[BtcTransaction]:
+        return self._for(wallet_id).get_wallet_transactions(wallet_id, page)
+
+    def iter_user_transactions(
+        self, owner: AuthContext, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Generator[List[BtcTransaction], None, None]:
+        return self._for(owner.user_id).iter_user_transactions(owner, batch_size)
+
+    def iter_wallet_transactions(
+        self, wallet_id: int, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Generator[List[BtcTransaction], None, None]:
+        return self._for(wallet_id).iter_wallet_transactions(wallet_id, batch_size)
+
+    def authorize_transaction(self, from_wallet_id: int, user_id: int) -> bool:
+        return self._for(user_id).authorize_transaction(from_wallet_id, user_id)
+
+    def sweep_idempotency_keys(self, before: int, limit: int) -> int:
+        return sum(
+            shard.sweep_idempotency_keys(before, limit)
+            for shard in self.shards.values()
+        )
+
+    def read_all(self) -> list[BtcTransaction]:
+        # A cross-shard transfer is on both shards; keep one copy.
+        transactions = {
+            transaction.id: transaction
+            for shard in self.shards.values()
+            for transaction in shard.read_all()
+        }
+        return [transactions[key] for key in sorted(transactions)]
+
+    def _for(self, entity_id: int) -> BtcTransactionRepository:
+        return self.shards[self.shard_map.shard_for(entity_id)]
+
+
+class ShardedStatisticsRepository:
+    # Each shard counts the transfers it sent, so the platform is the sum.
+
+    def __init__(self, pools: ShardPools) -> None:
+        self.shards = [BtcStatisticsRepository(pool=pool) for _, pool in pools.items()]
+
+    def read(self) -> PlatformStatistics:
+        return _total(shard.read() for shard in self.shards)
+
+    def read_buckets(self, window: StatisticsWindow) -> list[StatisticsBucket]:
+        totals: dict[int, StatisticsBucket] = {}
+        for shard in self.shards:
+            for bucket in shard.read_buckets(window):
+                seen = totals.get(bucket.start, StatisticsBucket(bucket.start, 0, 0, 0))
+                totals[bucket.start] = StatisticsBucket(
+                    bucket.start,
+                    seen.transactions + bucket.transactions,
+                    seen.fees + bucket.fees,
+                    seen.volume + bucket.volume,
+                )
+        return [totals[start] for start in sorted(totals)]
+
+    def rebuild(self) -> PlatformStatistics:
+        return _total(shard.rebuild() for shard in self.shards)
+
+
+def _total(parts: Iterable[PlatformStatistics]) -> PlatformStatistics:
+    transactions = fees = volume = 0
+    for part in parts:
+        transactions += part.transactions
+        fees += part.fees
+        volume += part.volume
+    return PlatformStatistics(transactions, fees, volume)
@@ -0,0 +1,45 @@
+from typing import Optional, Protocol
+
+from bitcoin_wallet.core.config.constants import DB_FILENAME
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.dto.statistics_window import StatisticsWindow
+from bitcoin_wallet.core.path.db_path_handler import DatabasePathHandler
+from bitcoin_wallet.core.statistics.platform_statistics import (
+    PlatformStatistics,
+    StatisticsBucket,
+    read_buckets,
+    read_statistics,
+    rebuild_statistics,
+)
+
+
+class BaseStatisticsRepository(Protocol):
+    def read(self) -> PlatformStatistics:
+        pass
+
+    def read_buckets(self, window: StatisticsWindow) -> list[StatisticsBucket]:
+        pass
+
+    def rebuild(self) -> PlatformStatistics:
+        pass
+
+
+class BtcStatisticsRepository(BaseStatisticsRepository):
+    def __init__(
+        self, db_file: str = DB_FILENAME, pool: Optional[ConnectionPool] = None
+    ) -> None:
+        self.pool = pool or ConnectionPool(DatabasePathHandler.get_db_path(db_file))
+
+    def read(self) -> PlatformStatistics:
+        with self.pool.connection() as conn:
+            return read_statistics(conn)
+
+    def read_buckets(self, window: StatisticsWindow) -> list[StatisticsBucket]:
+        with self.pool.connection() as conn:
+            return read_buckets(conn, window.start, window.end, window.granularity)
+
+    def rebuild(self) -> PlatformStatistics:
+        # The write lock keeps transfers out while the ledger is summed.
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return rebuild_statistics(conn)
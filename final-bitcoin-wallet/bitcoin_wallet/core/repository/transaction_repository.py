@@ -1,159 +1,208 @@
-import sqlite3
+import json
+from dataclasses import replace
 from sqlite3 import Cursor
-from typing import List, Optional, Protocol
+from typing import Generator, List, Optional, Protocol
 
+from bitcoin_wallet.core.config.constants import DB_FILENAME
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.core.dto.page_request import PageRequest
 from bitcoin_wallet.core.entity.transaction import BtcTransaction
-from bitcoin_wallet.core.exception.not_enough_balance import NotEnoughBalanceException
-from bitcoin_wallet.core.exception.same_transfer_wallets import (
-    SameTransferWalletsException,
-)
-from bitcoin_wallet.core.exception.user_not_found import UserNotFoundException
 from bitcoin_wallet.core.path.db_path_handler import DatabasePathHandler
+from bitcoin_wallet.core.transfer.batch_transfer import (
+    BatchMode,
+    BatchTransferEngine,
+    LegResult,
+    TransferLeg,
+)
+from bitcoin_wallet.core.transfer.idempotency import IdempotencyKey, sweep_expired
+from bitcoin_wallet.core.transfer.placement import LocalPlacement
+from bitcoin_wallet.core.transfer.transfer_engine import TransferEngine
+
+TRANSACTION_COLUMNS = (
+    "SELECT id, from_wallet_id, to_wallet_id, amount_transferred, lost_amount "
+    "FROM transactions"
+)
+WALLET_FILTER = "= ?"
+OWNED_WALLETS_FILTER = "IN (SELECT value FROM json_each(?))"
+ID_RANGE = "AND id > ? AND id < ?"
+MAX_TRANSACTION_ID = 2**63 - 1
+UNBOUNDED_PAGE = PageRequest()
+EXPORT_BATCH_SIZE = 1000
 
 
 class BaseTransactionRepository(Protocol):
     def make_transaction(
-        self, from_wallet_id: int, to_wallet_id: int, amount_transferred: float
+        self,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+        idempotency_key: Optional[IdempotencyKey] = None,
     ) -> Optional[int]:
         pass
 
-    def get_user_transactions(self, user_id: int) -> List[BtcTransaction]:
+    def make_batch_transaction(
+        self, from_wallet_id: int, legs: List[TransferLeg], mode: BatchMode
+    ) -> List[LegResult]:
+        pass
+
+    def get_user_transactions(
+        self, owner: AuthContext, page: PageRequest = UNBOUNDED_PAGE
+    ) -> List[BtcTransaction]:
         pass
 
-    def get_wallet_transactions(self, wallet_id: int) -> List[BtcTransaction]:
+    def get_wallet_transactions(
+        self, wallet_id: int, page: PageRequest = UNBOUNDED_PAGE
+    ) -> List[BtcTransaction]:
+        pass
+
+    def iter_user_transactions(
+        self, owner: AuthContext, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Generator[List[BtcTransaction], None, None]:
+        pass
+
+    def iter_wallet_transactions(
+        self, wallet_id: int, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Generator[List[BtcTransaction], None, None]:
         pass
 
     def authorize_transaction(self, from_wallet_id: int, user_id: int) -> bool:
         pass
 
+    def sweep_idempotency_keys(self, before: int, limit: int) -> int:
+        pass
+
     def read_all(self) -> list[BtcTransaction]:
         pass
 
 
 class BtcTransactionRepository(BaseTransactionRepository):
-    def __init__(self, db_file: str = "bitcoin_wallet.db") -> None:
-        self.db_name = DatabasePathHandler.get_db_path(db_file)
+    def __init__(
+        self,
+        db_file: str = DB_FILENAME,
+        pool: Optional[ConnectionPool] = None,
+        placement: Optional[LocalPlacement] = None,
+        idempotency_ttl: float = 86_400.0,
+    ) -> None:
+        self.pool = pool or ConnectionPool(DatabasePathHandler.get_db_path(db_file))
+        self.transfer_engine = TransferEngine(
+            placement=placement, idempotency_ttl=idempotency_ttl
+        )
+        self.batch_engine = BatchTransferEngine(placement=placement)
 
     def make_transaction(
-        self, from_wallet_id: int, to_wallet_id: int, amount_transferred: float
+        self,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+        idempotency_key: Optional[IdempotencyKey] = None,
     ) -> Optional[int]:
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT user_id FROM wallets WHERE id IN (?, ?)",
-                (from_wallet_id, to_wallet_id),
-            )
-            user_ids = cursor.fetchall()
-            lost_amount = 0.0
-
-            if len(set(user_ids)) != 1:
-                lost_amount = amount_transferred * 0.015
-
-            if self._get_wallet_balance(from_wallet_id) < amount_transferred:
-                raise NotEnoughBalanceException(from_wallet_id)
-
-            if from_wallet_id == to_wallet_id:
-                raise SameTransferWalletsException(
-                    from_wallet_id=from_wallet_id, to_wallet_id=to_wallet_id
-                )
-            new_balance_to = self._get_wallet_balance(to_wallet_id) + amount_transferred
-            cursor.execute(
-                "UPDATE wallets SET balance = ? WHERE id = ?",
-                (new_balance_to, to_wallet_id),
+        with self.pool.connection() as conn:
+            return self.transfer_engine.transfer(
+                conn, from_wallet_id, to_wallet_id, amount_transferred, idempotency_key
             )
 
-            # Update the balance in the "from" wallet
-            new_balance_from = (
-                self._get_wallet_balance(from_wallet_id) - amount_transferred
-            )
-            cursor.execute(
-                "UPDATE wallets SET balance = ? WHERE id = ?",
-                (new_balance_from, from_wallet_id),
-            )
-
-            cursor.execute(
-                "INSERT INTO transactions (from_wallet_id, to_wallet_id, "
-                "amount_transferred, lost_amount) "
-                "VALUES (?, ?, ?, ?)",
-                (from_wallet_id, to_wallet_id, amount_transferred, lost_amount),
-            )
-            transaction_id = cursor.lastrowid
-            conn.commit()
-
-            return transaction_id if transaction_id is not None else None
-
-    def _fetch_transactions(self, params: tuple[int, int]) -> List[BtcTransaction]:
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id, from_wallet_id, to_wallet_id, "
-                "amount_transferred, lost_amount "
-                "FROM transactions WHERE from_wallet_id = ? OR to_wallet_id = ?",
-                params,
+    def make_batch_transaction(
+        self, from_wallet_id: int, legs: List[TransferLeg], mode: BatchMode
+    ) -> List[LegResult]:
+        with self.pool.connection() as conn:
+            return self.batch_engine.transfer(conn, from_wallet_id, legs, mode)
+
+    def _fetch_transactions(
+        self, wallet_filter: str, owner: int | str, page: PageRequest
+    ) -> List[BtcTransaction]:
+        lower = 0 if page.after is None else page.after
+        upper = MAX_TRANSACTION_ID if page.before is None else page.before
+        order = "DESC" if page.backwards else "ASC"
+        limit = -1 if page.limit is None else page.limit
+        with self.pool.connection() as conn:
+            cursor = conn.execute(
+                f"{_history_query(wallet_filter)} ORDER BY id {order} LIMIT ?",
+                (owner, lower, upper, owner, lower, upper, limit),
             )
             rows = cursor.fetchall()
-            return [BtcTransaction(*row) for row in rows]
-
-    def _get_wallet_balance(self, wallet_id: int) -> float:
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT balance FROM wallets WHERE id = ?", (wallet_id,))
-            current_balance = float(cursor.fetchone()[0])
+        if page.backwards:
+            rows.reverse()
+        return [BtcTransaction(*row) for row in rows]
+
+    def _iter_transactions(
+        self, wallet_filter: str, owner: int | str, batch_size: int
+    ) -> Generator[List[BtcTransaction], None, None]:
+        # Keyset pages, each on a briefly borrowed connection: a slow consumer
+        # holds no pooled connection between batches. Ids only grow, so a
+        # transfer committed mid-export is either appended or already read.
+        page = PageRequest(limit=batch_size)
+        while batch := self._fetch_transactions(wallet_filter, owner, page):
+            yield batch
+            if len(batch) < batch_size:
+                return
+            page = replace(page, after=batch[-1].id)
+
+    def get_user_transactions(
+        self, owner: AuthContext, page: PageRequest = UNBOUNDED_PAGE
+    ) -> List[BtcTransaction]:
+        if not owner.wallet_ids:
+            return []
+        return self._fetch_transactions(
+            OWNED_WALLETS_FILTER, _wallet_ids_json(owner), page
+        )
 
-            return current_balance
+    def get_wallet_transactions(
+        self, wallet_id: int, page: PageRequest = UNBOUNDED_PAGE
+    ) -> List[BtcTransaction]:
+        return self._fetch_transactions(WALLET_FILTER, wallet_id, page)
 
-    def get_user_transactions(self, user_id: int) -> List[BtcTransaction]:
-        user_query = (
-            "SELECT first_wallet_id, second_wallet_id, "
-            "third_wallet_id FROM users WHERE id = ?"
+    def iter_user_transactions(
+        self, owner: AuthContext, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Generator[List[BtcTransaction], None, None]:
+        return self._iter_transactions(
+            OWNED_WALLETS_FILTER, _wallet_ids_json(owner), batch_size
         )
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute(user_query, (user_id,))
-            user_wallets = cursor.fetchone()
-
-            if user_wallets:
-                user_wallets = [
-                    wallet_id for wallet_id in user_wallets if wallet_id is not None
-                ]
-
-                if user_wallets:
-                    transactions = []
-                    for wallet_id in user_wallets:
-                        transactions.extend(
-                            self._fetch_transactions((wallet_id, wallet_id))
-                        )
-
-                    return transactions
-                else:
-                    raise UserNotFoundException(user_id)
-            else:
-                raise UserNotFoundException(user_id)
-
-    def get_wallet_transactions(self, wallet_id: int) -> List[BtcTransaction]:
-        return self._fetch_transactions((wallet_id, wallet_id))
+
+    def iter_wallet_transactions(
+        self, wallet_id: int, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Generator[List[BtcTransaction], None, None]:
+        return self._iter_transactions(WALLET_FILTER, wallet_id, batch_size)
 
     def authorize_transaction(self, from_wallet_id: int, user_id: int) -> bool:
-        with sqlite3.connect(self.db_name) as conn:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT id FROM users WHERE id = ? AND "
-                "(first_wallet_id = ? OR second_wallet_id = ? "
-                "OR third_wallet_id = ?)",
-                (user_id, from_wallet_id, from_wallet_id, from_wallet_id),
+                "SELECT 1 FROM user_wallets WHERE user_id = ? AND wallet_id = ?",
+                (user_id, from_wallet_id),
             )
             authorized_user = cursor.fetchone()
 
             return bool(authorized_user)
 
+    def sweep_idempotency_keys(self, before: int, limit: int) -> int:
+        with self.pool.connection() as conn:
+            return sweep_expired(conn, before, limit)
+
     def read_all(self) -> list[BtcTransaction]:
-        conn = sqlite3.connect(self.db_name)
-        cursor: Cursor = conn.cursor()
-        cursor.execute("SELECT * FROM transactions")
-        rows = cursor.fetchall()
+        with self.pool.connection() as conn:
+            cursor: Cursor = conn.cursor()
+            cursor.execute(TRANSACTION_COLUMNS)
+            rows = cursor.fetchall()
 
         transactions: list[BtcTransaction] = []
         for row in rows:
             transaction = BtcTransaction(*row)
             transactions.append(transaction)
         return transactions
+
+
+def _history_query(wallet_filter: str) -> str:
+    # Two index seeks merged by UNION instead of an OR over both columns;
+    # UNION also drops transfers seen from both sides. The id range lets each
+    # seek stop at the page boundary.
+    return (
+        f"{TRANSACTION_COLUMNS} WHERE from_wallet_id {wallet_filter} {ID_RANGE} "
+        f"UNION {TRANSACTION_COLUMNS} WHERE to_wallet_id {wallet_filter} {ID_RANGE}"
+    )
+
+
+def _wallet_ids_json(owner: AuthContext) -> str:
+    # Bound as one parameter so the statement text does not vary with the
+    # number of wallets a user owns.
+    return json.dumps(sorted(owner.wallet_ids))
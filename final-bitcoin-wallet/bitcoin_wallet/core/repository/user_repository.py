@@ -1,7 +1,15 @@
 import sqlite3
+from itertools import groupby
 from sqlite3 import Cursor
-from typing import Protocol, cast
+from typing import Optional, Protocol, cast
 
+from bitcoin_wallet.core.cache.ownership_cache import (
+    OwnershipCache,
+    bump_wallets_generation,
+)
+from bitcoin_wallet.core.config.constants import DB_FILENAME, MAX_WALLETS_PER_USER
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.dto.auth_context import AuthContext
 from bitcoin_wallet.core.entity.user import BaseUser, BtcUser
 from bitcoin_wallet.core.exception.mail_already_present import (
     MailAlreadyPresentException,
@@ -15,6 +23,11 @@ from bitcoin_wallet.core.exception.wallet_already_present import (
 from bitcoin_wallet.core.path.db_path_handler import DatabasePathHandler
 from bitcoin_wallet.core.validation.email_validator import EmailValidator
 
+USER_WITH_WALLETS = (
+    "SELECT users.id, users.mail, user_wallets.wallet_id FROM users "
+    "LEFT JOIN user_wallets ON user_wallets.user_id = users.id"
+)
+
 
 class BaseUserRepository(Protocol):
     def create(self, user: BaseUser) -> int:
@@ -26,6 +39,9 @@ class BaseUserRepository(Protocol):
     def read_all(self) -> list[BaseUser]:
         pass
 
+    def load_auth_context(self, user_id: int) -> AuthContext:
+        pass
+
     def update(self, user: BaseUser) -> None:
         pass
 
@@ -34,94 +50,113 @@ class BaseUserRepository(Protocol):
 
 
 class BtcUserRepository:
-    WALLET_DEFAULT_ID: int = 0
-
-    def __init__(self, db_file: str = "bitcoin_wallet.db") -> None:
-        self.filename = DatabasePathHandler.get_db_path(db_file)
+    def __init__(
+        self,
+        db_file: str = DB_FILENAME,
+        pool: Optional[ConnectionPool] = None,
+        ownership_cache: Optional[OwnershipCache] = None,
+    ) -> None:
+        self.pool = pool or ConnectionPool(DatabasePathHandler.get_db_path(db_file))
+        self.ownership_cache = ownership_cache
 
     def create(self, user: BaseUser) -> int:
-        conn = sqlite3.connect(self.filename)
-        cursor: Cursor = conn.cursor()
-        find_by_mail_query: str = "SELECT * FROM users WHERE mail = ?"
-        cursor.execute(find_by_mail_query, (user.mail,))
-        mail_exists = cursor.fetchone()
-
-        if mail_exists:
-            raise MailAlreadyPresentException(user.mail)
-
         if not EmailValidator.check_if_mail_valid(user.mail):
             raise MailNotValidException(user.mail)
 
-        cursor.execute("INSERT INTO users (mail) VALUES (?)", (user.mail,))
-        query_result = cursor.execute(find_by_mail_query, (user.mail,)).fetchone()
-        conn.commit()
-        return int(query_result[0])
+        # The unique index on users(mail) rejects duplicates without a pre-scan.
+        try:
+            with self.pool.connection() as conn:
+                cursor: Cursor = conn.cursor()
+                self._insert_user(cursor, user.mail)
+                return int(cursor.lastrowid or 0)
+        except sqlite3.IntegrityError:
+            raise MailAlreadyPresentException(user.mail)
+
+    def _insert_user(self, cursor: Cursor, mail: str) -> None:
+        cursor.execute("INSERT INTO users (mail) VALUES (?)", (mail,))
 
     def read(self, user_id: int) -> BaseUser:
-        conn = sqlite3.connect(self.filename)
-        cursor: Cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-        row = cursor.fetchone()
-        if row:
-            return BtcUser(*row)
+        with self.pool.connection() as conn:
+            cursor: Cursor = conn.cursor()
+            cursor.execute(
+                f"{USER_WITH_WALLETS} WHERE users.id = ? "
+                "ORDER BY user_wallets.wallet_id",
+                (user_id,),
+            )
+            rows = cursor.fetchall()
+        users = self._group_users(rows)
+        if users:
+            return users[0]
         raise UserNotFoundException(user_id)
 
     def read_all(self) -> list[BaseUser]:
-        conn = sqlite3.connect(self.filename)
-        cursor: Cursor = conn.cursor()
-        cursor.execute("SELECT * FROM users")
-        rows = cursor.fetchall()
-
-        users: list[BaseUser] = []
-        for row in rows:
-            user = BtcUser(*row)
-            users.append(user)
-        return users
+        with self.pool.connection() as conn:
+            cursor: Cursor = conn.cursor()
+            cursor.execute(
+                f"{USER_WITH_WALLETS} ORDER BY users.id, user_wallets.wallet_id"
+            )
+            rows = cursor.fetchall()
+        return self._group_users(rows)
+
+    def load_auth_context(self, user_id: int) -> AuthContext:
+        cache = self.ownership_cache
+        if cache is not None:
+            context = cache.get(user_id, lambda: self._wallets_generation(user_id))
+            if context is not None:
+                return context
+
+        # The caller and every wallet they own in a single lookup per request.
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT users.wallets_generation, user_wallets.wallet_id FROM users "
+                "LEFT JOIN user_wallets ON user_wallets.user_id = users.id "
+                "WHERE users.id = ?",
+                (user_id,),
+            ).fetchall()
+        if not rows:
+            raise UserNotFoundException(user_id)
+        context = AuthContext(
+            user_id, frozenset(row[1] for row in rows if row[1] is not None)
+        )
+        if cache is not None:
+            cache.put(context, rows[0][0])
+        return context
+
+    def _wallets_generation(self, user_id: int) -> int | None:
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT wallets_generation FROM users WHERE id = ?", (user_id,)
+            ).fetchone()
+        return None if row is None else int(row[0])
 
     def update(self, user: BaseUser) -> None:
         pass
 
     def register_new_wallet(self, user_id: int, new_wallet_id: int) -> None:
         user: BtcUser = cast(BtcUser, self.read(user_id))
-        if self.WALLET_DEFAULT_ID not in (
-            user.first_wallet_id,
-            user.second_wallet_id,
-            user.third_wallet_id,
-        ):
+        if len(user.wallet_ids) >= MAX_WALLETS_PER_USER:
             raise NoMoreWalletsLeftException(user_id)
 
-        if new_wallet_id in (
-            user.first_wallet_id,
-            user.second_wallet_id,
-            user.third_wallet_id,
-        ):
+        if new_wallet_id in user.wallet_ids:
             raise WalletAlreadyPresentException(user_id, new_wallet_id)
 
-        conn = sqlite3.connect(self.filename)
-        cursor: Cursor = conn.cursor()
-        if user.first_wallet_id == self.WALLET_DEFAULT_ID:
-            cursor.execute(
-                "UPDATE users SET first_wallet_id = ? WHERE id = ?",
-                (new_wallet_id, user_id),
-            )
-            conn.commit()
-            return
-
-        if user.second_wallet_id == self.WALLET_DEFAULT_ID:
+        with self.pool.connection() as conn:
+            cursor: Cursor = conn.cursor()
             cursor.execute(
-                "UPDATE users SET second_wallet_id = ? WHERE id = ?",
-                (new_wallet_id, user_id),
+                "INSERT INTO user_wallets (user_id, wallet_id) VALUES (?, ?)",
+                (user_id, new_wallet_id),
             )
-            conn.commit()
-            return
+            bump_wallets_generation(conn, user_id)
+        if self.ownership_cache is not None:
+            self.ownership_cache.invalidate(user_id)
 
-        if user.third_wallet_id == self.WALLET_DEFAULT_ID:
-            cursor.execute(
-                "UPDATE users SET third_wallet_id = ? WHERE id = ?",
-                (new_wallet_id, user_id),
-            )
-            conn.commit()
-            return
+    @staticmethod
+    def _group_users(rows: list[tuple[int, str, int | None]]) -> list[BaseUser]:
+        users: list[BaseUser] = []
+        for (user_id, mail), user_rows in groupby(rows, key=lambda row: row[:2]):
+            wallet_ids = [row[2] for row in user_rows if row[2] is not None]
+            users.append(BtcUser(user_id, mail, wallet_ids))
+        return users
 
     def delete(self, user_id: int) -> None:
         pass
@@ -1,9 +1,19 @@
 import sqlite3
-from typing import Protocol
+from typing import Optional, Protocol
 
 from fastapi import HTTPException
 
-from bitcoin_wallet.core.currencyconverter.convert_api import BitfinexConverter
+from bitcoin_wallet.core.cache.ownership_cache import (
+    OwnershipCache,
+    bump_wallets_generation,
+)
+from bitcoin_wallet.core.config.constants import DB_FILENAME, MAX_WALLETS_PER_USER
+from bitcoin_wallet.core.currencyconverter.convert_api import (
+    BitfinexConverter,
+    ConvertBitcoinToUsd,
+)
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.dto.auth_context import AuthContext
 from bitcoin_wallet.core.dto.wallet_dto import WalletDTO
 from bitcoin_wallet.core.exception.no_more_wallets import NoMoreWalletsLeftException
 from bitcoin_wallet.core.exception.user_not_found import UserNotFoundException
@@ -12,10 +22,17 @@ from bitcoin_wallet.core.repository.user_repository import BtcUserRepository
 
 
 class BaseWalletRepository(Protocol):
-    def create_wallet(self, user_id: int, initial_balance: int) -> WalletDTO:
+    def create_wallet(
+        self,
+        owner: AuthContext,
+        initial_balance: int,
+        btc_to_usd: Optional[float] = None,
+    ) -> WalletDTO:
         pass
 
-    def retrieve_wallet_info(self, user_id: int, wallet_id: int) -> WalletDTO | None:
+    def retrieve_wallet_info(
+        self, owner: AuthContext, wallet_id: int
+    ) -> WalletDTO | None:
         pass
 
     def authorize_user(self, user_id: int) -> bool:
@@ -23,111 +40,124 @@ class BaseWalletRepository(Protocol):
 
 
 class BtcWalletRepository:
-    def __init__(self, db_file: str = "bitcoin_wallet.db") -> None:
-        self.db_name = DatabasePathHandler.get_db_path(db_file)
-        self.user_repository = BtcUserRepository(db_file=db_file)
-        self.converter = BitfinexConverter()
+    def __init__(
+        self,
+        db_file: str = DB_FILENAME,
+        pool: Optional[ConnectionPool] = None,
+        converter: Optional[ConvertBitcoinToUsd] = None,
+        ownership_cache: Optional[OwnershipCache] = None,
+    ) -> None:
+        self.pool = pool or ConnectionPool(DatabasePathHandler.get_db_path(db_file))
+        self.ownership_cache = ownership_cache
+        self.user_repository = BtcUserRepository(
+            pool=self.pool, ownership_cache=ownership_cache
+        )
+        self.converter = converter or BitfinexConverter()
 
     def setup(self) -> None:
-        with sqlite3.connect(self.db_name) as con:
+        with self.pool.connection() as con:
             cur = con.cursor()
             cur.close()
 
     def authorize_user(self, user_id: int) -> bool:
 
-        with sqlite3.connect(self.db_name) as con:
+        with self.pool.connection() as con:
             cur = con.cursor()
-            try:
-                user = cur.execute(
-                    f"SELECT * FROM users WHERE id = {user_id}"
-                ).fetchone()
-                if user is None:
-                    return False
-            except sqlite3.Error:
-                raise UserNotFoundException(user_id)
+            user = cur.execute(
+                "SELECT 1 FROM users WHERE id = ?", (user_id,)
+            ).fetchone()
+            if user is None:
+                return False
 
             cur.close()
 
             return True
 
-    def create_wallet(self, user_id: int, initial_balance: int) -> WalletDTO:
-
-        with sqlite3.connect(self.db_name) as con:
+    def create_wallet(
+        self,
+        owner: AuthContext,
+        initial_balance: int,
+        btc_to_usd: Optional[float] = None,
+    ) -> WalletDTO:
+        user_id = owner.user_id
+        if len(owner.wallet_ids) >= MAX_WALLETS_PER_USER:
+            raise NoMoreWalletsLeftException(user_id)
+
+        # Priced before the insert so an unavailable quote creates nothing.
+        if btc_to_usd is None:
+            btc_to_usd = self.converter.convert_btc_to_usd()
+
+        with self.pool.connection() as con:
             cur = con.cursor()
             try:
-                user = cur.execute(
-                    f"SELECT * FROM users WHERE id = {user_id}"
-                ).fetchone()
-
-                wallet = ""
-                if user[2] == 0:
-                    wallet = "first_wallet_id"
-                elif user[3] == 0:
-                    wallet = "second_wallet_id"
-                elif user[4] == 0:
-                    wallet = "third_wallet_id"
-                else:
+                # The context may be stale; count again under the write lock so
+                # concurrent requests cannot push a user past the wallet limit.
+                cur.execute("BEGIN IMMEDIATE")
+                owned = cur.execute(
+                    "SELECT COUNT(*) FROM user_wallets WHERE user_id = ?", (user_id,)
+                ).fetchone()[0]
+                if owned >= MAX_WALLETS_PER_USER:
                     raise NoMoreWalletsLeftException(user_id)
+                # The user may have been deleted since the context was loaded.
+                if not bump_wallets_generation(con, user_id):
+                    raise UserNotFoundException(user_id)
 
+                self._insert_wallet(cur, user_id, initial_balance)
+                wallet_id = cur.lastrowid
                 cur.execute(
-                    f"INSERT INTO wallets (user_id, balance) VALUES "
-                    f"({user_id}, {initial_balance})"
-                )
-
-                wallet_id = cur.execute("SELECT last_insert_rowid()").fetchone()[0]
-
-                cur.execute(
-                    f"UPDATE users SET {wallet} = {wallet_id} WHERE id = {user_id}"
+                    "INSERT INTO user_wallets (user_id, wallet_id) VALUES (?, ?)",
+                    (user_id, wallet_id),
                 )
-
-                res = cur.execute(f"SELECT * FROM wallets WHERE id = {wallet_id}")
-
-                wallet = res.fetchone()
-                balance: float = float(wallet[2])
-
-                balance_in_usd = self.converter.convert_btc_to_usd() * balance
-            except sqlite3.Error:
+            except sqlite3.IntegrityError:
+                # Only a constraint means the owner is gone; lock and I/O
+                # errors propagate as they are.
                 raise UserNotFoundException(user_id)
 
             cur.close()
 
-            return WalletDTO(
-                wallet_id=wallet_id,
-                balance_in_btc=balance,
-                balance_in_usd=balance_in_usd,
+        if self.ownership_cache is not None:
+            self.ownership_cache.invalidate(user_id)
+
+        return WalletDTO(
+            wallet_id=int(wallet_id or 0),
+            balance=initial_balance,
+            btc_to_usd=btc_to_usd,
+        )
+
+    def _insert_wallet(
+        self, cur: sqlite3.Cursor, user_id: int, initial_balance: int
+    ) -> None:
+        cur.execute(
+            "INSERT INTO wallets (user_id, balance, minted) VALUES (?, ?, ?)",
+            (user_id, initial_balance, initial_balance),
+        )
+
+    def retrieve_wallet_info(
+        self, owner: AuthContext, wallet_id: int
+    ) -> WalletDTO | None:
+        if not owner.owns(wallet_id):
+            raise HTTPException(
+                status_code=405,
+                detail=f"User does not have access "
+                f"to this wallet with id {wallet_id}.",
             )
 
-    def retrieve_wallet_info(self, user_id: int, wallet_id: int) -> WalletDTO | None:
-        with sqlite3.connect(self.db_name) as con:
+        with self.pool.connection() as con:
             cur = con.cursor()
-            try:
-                user = cur.execute(
-                    f"SELECT * FROM users WHERE id = {user_id}"
-                ).fetchone()
-                if user[2] == wallet_id or user[3] == wallet_id or user[4] == wallet_id:
-                    res = cur.execute(f"SELECT * FROM wallets WHERE id = {wallet_id}")
-                    wallet = res.fetchone()
-                    if wallet is None:
-                        raise HTTPException(
-                            status_code=404,
-                            detail=f"Wallet with ID {wallet_id} not found.",
-                        )
-
-                    balance = wallet[2]
-                    balance_in_usd = self.converter.convert_btc_to_usd() * balance
-                else:
-                    raise HTTPException(
-                        status_code=405,
-                        detail=f"User does not have access "
-                        f"to this wallet with id {wallet_id}.",
-                    )
-            except sqlite3.Error:
-                return None
+            wallet = cur.execute(
+                "SELECT balance FROM wallets WHERE id = ?", (wallet_id,)
+            ).fetchone()
 
             cur.close()
 
-            return WalletDTO(
-                wallet_id=wallet_id,
-                balance_in_btc=balance,
-                balance_in_usd=balance_in_usd,
+        if wallet is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Wallet with ID {wallet_id} not found.",
             )
+
+        return WalletDTO(
+            wallet_id=wallet_id,
+            balance=int(wallet[0]),
+            btc_to_usd=self.converter.convert_btc_to_usd(),
+        )
@@ -0,0 +1,121 @@
+import asyncio
+import sqlite3
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, replace
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+from bitcoin_wallet.core.transfer.placement import LocalPlacement
+
+PENDING_TRANSFERS = (
+    "SELECT id, from_wallet_id, to_wallet_id, amount_transferred, lost_amount, "
+    "created_at FROM transfer_outbox JOIN transactions ON id = transaction_id "
+    "ORDER BY transaction_id LIMIT ?"
+)
+
+
+@dataclass
+class OutboxMetrics:
+    passes: int = 0
+    delivered: int = 0
+    failures: int = 0
+
+
+class OutboxRelay:
+    # Delivery is at least once: the receiving shard records each transfer id
+    # in transfer_inbox in the same transaction as the credit, so a retry after
+    # a crash, or a second relay in another worker, finds it and skips it.
+
+    def __init__(
+        self, pools: ShardPools, batch_size: int = 500, interval: float = 0.1
+    ) -> None:
+        self.pools = pools
+        self.batch_size = batch_size
+        self.interval = interval
+        self.local = LocalPlacement()
+        self._metrics = OutboxMetrics()
+
+    def deliver(self) -> int:
+        delivered = 0
+        for shard in self.pools:
+            delivered += self._drain(self.pools[shard])
+        self._metrics.passes += 1
+        self._metrics.delivered += delivered
+        return delivered
+
+    def deliver_all(self) -> int:
+        delivered = 0
+        while pending := self.deliver():
+            delivered += pending
+        return delivered
+
+    def metrics(self) -> OutboxMetrics:
+        return replace(self._metrics)
+
+    def _drain(self, source: ConnectionPool) -> int:
+        with source.connection() as conn:
+            rows = conn.execute(PENDING_TRANSFERS, (self.batch_size,)).fetchall()
+        if not rows:
+            return 0
+
+        by_shard: dict[str, list[tuple[int, ...]]] = {}
+        for row in rows:
+            by_shard.setdefault(self.pools.shard_map.shard_for(row[2]), []).append(row)
+        for shard, transfers in by_shard.items():
+            self._apply(self.pools[shard], transfers)
+
+        # Only now is every credit durable; a crash before this line means the
+        # rows are sent again and skipped by the inbox.
+        with source.connection() as conn:
+            conn.executemany(
+                "DELETE FROM transfer_outbox WHERE transaction_id = ?",
+                [(row[0],) for row in rows],
+            )
+        return len(rows)
+
+    def _apply(self, pool: ConnectionPool, transfers: list[tuple[int, ...]]) -> None:
+        with pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            fresh = [
+                row
+                for row in transfers
+                if conn.execute(
+                    "INSERT OR IGNORE INTO transfer_inbox (transaction_id) VALUES (?)",
+                    (row[0],),
+                ).rowcount
+            ]
+            # The receiver's history needs the row too; transfer_inbox keeps it
+            # out of this shard's statistics and fees.
+            conn.executemany(
+                "INSERT INTO transactions (id, from_wallet_id, to_wallet_id, "
+                "amount_transferred, lost_amount, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                fresh,
+            )
+            self.local.credit(
+                conn, [(row[0], row[2], row[3] - row[4]) for row in fresh]
+            )
+
+    async def run(self) -> None:
+        while True:
+            try:
+                delivered = await asyncio.to_thread(self.deliver)
+            except sqlite3.Error:
+                self._metrics.failures += 1
+                delivered = 0
+            # A full batch means more is waiting; otherwise rest a tick.
+            if delivered < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI) -> AsyncIterator[None]:
+        task = asyncio.create_task(self.run())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
@@ -0,0 +1,54 @@
+import sqlite3
+from typing import Iterable
+
+from bitcoin_wallet.core.shard.shard_map import bucket_of, bucket_range
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+from bitcoin_wallet.core.transfer.placement import Credit, LocalPlacement
+
+
+class ShardPlacement(LocalPlacement):
+    # Transfers run on the sender's shard. A wallet on another shard is read
+    # there, and its credit waits in the outbox, committed with the debit,
+    # until the relay applies it.
+
+    def __init__(self, pools: ShardPools, shard: str) -> None:
+        self.pools = pools
+        self.shard = shard
+
+    def owners(
+        self, conn: sqlite3.Connection, wallet_ids: Iterable[int]
+    ) -> dict[int, int]:
+        by_shard: dict[str, list[int]] = {}
+        for wallet_id in wallet_ids:
+            by_shard.setdefault(self.pools.shard_map.shard_for(wallet_id), []).append(
+                wallet_id
+            )
+        owners = super().owners(conn, by_shard.pop(self.shard, []))
+        for shard, remote_ids in by_shard.items():
+            # Wallets are never deleted, so one that exists now still will
+            # when its credit is delivered.
+            with self.pools[shard].connection() as remote:
+                owners.update(super().owners(remote, remote_ids))
+        return owners
+
+    def next_transaction_id(self, conn: sqlite3.Connection, from_wallet_id: int) -> int:
+        # Transfer ids live in the sender's bucket; the shard owning the
+        # bucket holds every id handed out in it.
+        first, last = bucket_range(bucket_of(from_wallet_id))
+        return int(
+            conn.execute(
+                "SELECT COALESCE(MAX(id), ?) + 1 FROM transactions "
+                "WHERE id BETWEEN ? AND ?",
+                (first - 1, first, last),
+            ).fetchone()[0]
+        )
+
+    def credit(self, conn: sqlite3.Connection, credits: list[Credit]) -> None:
+        shard_for = self.pools.shard_map.shard_for
+        super().credit(
+            conn, [item for item in credits if shard_for(item[1]) == self.shard]
+        )
+        conn.executemany(
+            "INSERT INTO transfer_outbox (transaction_id) VALUES (?)",
+            [(item[0],) for item in credits if shard_for(item[1]) != self.shard],
+        )
@@ -0,0 +1,253 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, replace
+
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.schema import SchemaBootstrapper
+from bitcoin_wallet.core.exception.shard_not_splittable import (
+    ShardNotSplittableException,
+)
+from bitcoin_wallet.core.shard.outbox import OutboxRelay
+from bitcoin_wallet.core.shard.shard_map import ID_BITS, ShardCatalog, ShardMap
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+from bitcoin_wallet.core.statistics.platform_statistics import (
+    ORIGINATED,
+    rebuild_statistics,
+)
+from bitcoin_wallet.core.transfer.reconciliation import (
+    LedgerReconciler,
+    Reconciliation,
+    WalletDrift,
+)
+
+IN_BUCKETS = f" >> {ID_BITS} IN (SELECT value FROM json_each(:buckets))"
+# Every table keyed by a user or wallet, with the column naming its bucket.
+OWNED_TABLES = (
+    ("users", "id"),
+    ("wallets", "id"),
+    ("user_wallets", "user_id"),
+    ("idempotency_keys", "user_id"),
+)
+TRANSFER_COLUMNS = (
+    "id, from_wallet_id, to_wallet_id, amount_transferred, lost_amount, created_at"
+)
+
+
+@dataclass(frozen=True)
+class ShardLoad:
+    shard: str
+    buckets: int
+    users: int
+    wallets: int
+    transfers: int
+    pending: int
+
+
+@dataclass(frozen=True)
+class SplitResult:
+    source: str
+    target: str
+    buckets: list[int]
+    users: int
+    wallets: int
+    transfers: int
+
+
+class ShardRebalancer:
+    # Offline: run with the servers stopped, so no transfer lands on a bucket
+    # while it moves.
+
+    def __init__(self, catalog: ShardCatalog, settings: DatabaseSettings) -> None:
+        self.catalog = catalog
+        self.settings = settings
+
+    def loads(self) -> list[ShardLoad]:
+        shard_map = self.catalog.load()
+        pools = ShardPools(shard_map, self.settings)
+        try:
+            return [
+                _load(shard, pool, len(shard_map.buckets_on(shard)))
+                for shard, pool in pools.items()
+            ]
+        finally:
+            pools.close()
+
+    def reconcile(self) -> Reconciliation:
+        pools = ShardPools(self.catalog.load(), self.settings)
+        try:
+            return sum(
+                (LedgerReconciler(pool).reconcile() for _, pool in pools.items()),
+                Reconciliation(0, 0, 0),
+            )
+        finally:
+            pools.close()
+
+    def drifted_wallets(self, limit: int = 20) -> list[WalletDrift]:
+        pools = ShardPools(self.catalog.load(), self.settings)
+        try:
+            return [
+                drift
+                for _, pool in pools.items()
+                for drift in LedgerReconciler(pool).drifted_wallets(limit)
+            ][:limit]
+        finally:
+            pools.close()
+
+    def split(
+        self, source: str | None = None, target: str | None = None
+    ) -> SplitResult:
+        shard_map = self.catalog.load()
+        # Relative names are resolved next to the catalog, like the map's own.
+        if source is None:
+            source = max(self.loads(), key=lambda load: load.transfers).shard
+        source = self.catalog.shard_path(source)
+        if source not in shard_map.shards:
+            raise ShardNotSplittableException(source, "it is not in the shard map")
+        if target is None:
+            target = self._free_shard_path(shard_map)
+        target = self.catalog.shard_path(target)
+        if target in shard_map.shards:
+            raise ShardNotSplittableException(source, f"{target} is already a shard")
+
+        pools = ShardPools(shard_map, self.settings)
+        try:
+            pools.create_schema()
+            # Pending credits name wallets by the current map; deliver them
+            # before any bucket changes shard.
+            OutboxRelay(pools).deliver_all()
+            # Finishes an earlier split of this shard that stopped after the
+            # map was saved.
+            _prune(pools[source], shard_map.buckets_on(source))
+            moving = _pick_buckets(pools[source], shard_map.buckets_on(source))
+            if not moving:
+                raise ShardNotSplittableException(source, "it holds a single bucket")
+            result = self._copy(source, target, moving)
+            shard_map = shard_map.move(moving, target)
+            self.catalog.save(shard_map)
+            _prune(pools[source], shard_map.buckets_on(source))
+        finally:
+            pools.close()
+        return result
+
+    def _copy(self, source: str, target: str, moving: list[int]) -> SplitResult:
+        pool = ConnectionPool.from_settings(replace(self.settings, db_path=target))
+        try:
+            SchemaBootstrapper(pool).create()
+            with pool.connection() as conn:
+                if conn.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+                    raise ShardNotSplittableException(
+                        source, f"{target} already holds users"
+                    )
+        finally:
+            pool.close()
+
+        buckets = {"buckets": json.dumps(moving)}
+        # One transaction on the new file: a crash leaves it empty or complete,
+        # and the map only points at it afterwards.
+        with closing(sqlite3.connect(target, isolation_level=None)) as conn:
+            conn.execute("ATTACH DATABASE ? AS source", (source,))
+            conn.execute("BEGIN IMMEDIATE")
+            counts: dict[str, int] = {}
+            for table, column in OWNED_TABLES:
+                counts[table] = conn.execute(
+                    f"INSERT INTO main.{table} SELECT * FROM source.{table} "
+                    f"WHERE {column}{IN_BUCKETS}",
+                    buckets,
+                ).rowcount
+            transfers = conn.execute(
+                f"INSERT INTO main.transactions ({TRANSFER_COLUMNS}) "
+                f"SELECT {TRANSFER_COLUMNS} FROM source.transactions "
+                f"WHERE from_wallet_id{IN_BUCKETS} OR to_wallet_id{IN_BUCKETS}",
+                buckets,
+            ).rowcount
+            # Transfers sent from buckets that stay behind were credited here.
+            conn.execute(
+                "INSERT INTO main.transfer_inbox (transaction_id) "
+                "SELECT id FROM main.transactions "
+                f"WHERE NOT from_wallet_id{IN_BUCKETS}",
+                buckets,
+            )
+            rebuild_statistics(conn)
+            conn.execute("COMMIT")
+            conn.execute("DETACH DATABASE source")
+        return SplitResult(
+            source,
+            target,
+            moving,
+            counts["users"],
+            counts["wallets"],
+            transfers,
+        )
+
+    def _free_shard_path(self, shard_map: ShardMap) -> str:
+        index = len(shard_map.shards)
+        while True:
+            path = self.catalog.shard_path(f"shard-{index:02d}.db")
+            if path not in shard_map.shards and not os.path.exists(path):
+                return path
+            index += 1
+
+
+def _load(shard: str, pool: ConnectionPool, buckets: int) -> ShardLoad:
+    with pool.connection() as conn:
+        users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        wallets = conn.execute("SELECT COUNT(*) FROM wallets").fetchone()[0]
+        transfers = conn.execute(
+            f"SELECT COUNT(*) FROM transactions WHERE {ORIGINATED}"
+        ).fetchone()[0]
+        pending = conn.execute("SELECT COUNT(*) FROM transfer_outbox").fetchone()[0]
+    return ShardLoad(shard, buckets, users, wallets, transfers, pending)
+
+
+def _pick_buckets(pool: ConnectionPool, buckets: list[int]) -> list[int]:
+    # Heaviest first, each to the lighter half: the moved buckets carry about
+    # half of the shard's transfers and wallets.
+    with pool.connection() as conn:
+        rows = conn.execute(
+            f"SELECT id >> {ID_BITS}, COUNT(*) FROM transactions "
+            f"WHERE {ORIGINATED} GROUP BY 1 "
+            f"UNION ALL SELECT id >> {ID_BITS}, COUNT(*) FROM wallets GROUP BY 1"
+        ).fetchall()
+    weight = dict.fromkeys(buckets, 0)
+    for bucket, count in rows:
+        if bucket in weight:
+            weight[bucket] += count
+    keep: list[int] = []
+    move: list[int] = []
+    kept = moved = 0
+    for bucket in sorted(buckets, key=lambda bucket: (-weight[bucket], bucket)):
+        if (kept, len(keep)) <= (moved, len(move)):
+            keep.append(bucket)
+            kept += weight[bucket]
+        else:
+            move.append(bucket)
+            moved += weight[bucket]
+    return sorted(move)
+
+
+def _prune(pool: ConnectionPool, buckets: list[int]) -> None:
+    # Drops what moved away and marks transfers now sent from another shard,
+    # so each shard again holds exactly the rows touching its own wallets.
+    params = {"buckets": json.dumps(buckets)}
+    with pool.connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for table, column in OWNED_TABLES:
+            conn.execute(f"DELETE FROM {table} WHERE NOT {column}{IN_BUCKETS}", params)
+        conn.execute(
+            "DELETE FROM transactions "
+            f"WHERE NOT from_wallet_id{IN_BUCKETS} AND NOT to_wallet_id{IN_BUCKETS}",
+            params,
+        )
+        conn.execute(
+            "DELETE FROM transfer_inbox "
+            "WHERE transaction_id NOT IN (SELECT id FROM transactions)"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO transfer_inbox (transaction_id) "
+            f"SELECT id FROM transactions WHERE NOT from_wallet_id{IN_BUCKETS}",
+            params,
+        )
+        rebuild_statistics(conn)
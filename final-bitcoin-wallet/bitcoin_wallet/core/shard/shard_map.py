@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import zlib
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from bitcoin_wallet.core.exception.shard_map_missing import ShardMapMissingException
+
+# Ids carry their bucket in the bits above ID_BITS, so a wallet or transfer
+# routes without a lookup. Ids stay below 2**50 and survive JSON as numbers.
+ID_BITS = 40
+BUCKET_BITS = 10
+BUCKETS = 1 << BUCKET_BITS
+
+
+def bucket_of(entity_id: int) -> int:
+    # Out-of-range ids still land on a shard, where they are simply not found.
+    return (entity_id >> ID_BITS) % BUCKETS
+
+
+def bucket_range(bucket: int) -> tuple[int, int]:
+    return bucket << ID_BITS, ((bucket + 1) << ID_BITS) - 1
+
+
+def bucket_for_mail(mail: str) -> int:
+    # A mail always hashes to the same shard, so its unique index there also
+    # keeps it unique across shards.
+    return zlib.crc32(mail.encode()) % BUCKETS
+
+
+@dataclass(frozen=True)
+class ShardMap:
+    # The shard database path for every bucket, indexed by bucket.
+    assignments: tuple[str, ...]
+
+    @classmethod
+    def uniform(cls, shards: Sequence[str]) -> "ShardMap":
+        return cls(tuple(shards[bucket % len(shards)] for bucket in range(BUCKETS)))
+
+    @property
+    def shards(self) -> list[str]:
+        return list(dict.fromkeys(self.assignments))
+
+    def shard_for(self, entity_id: int) -> str:
+        return self.assignments[bucket_of(entity_id)]
+
+    def shard_for_bucket(self, bucket: int) -> str:
+        return self.assignments[bucket]
+
+    def buckets_on(self, shard: str) -> list[int]:
+        return [
+            bucket for bucket, owner in enumerate(self.assignments) if owner == shard
+        ]
+
+    def move(self, buckets: Iterable[int], shard: str) -> "ShardMap":
+        assignments = list(self.assignments)
+        for bucket in buckets:
+            assignments[bucket] = shard
+        return ShardMap(tuple(assignments))
+
+
+class ShardCatalog:
+    # Shard paths are stored relative to the catalog, so the directory can move.
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.directory = os.path.dirname(os.path.abspath(path))
+
+    def exists(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with closing(sqlite3.connect(self.path)) as conn:
+            table = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'shard_buckets'"
+            ).fetchone()
+        return table is not None
+
+    def load(self) -> ShardMap:
+        if not self.exists():
+            raise ShardMapMissingException(self.path)
+        with closing(sqlite3.connect(self.path)) as conn:
+            rows = conn.execute(
+                "SELECT shard FROM shard_buckets ORDER BY bucket"
+            ).fetchall()
+        if len(rows) != BUCKETS:
+            raise ShardMapMissingException(self.path)
+        return ShardMap(tuple(self.shard_path(row[0]) for row in rows))
+
+    def save(self, shard_map: ShardMap) -> None:
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shard_buckets("
+                "bucket INTEGER PRIMARY KEY, shard TEXT NOT NULL)"
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO shard_buckets (bucket, shard) VALUES (?, ?)",
+                [
+                    (bucket, os.path.relpath(shard, self.directory))
+                    for bucket, shard in enumerate(shard_map.assignments)
+                ],
+            )
+
+    def shard_path(self, name: str) -> str:
+        return os.path.normpath(os.path.join(self.directory, name))
@@ -0,0 +1,52 @@
+from dataclasses import replace
+from typing import Iterator
+
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.schema import SchemaBootstrapper
+from bitcoin_wallet.core.database.slow_query_log import SlowQueryLog
+from bitcoin_wallet.core.shard.shard_map import ShardMap
+
+
+class ShardPools:
+    def __init__(
+        self,
+        shard_map: ShardMap,
+        settings: DatabaseSettings,
+        slow_query_log: SlowQueryLog | None = None,
+    ) -> None:
+        self.shard_map = shard_map
+        self._pools = {
+            shard: ConnectionPool.from_settings(
+                replace(settings, db_path=shard), slow_query_log
+            )
+            for shard in shard_map.shards
+        }
+
+    def __getitem__(self, shard: str) -> ConnectionPool:
+        return self._pools[shard]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pools)
+
+    def items(self) -> list[tuple[str, ConnectionPool]]:
+        return list(self._pools.items())
+
+    def for_id(self, entity_id: int) -> ConnectionPool:
+        return self._pools[self.shard_map.shard_for(entity_id)]
+
+    def create_schema(self) -> None:
+        for pool in self._pools.values():
+            SchemaBootstrapper(pool).create()
+
+    def drop_schema(self) -> None:
+        for pool in self._pools.values():
+            SchemaBootstrapper(pool).drop()
+
+    def verify_pragmas(self) -> None:
+        for pool in self._pools.values():
+            pool.verify_pragmas()
+
+    def close(self) -> None:
+        for pool in self._pools.values():
+            pool.close()
@@ -0,0 +1,66 @@
+from bitcoin_wallet.core.shard.placement import ShardPlacement
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+from bitcoin_wallet.core.transfer.group_commit import (
+    GroupCommitMetrics,
+    GroupCommitWriter,
+)
+from bitcoin_wallet.core.transfer.idempotency import IdempotencyKey
+from bitcoin_wallet.core.transfer.transfer_engine import TransferEngine
+
+
+class ShardedTransferWriter:
+    # One group-commit writer per shard: shards have separate write locks, so
+    # their batches commit side by side.
+
+    def __init__(
+        self,
+        pools: ShardPools,
+        batch_size: int = 64,
+        linger: float = 0.002,
+        idempotency_ttl: float = 86_400.0,
+    ) -> None:
+        self.shard_map = pools.shard_map
+        self.writers = {
+            shard: GroupCommitWriter(
+                pool,
+                TransferEngine(
+                    placement=ShardPlacement(pools, shard),
+                    idempotency_ttl=idempotency_ttl,
+                ),
+                batch_size=batch_size,
+                linger=linger,
+            )
+            for shard, pool in pools.items()
+        }
+
+    def start(self) -> None:
+        for writer in self.writers.values():
+            writer.start()
+
+    def stop(self) -> None:
+        for writer in self.writers.values():
+            writer.stop()
+
+    async def transfer(
+        self,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+        idempotency_key: IdempotencyKey | None = None,
+    ) -> int:
+        writer = self.writers[self.shard_map.shard_for(from_wallet_id)]
+        return await writer.transfer(
+            from_wallet_id, to_wallet_id, amount_transferred, idempotency_key
+        )
+
+    def metrics(self) -> GroupCommitMetrics:
+        total = GroupCommitMetrics()
+        for writer in self.writers.values():
+            metrics = writer.metrics()
+            total.batches += metrics.batches
+            total.transfers += metrics.transfers
+            total.failed_batches += metrics.failed_batches
+            total.locked_batches += metrics.locked_batches
+            total.largest_batch = max(total.largest_batch, metrics.largest_batch)
+            total.commit_seconds += metrics.commit_seconds
+        return total
@@ -0,0 +1,99 @@
+import sqlite3
+from dataclasses import dataclass
+from enum import Enum
+
+# A shard also holds copies of transfers credited to it from other shards;
+# those are counted where they were sent, so statistics skip them.
+ORIGINATED = "id NOT IN (SELECT transaction_id FROM transfer_inbox)"
+LEDGER_TOTALS = (
+    "SELECT COUNT(*), COALESCE(SUM(lost_amount), 0), "
+    f"COALESCE(SUM(amount_transferred), 0) FROM transactions WHERE {ORIGINATED}"
+)
+# Rollups are kept per hour; coarser granularities are summed from them.
+ROLLUP_SECONDS = 3600
+
+
+class Granularity(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+    @property
+    def seconds(self) -> int:
+        return ROLLUP_SECONDS if self is Granularity.HOUR else 24 * ROLLUP_SECONDS
+
+
+@dataclass(frozen=True)
+class PlatformStatistics:
+    transactions: int
+    fees: int
+    volume: int
+
+
+@dataclass(frozen=True)
+class StatisticsBucket:
+    start: int
+    transactions: int
+    fees: int
+    volume: int
+
+
+def record_transfer(
+    conn: sqlite3.Connection,
+    amount: int,
+    fee: int,
+    created_at: int,
+    transactions: int = 1,
+) -> None:
+    # Runs inside the transfer's own transaction, so the counters commit or
+    # roll back together with the ledger rows. A batch passes its totals.
+    conn.execute(
+        "UPDATE platform_statistics SET transactions = transactions + ?, "
+        "fees = fees + ?, volume = volume + ? WHERE id = 1",
+        (transactions, fee, amount),
+    )
+    conn.execute(
+        "INSERT INTO statistics_rollups (bucket_start, transactions, fees, volume) "
+        "VALUES (?, ?, ?, ?) ON CONFLICT (bucket_start) DO UPDATE SET "
+        "transactions = transactions + excluded.transactions, "
+        "fees = fees + excluded.fees, volume = volume + excluded.volume",
+        (created_at - created_at % ROLLUP_SECONDS, transactions, fee, amount),
+    )
+
+
+def read_statistics(conn: sqlite3.Connection) -> PlatformStatistics:
+    row = conn.execute(
+        "SELECT transactions, fees, volume FROM platform_statistics WHERE id = 1"
+    ).fetchone()
+    return PlatformStatistics(*row) if row else PlatformStatistics(0, 0, 0)
+
+
+def read_buckets(
+    conn: sqlite3.Connection, start: int, end: int, granularity: Granularity
+) -> list[StatisticsBucket]:
+    # Bounds snap outwards to whole buckets: [floor(start), ceil(end)).
+    step = granularity.seconds
+    rows = conn.execute(
+        "SELECT bucket_start / ? * ? AS bucket, SUM(transactions), SUM(fees), "
+        "SUM(volume) FROM statistics_rollups "
+        "WHERE bucket_start >= ? AND bucket_start < ? "
+        "GROUP BY bucket ORDER BY bucket",
+        (step, step, start - start % step, end + (-end % step)),
+    ).fetchall()
+    return [StatisticsBucket(*row) for row in rows]
+
+
+def rebuild_statistics(conn: sqlite3.Connection) -> PlatformStatistics:
+    conn.execute(
+        "INSERT OR REPLACE INTO platform_statistics (id, transactions, fees, volume) "
+        f"SELECT 1, * FROM ({LEDGER_TOTALS})"
+    )
+    # Transfers recorded before created_at existed have no bucket to go to.
+    conn.execute("DELETE FROM statistics_rollups")
+    conn.execute(
+        "INSERT INTO statistics_rollups (bucket_start, transactions, fees, volume) "
+        "SELECT created_at / ? * ?, COUNT(*), SUM(lost_amount), "
+        "SUM(amount_transferred) FROM transactions WHERE created_at IS NOT NULL "
+        f"AND {ORIGINATED} GROUP BY 1",
+        (ROLLUP_SECONDS, ROLLUP_SECONDS),
+    )
+    return read_statistics(conn)
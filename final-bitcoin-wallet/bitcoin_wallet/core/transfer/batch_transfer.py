@@ -0,0 +1,181 @@
+import sqlite3
+import time
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Callable
+
+from bitcoin_wallet.core.exception.invalid_transfer_amount import (
+    InvalidTransferAmountException,
+)
+from bitcoin_wallet.core.exception.not_enough_balance import NotEnoughBalanceException
+from bitcoin_wallet.core.exception.same_transfer_wallets import (
+    SameTransferWalletsException,
+)
+from bitcoin_wallet.core.exception.wallet_not_found import WalletNotFoundException
+from bitcoin_wallet.core.money.satoshi import transfer_fee
+from bitcoin_wallet.core.statistics.platform_statistics import record_transfer
+from bitcoin_wallet.core.transfer.placement import LocalPlacement
+
+
+class BatchMode(str, Enum):
+    ALL_OR_NOTHING = "all_or_nothing"
+    BEST_EFFORT = "best_effort"
+
+
+@dataclass(frozen=True)
+class TransferLeg:
+    to_wallet_id: int
+    amount_transferred: int
+
+
+@dataclass(frozen=True)
+class LegResult:
+    to_wallet_id: int
+    amount_transferred: int
+    transaction_id: int | None = None
+    lost_amount: int = 0
+    error: Exception | None = None
+
+
+class BatchTransferEngine:
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.time,
+        placement: LocalPlacement | None = None,
+    ) -> None:
+        self.clock = clock
+        self.placement = placement or LocalPlacement()
+
+    def transfer(
+        self,
+        conn: sqlite3.Connection,
+        from_wallet_id: int,
+        legs: list[TransferLeg],
+        mode: BatchMode,
+    ) -> list[LegResult]:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            results = self.apply(conn, from_wallet_id, legs, mode)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        return results
+
+    def apply(
+        self,
+        conn: sqlite3.Connection,
+        from_wallet_id: int,
+        legs: list[TransferLeg],
+        mode: BatchMode,
+    ) -> list[LegResult]:
+        owners = self.placement.owners(
+            conn, [from_wallet_id, *(leg.to_wallet_id for leg in legs)]
+        )
+        if from_wallet_id not in owners:
+            raise WalletNotFoundException(from_wallet_id)
+        balance = conn.execute(
+            "SELECT balance FROM wallets WHERE id = ?", (from_wallet_id,)
+        ).fetchone()[0]
+
+        # One pass prices every leg and decides whether it can be applied.
+        results: list[LegResult] = []
+        debited = 0
+        for leg in legs:
+            error = self._rejection(from_wallet_id, leg, owners)
+            if error is None and debited + leg.amount_transferred > balance:
+                error = NotEnoughBalanceException(from_wallet_id)
+            if error is not None:
+                if mode is BatchMode.ALL_OR_NOTHING:
+                    raise error
+                results.append(
+                    LegResult(leg.to_wallet_id, leg.amount_transferred, error=error)
+                )
+                continue
+            debited += leg.amount_transferred
+            fee = 0
+            if owners[leg.to_wallet_id] != owners[from_wallet_id]:
+                fee = transfer_fee(leg.amount_transferred)
+            results.append(
+                LegResult(leg.to_wallet_id, leg.amount_transferred, lost_amount=fee)
+            )
+
+        applied = [
+            index for index, result in enumerate(results) if result.error is None
+        ]
+        if applied:
+            first_id = self._write(
+                conn, from_wallet_id, [results[index] for index in applied], debited
+            )
+            for offset, index in enumerate(applied):
+                results[index] = replace(
+                    results[index], transaction_id=first_id + offset
+                )
+        return results
+
+    def _write(
+        self,
+        conn: sqlite3.Connection,
+        from_wallet_id: int,
+        applied: list[LegResult],
+        debited: int,
+    ) -> int:
+        conn.execute(
+            "UPDATE wallets SET balance = balance - ? WHERE id = ?",
+            (debited, from_wallet_id),
+        )
+
+        # The write lock is held, so the next ids are ours to hand out and every
+        # leg learns its transaction id without a round trip per row.
+        first_id = self.placement.next_transaction_id(conn, from_wallet_id)
+        if first_id is None:
+            first_id = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) + 1 FROM transactions"
+            ).fetchone()[0]
+        created_at = int(self.clock())
+        conn.executemany(
+            "INSERT INTO transactions (id, from_wallet_id, to_wallet_id, "
+            "amount_transferred, lost_amount, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    first_id + offset,
+                    from_wallet_id,
+                    result.to_wallet_id,
+                    result.amount_transferred,
+                    result.lost_amount,
+                    created_at,
+                )
+                for offset, result in enumerate(applied)
+            ],
+        )
+        self.placement.credit(
+            conn,
+            [
+                (
+                    first_id + offset,
+                    result.to_wallet_id,
+                    result.amount_transferred - result.lost_amount,
+                )
+                for offset, result in enumerate(applied)
+            ],
+        )
+        record_transfer(
+            conn,
+            debited,
+            sum(result.lost_amount for result in applied),
+            created_at,
+            transactions=len(applied),
+        )
+        return int(first_id)
+
+    @staticmethod
+    def _rejection(
+        from_wallet_id: int, leg: TransferLeg, owners: dict[int, int]
+    ) -> Exception | None:
+        if leg.to_wallet_id == from_wallet_id:
+            return SameTransferWalletsException(from_wallet_id, leg.to_wallet_id)
+        if leg.amount_transferred <= 0:
+            return InvalidTransferAmountException(leg.amount_transferred)
+        if leg.to_wallet_id not in owners:
+            return WalletNotFoundException(leg.to_wallet_id)
+        return None
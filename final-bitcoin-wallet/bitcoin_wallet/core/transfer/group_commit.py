@@ -0,0 +1,182 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field, replace
+from queue import Empty, Queue
+from typing import Protocol
+
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.transfer.idempotency import IdempotencyKey
+from bitcoin_wallet.core.transfer.transfer_engine import TransferEngine
+
+
+@dataclass
+class TransferCommand:
+    from_wallet_id: int
+    to_wallet_id: int
+    amount_transferred: int
+    idempotency_key: IdempotencyKey | None = None
+    result: "Future[int]" = field(default_factory=Future)
+
+
+@dataclass
+class GroupCommitMetrics:
+    batches: int = 0
+    transfers: int = 0
+    failed_batches: int = 0
+    locked_batches: int = 0
+    largest_batch: int = 0
+    commit_seconds: float = 0.0
+
+
+class TransferWriter(Protocol):
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    async def transfer(
+        self,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+        idempotency_key: IdempotencyKey | None = None,
+    ) -> int:
+        pass
+
+    def metrics(self) -> GroupCommitMetrics:
+        pass
+
+
+class GroupCommitWriter:
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        engine: TransferEngine | None = None,
+        batch_size: int = 64,
+        linger: float = 0.002,
+    ) -> None:
+        self.pool = pool
+        self.engine = engine or TransferEngine()
+        self.batch_size = batch_size
+        self.linger = linger
+        self._queue: Queue[TransferCommand | None] = Queue()
+        self._metrics = GroupCommitMetrics()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="transfer-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        # Commands queued before the sentinel are still committed.
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def submit(
+        self,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+        idempotency_key: IdempotencyKey | None = None,
+    ) -> "Future[int]":
+        command = TransferCommand(
+            from_wallet_id, to_wallet_id, amount_transferred, idempotency_key
+        )
+        self._queue.put(command)
+        return command.result
+
+    async def transfer(
+        self,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+        idempotency_key: IdempotencyKey | None = None,
+    ) -> int:
+        future = self.submit(
+            from_wallet_id, to_wallet_id, amount_transferred, idempotency_key
+        )
+        return await asyncio.wrap_future(future)
+
+    def metrics(self) -> GroupCommitMetrics:
+        return replace(self._metrics)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                try:
+                    command = self._queue.get(
+                        timeout=max(deadline - time.monotonic(), 0.0)
+                    )
+                except Empty:
+                    break
+                if command is None:
+                    stopping = True
+                    break
+                batch.append(command)
+            self._commit(batch)
+
+    def _commit(self, batch: list[TransferCommand]) -> None:
+        outcomes: list[tuple[TransferCommand, int | BaseException]] = []
+        started = time.perf_counter()
+        try:
+            with self.pool.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for command in batch:
+                    outcomes.append((command, self._apply(conn, command)))
+                conn.commit()
+        except Exception as ex:
+            # Nothing in the batch became durable, so every caller sees the error.
+            self._metrics.failed_batches += 1
+            if isinstance(ex, sqlite3.OperationalError) and "locked" in str(ex):
+                self._metrics.locked_batches += 1
+            for command in batch:
+                command.result.set_exception(ex)
+            return
+
+        self._metrics.commit_seconds += time.perf_counter() - started
+        self._metrics.batches += 1
+        self._metrics.transfers += len(batch)
+        self._metrics.largest_batch = max(self._metrics.largest_batch, len(batch))
+        for command, outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                command.result.set_exception(outcome)
+            else:
+                command.result.set_result(outcome)
+
+    def _apply(
+        self, conn: sqlite3.Connection, command: TransferCommand
+    ) -> int | BaseException:
+        # A savepoint per transfer lets one rejected transfer roll back alone
+        # while the rest of the batch commits together.
+        conn.execute("SAVEPOINT transfer")
+        try:
+            transaction_id = self.engine.apply(
+                conn,
+                command.from_wallet_id,
+                command.to_wallet_id,
+                command.amount_transferred,
+                command.idempotency_key,
+            )
+        except sqlite3.Error:
+            raise
+        except Exception as ex:
+            conn.execute("ROLLBACK TO transfer")
+            conn.execute("RELEASE transfer")
+            return ex
+        conn.execute("RELEASE transfer")
+        return transaction_id
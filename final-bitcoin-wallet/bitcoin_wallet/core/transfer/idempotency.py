@@ -0,0 +1,177 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import FastAPI
+
+from bitcoin_wallet.core.exception.idempotency_key_reused import (
+    IdempotencyKeyReusedException,
+)
+
+
+@dataclass(frozen=True)
+class IdempotencyKey:
+    user_id: int
+    key: str
+
+
+@dataclass(frozen=True)
+class IdempotentResult:
+    key: IdempotencyKey
+    from_wallet_id: int
+    to_wallet_id: int
+    amount_transferred: int
+    transaction_id: int
+
+    def replay(
+        self, from_wallet_id: int, to_wallet_id: int, amount_transferred: int
+    ) -> int:
+        if (self.from_wallet_id, self.to_wallet_id, self.amount_transferred) != (
+            from_wallet_id,
+            to_wallet_id,
+            amount_transferred,
+        ):
+            raise IdempotencyKeyReusedException(self.key.key)
+        return self.transaction_id
+
+
+def find_result(
+    conn: sqlite3.Connection, key: IdempotencyKey, not_before: int
+) -> IdempotentResult | None:
+    # A key older than not_before has expired even if the sweeper has not
+    # deleted it yet, and counts as absent.
+    row = conn.execute(
+        "SELECT from_wallet_id, to_wallet_id, amount_transferred, transaction_id "
+        "FROM idempotency_keys WHERE user_id = ? AND idempotency_key = ? "
+        "AND created_at >= ?",
+        (key.user_id, key.key, not_before),
+    ).fetchone()
+    return None if row is None else IdempotentResult(key, *row)
+
+
+def store_result(
+    conn: sqlite3.Connection, result: IdempotentResult, created_at: int
+) -> None:
+    # Expired keys may linger until the sweeper reaches them; reusing one
+    # starts a fresh record.
+    conn.execute(
+        "INSERT OR REPLACE INTO idempotency_keys (user_id, idempotency_key, "
+        "from_wallet_id, to_wallet_id, amount_transferred, transaction_id, "
+        "created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            result.key.user_id,
+            result.key.key,
+            result.from_wallet_id,
+            result.to_wallet_id,
+            result.amount_transferred,
+            result.transaction_id,
+            created_at,
+        ),
+    )
+
+
+def sweep_expired(conn: sqlite3.Connection, before: int, limit: int) -> int:
+    return conn.execute(
+        "DELETE FROM idempotency_keys WHERE (user_id, idempotency_key) IN ("
+        "SELECT user_id, idempotency_key FROM idempotency_keys "
+        "WHERE created_at < ? ORDER BY created_at LIMIT ?)",
+        (before, limit),
+    ).rowcount
+
+
+@dataclass
+class IdempotencyCacheMetrics:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class IdempotencyCache:
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: float = 86_400.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[IdempotencyKey, tuple[IdempotentResult, float]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._metrics = IdempotencyCacheMetrics()
+
+    def get(self, key: IdempotencyKey) -> IdempotentResult | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= self.clock():
+                self._entries.pop(key, None)
+                self._metrics.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._metrics.hits += 1
+            return entry[0]
+
+    def put(self, result: IdempotentResult) -> None:
+        with self._lock:
+            self._entries[result.key] = (result, self.clock() + self.ttl)
+            self._entries.move_to_end(result.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._metrics.evictions += 1
+
+    def metrics(self) -> IdempotencyCacheMetrics:
+        with self._lock:
+            return replace(self._metrics)
+
+
+class IdempotencySweeper:
+    def __init__(
+        self,
+        sweep: Callable[[int, int], Awaitable[int]],
+        ttl: float = 86_400.0,
+        interval: float = 60.0,
+        batch_size: int = 1000,
+        max_batches: int = 10,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.sweep = sweep
+        self.ttl = ttl
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.clock = clock
+
+    async def sweep_once(self) -> int:
+        # Short batches keep each delete from holding the write lock for long;
+        # a backlog larger than one tick's budget is finished on later ticks.
+        before = int(self.clock() - self.ttl)
+        removed = 0
+        for _ in range(self.max_batches):
+            deleted = await self.sweep(before, self.batch_size)
+            removed += deleted
+            if deleted < self.batch_size:
+                break
+        return removed
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            with suppress(sqlite3.Error):
+                await self.sweep_once()
+
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI) -> AsyncIterator[None]:
+        task = asyncio.create_task(self.run())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
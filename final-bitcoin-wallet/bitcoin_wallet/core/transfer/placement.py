@@ -0,0 +1,38 @@
+import json
+import sqlite3
+from typing import Iterable
+
+# (transaction id, wallet id, amount) for each wallet a transfer pays into.
+Credit = tuple[int, int, int]
+
+
+class LocalPlacement:
+    # Every wallet lives in the database the transfer runs on. A sharded
+    # deployment swaps this for one that reaches wallets on other shards.
+
+    def owners(
+        self, conn: sqlite3.Connection, wallet_ids: Iterable[int]
+    ) -> dict[int, int]:
+        # json_each keeps this one statement however many wallets there are.
+        return dict(
+            conn.execute(
+                "SELECT id, user_id FROM wallets "
+                "WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(sorted(set(wallet_ids))),),
+            ).fetchall()
+        )
+
+    def next_transaction_id(
+        self, conn: sqlite3.Connection, from_wallet_id: int
+    ) -> int | None:
+        # None lets SQLite pick the next rowid.
+        return None
+
+    def credit(self, conn: sqlite3.Connection, credits: list[Credit]) -> None:
+        totals: dict[int, int] = {}
+        for _, wallet_id, amount in credits:
+            totals[wallet_id] = totals.get(wallet_id, 0) + amount
+        conn.executemany(
+            "UPDATE wallets SET balance = balance + ? WHERE id = ?",
+            [(amount, wallet_id) for wallet_id, amount in totals.items()],
+        )
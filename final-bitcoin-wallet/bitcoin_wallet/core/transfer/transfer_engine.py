@@ -0,0 +1,137 @@
+import sqlite3
+import time
+from typing import Callable
+
+from bitcoin_wallet.core.exception.invalid_transfer_amount import (
+    InvalidTransferAmountException,
+)
+from bitcoin_wallet.core.exception.not_enough_balance import NotEnoughBalanceException
+from bitcoin_wallet.core.exception.same_transfer_wallets import (
+    SameTransferWalletsException,
+)
+from bitcoin_wallet.core.exception.wallet_not_found import WalletNotFoundException
+from bitcoin_wallet.core.money.satoshi import transfer_fee
+from bitcoin_wallet.core.statistics.platform_statistics import record_transfer
+from bitcoin_wallet.core.transfer.idempotency import (
+    IdempotencyKey,
+    IdempotentResult,
+    find_result,
+    store_result,
+)
+from bitcoin_wallet.core.transfer.placement import LocalPlacement
+
+
+class TransferEngine:
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.time,
+        placement: LocalPlacement | None = None,
+        idempotency_ttl: float = 86_400.0,
+    ) -> None:
+        self.clock = clock
+        self.placement = placement or LocalPlacement()
+        self.idempotency_ttl = idempotency_ttl
+
+    def transfer(
+        self,
+        conn: sqlite3.Connection,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+        idempotency_key: IdempotencyKey | None = None,
+    ) -> int:
+        # Take the write lock up front so the balance guard and the ledger
+        # insert cannot interleave with another writer.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            transaction_id = self.apply(
+                conn, from_wallet_id, to_wallet_id, amount_transferred, idempotency_key
+            )
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        return transaction_id
+
+    def apply(
+        self,
+        conn: sqlite3.Connection,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+        idempotency_key: IdempotencyKey | None = None,
+    ) -> int:
+        if idempotency_key is not None:
+            # Checked under the write lock, so concurrent retries of one key
+            # cannot both move funds.
+            stored = find_result(
+                conn, idempotency_key, int(self.clock() - self.idempotency_ttl)
+            )
+            if stored is not None:
+                return stored.replay(from_wallet_id, to_wallet_id, amount_transferred)
+
+        self._validate(from_wallet_id, to_wallet_id, amount_transferred)
+        fee = self._fee(conn, from_wallet_id, to_wallet_id, amount_transferred)
+
+        debited = conn.execute(
+            "UPDATE wallets SET balance = balance - ? WHERE id = ? AND balance >= ?",
+            (amount_transferred, from_wallet_id, amount_transferred),
+        ).rowcount
+        if debited == 0:
+            raise NotEnoughBalanceException(from_wallet_id)
+
+        created_at = int(self.clock())
+        cursor = conn.execute(
+            "INSERT INTO transactions (id, from_wallet_id, to_wallet_id, "
+            "amount_transferred, lost_amount, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                self.placement.next_transaction_id(conn, from_wallet_id),
+                from_wallet_id,
+                to_wallet_id,
+                amount_transferred,
+                fee,
+                created_at,
+            ),
+        )
+        transaction_id = int(cursor.lastrowid or 0)
+        self.placement.credit(
+            conn, [(transaction_id, to_wallet_id, amount_transferred - fee)]
+        )
+        record_transfer(conn, amount_transferred, fee, created_at)
+        if idempotency_key is not None:
+            result = IdempotentResult(
+                idempotency_key,
+                from_wallet_id,
+                to_wallet_id,
+                amount_transferred,
+                transaction_id,
+            )
+            store_result(conn, result, created_at)
+        return transaction_id
+
+    @staticmethod
+    def _validate(
+        from_wallet_id: int, to_wallet_id: int, amount_transferred: int
+    ) -> None:
+        if from_wallet_id == to_wallet_id:
+            raise SameTransferWalletsException(
+                from_wallet_id=from_wallet_id, to_wallet_id=to_wallet_id
+            )
+        if amount_transferred <= 0:
+            raise InvalidTransferAmountException(amount_transferred)
+
+    def _fee(
+        self,
+        conn: sqlite3.Connection,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount_transferred: int,
+    ) -> int:
+        owners = self.placement.owners(conn, (from_wallet_id, to_wallet_id))
+        for wallet_id in (from_wallet_id, to_wallet_id):
+            if wallet_id not in owners:
+                raise WalletNotFoundException(wallet_id)
+
+        if owners[from_wallet_id] == owners[to_wallet_id]:
+            return 0
+        return transfer_fee(amount_transferred)
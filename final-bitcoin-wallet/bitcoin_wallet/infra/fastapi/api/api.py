@@ -1,11 +1,43 @@
-from fastapi import APIRouter, HTTPException
+from typing import Annotated
 
-from bitcoin_wallet.core.config.constants import ADMIN_API_KEY, USER_DEFAULT_ID
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from bitcoin_wallet.core.config.constants import (
+    ADMIN_API_KEY,
+    MAX_IDEMPOTENCY_KEY_LENGTH,
+    USER_DEFAULT_ID,
+)
 from bitcoin_wallet.core.entity.user import BtcUser
+from bitcoin_wallet.core.exception.idempotency_key_reused import (
+    IdempotencyKeyReusedException,
+)
 from bitcoin_wallet.core.exception.mail_already_present import (
     MailAlreadyPresentException,
 )
 from bitcoin_wallet.core.exception.mail_not_valid import MailNotValidException
+from bitcoin_wallet.core.exception.no_more_wallets import NoMoreWalletsLeftException
+from bitcoin_wallet.core.exception.price_unavailable import PriceUnavailableException
+from bitcoin_wallet.core.exception.user_not_found import UserNotFoundException
+from bitcoin_wallet.core.export.ledger_export import ExportFormat
+from bitcoin_wallet.core.metrics.registry import CONTENT_TYPE
+from bitcoin_wallet.core.money.satoshi import btc_to_satoshi, satoshi_to_btc
+from bitcoin_wallet.core.transfer.batch_transfer import TransferLeg
+from bitcoin_wallet.core.transfer.idempotency import IdempotencyKey
+from bitcoin_wallet.infra.fastapi.dependable.auth_context import AuthContextDependable
+from bitcoin_wallet.infra.fastapi.dependable.metrics_registry import (
+    MetricsRegistryDependable,
+)
+from bitcoin_wallet.infra.fastapi.dependable.page_request import PageRequestDependable
+from bitcoin_wallet.infra.fastapi.dependable.slow_query_log import (
+    SlowQueryLogDependable,
+)
+from bitcoin_wallet.infra.fastapi.dependable.statistics_repository import (
+    StatisticsRepositoryDependable,
+)
+from bitcoin_wallet.infra.fastapi.dependable.statistics_window import (
+    StatisticsWindowDependable,
+)
 from bitcoin_wallet.infra.fastapi.dependable.transaction_repository import (
     TransactionRepositoryDependable,
 )
@@ -15,20 +47,32 @@ from bitcoin_wallet.infra.fastapi.dependable.user_repository import (
 from bitcoin_wallet.infra.fastapi.dependable.wallet_repository import (
     WalletRepositoryDependable,
 )
+from bitcoin_wallet.infra.fastapi.request.auth_context import resolve_auth_context
+from bitcoin_wallet.infra.fastapi.request.batch_transfer_request import (
+    BatchTransferRequest,
+)
 from bitcoin_wallet.infra.fastapi.request.create_user_request import CreateUserRequest
 from bitcoin_wallet.infra.fastapi.request.create_wallet_request import (
     CreateWalletRequest,
 )
+from bitcoin_wallet.infra.fastapi.response.export import export_response
+from bitcoin_wallet.infra.fastapi.response.formatting import (
+    batch_transfer_response,
+    slow_queries_response,
+    statistics_buckets_response,
+    transaction_page_response,
+    wallet_response,
+)
 
 api = APIRouter()
 
 
 @api.post("/users", status_code=201)
-def create_user(
+async def create_user(
     request: CreateUserRequest, users: UserRepositoryDependable
 ) -> dict[str, int]:
     try:
-        btc_user_id = users.create(BtcUser(USER_DEFAULT_ID, request.mail))
+        btc_user_id = await users.create(BtcUser(USER_DEFAULT_ID, request.mail))
         return {"api_key": btc_user_id}
     except MailAlreadyPresentException:
         raise HTTPException(
@@ -39,123 +83,201 @@ def create_user(
 
 
 @api.post("/wallets", status_code=201)
-def create_wallet(
-    request: CreateWalletRequest, wallets: WalletRepositoryDependable
+async def create_wallet(
+    request: CreateWalletRequest,
+    users: UserRepositoryDependable,
+    wallets: WalletRepositoryDependable,
 ) -> dict[str, object]:
-    if not wallets.authorize_user(request.user_id):
-        raise HTTPException(
-            status_code=404, detail=f"User with ID {request.user_id} not found."
-        )
+    owner = await resolve_auth_context(users, request.user_id)
 
-    wallet_dto = wallets.create_wallet(request.user_id, request.initial_balance)
+    try:
+        wallet_dto = await wallets.create_wallet(
+            owner, btc_to_satoshi(request.initial_balance)
+        )
+    except PriceUnavailableException as ex:
+        raise HTTPException(status_code=503, detail=str(ex))
+    except NoMoreWalletsLeftException as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    except UserNotFoundException as ex:
+        raise HTTPException(status_code=404, detail=str(ex))
 
-    return {
-        "wallet_id": wallet_dto.wallet_id,
-        "balance_in_btc": wallet_dto.balance_in_btc,
-        "balance_in_usd": wallet_dto.balance_in_usd,
-    }
+    return wallet_response(wallet_dto)
 
 
 @api.get("/wallets/{address}", response_model=dict[str, object])
-def get_wallet_info(
-    user_id: int, address: int, wallets: WalletRepositoryDependable
+async def get_wallet_info(
+    address: int, owner: AuthContextDependable, wallets: WalletRepositoryDependable
 ) -> dict[str, object]:
-    if not wallets.authorize_user(user_id):
-        raise HTTPException(
-            status_code=404, detail=f"User with ID {user_id} not found."
-        )
-
-    wallet_info = wallets.retrieve_wallet_info(user_id, address)
+    try:
+        wallet_info = await wallets.retrieve_wallet_info(owner, address)
+    except PriceUnavailableException as ex:
+        raise HTTPException(status_code=503, detail=str(ex))
 
     if wallet_info is None:
         raise HTTPException(status_code=404, detail="Wallet not found")
 
-    return {
-        "wallet_id": wallet_info.wallet_id,
-        "balance_in_btc": wallet_info.balance_in_btc,
-        "balance_in_usd": wallet_info.balance_in_usd,
-    }
+    return wallet_response(wallet_info)
 
 
 @api.post("/transactions", status_code=201)
-def make_transaction(
+async def make_transaction(
     from_wallet_id: int,
     to_wallet_id: int,
     amount_transferred: float,
-    user_id: int,
+    owner: AuthContextDependable,
     transactions: TransactionRepositoryDependable,
+    idempotency_key: Annotated[
+        str | None, Header(min_length=1, max_length=MAX_IDEMPOTENCY_KEY_LENGTH)
+    ] = None,
 ) -> dict[str, int | None]:
+    if not owner.owns(from_wallet_id):
+        raise HTTPException(
+            status_code=403,
+            detail="User is not authorized to perform this transaction.",
+        )
+
+    # Keys are scoped to the caller, so users cannot collide with each other.
+    key = None
+    if idempotency_key is not None:
+        key = IdempotencyKey(owner.user_id, idempotency_key)
     try:
-        if not transactions.authorize_transaction(from_wallet_id, user_id):
-            raise HTTPException(
-                status_code=403,
-                detail="User is not authorized to perform this transaction.",
-            )
-
-        transaction_id = transactions.make_transaction(
-            from_wallet_id, to_wallet_id, amount_transferred
+        transaction_id = await transactions.make_transaction(
+            from_wallet_id, to_wallet_id, btc_to_satoshi(amount_transferred), key
         )
         return {"transaction_id": transaction_id}
+    except IdempotencyKeyReusedException as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@api.get("/transactions", response_model=list[dict[str, object]])
-def get_transactions(
-    user_id: int, transactions: TransactionRepositoryDependable
-) -> list[dict[str, object]]:
+@api.post("/transactions/batch", status_code=201)
+async def make_batch_transaction(
+    request: BatchTransferRequest,
+    users: UserRepositoryDependable,
+    transactions: TransactionRepositoryDependable,
+) -> dict[str, object]:
+    owner = await resolve_auth_context(users, request.user_id)
+    if not owner.owns(request.from_wallet_id):
+        raise HTTPException(
+            status_code=403,
+            detail="User is not authorized to perform this transaction.",
+        )
+
     try:
-        user_transactions = transactions.get_user_transactions(user_id)
-        return [
-            {
-                "transaction_id": transaction.id,
-                "from_wallet_id": transaction.from_wallet_id,
-                "to_wallet_id": transaction.to_wallet_id,
-                "amount_transferred": transaction.amount_transferred,
-                "lost_amount": transaction.lost_amount,
-            }
-            for transaction in user_transactions
+        legs = [
+            TransferLeg(leg.to_wallet_id, btc_to_satoshi(leg.amount_transferred))
+            for leg in request.transfers
         ]
+        results = await transactions.make_batch_transaction(
+            request.from_wallet_id, legs, request.mode
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return batch_transfer_response(results)
 
 
-@api.get("/wallets/{address}/transactions", response_model=list[dict[str, object]])
-def get_wallet_transactions(
-    address: int, user_id: int, transactions: TransactionRepositoryDependable
-) -> list[dict[str, object]]:
+@api.get("/transactions", response_model=dict[str, object])
+async def get_transactions(
+    owner: AuthContextDependable,
+    page: PageRequestDependable,
+    transactions: TransactionRepositoryDependable,
+) -> dict[str, object]:
     try:
-        wallet_belongs_to_user = transactions.authorize_transaction(address, user_id)
-        if not wallet_belongs_to_user:
-            raise HTTPException(
-                status_code=403, detail="Unauthorized access to wallet transactions"
-            )
-
-        wallet_transactions = transactions.get_wallet_transactions(address)
-        return [
-            {
-                "transaction_id": transaction.id,
-                "from_wallet_id": transaction.from_wallet_id,
-                "to_wallet_id": transaction.to_wallet_id,
-                "amount_transferred": transaction.amount_transferred,
-                "lost_amount": transaction.lost_amount,
-            }
-            for transaction in wallet_transactions
-        ]
+        user_transactions = await transactions.get_user_transactions(
+            owner, page.with_lookahead()
+        )
+        return transaction_page_response(user_transactions, page)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@api.get("/transactions/export", response_class=StreamingResponse)
+async def export_transactions(
+    owner: AuthContextDependable,
+    transactions: TransactionRepositoryDependable,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+) -> StreamingResponse:
+    return export_response(
+        await transactions.iter_user_transactions(owner),
+        export_format,
+        f"user-{owner.user_id}-transactions",
+    )
+
+
+@api.get("/wallets/{address}/transactions", response_model=dict[str, object])
+async def get_wallet_transactions(
+    address: int,
+    owner: AuthContextDependable,
+    page: PageRequestDependable,
+    transactions: TransactionRepositoryDependable,
+) -> dict[str, object]:
+    if not owner.owns(address):
+        raise HTTPException(
+            status_code=403, detail="Unauthorized access to wallet transactions"
+        )
+
+    try:
+        wallet_transactions = await transactions.get_wallet_transactions(
+            address, page.with_lookahead()
+        )
+        return transaction_page_response(wallet_transactions, page)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@api.get("/wallets/{address}/transactions/export", response_class=StreamingResponse)
+async def export_wallet_transactions(
+    address: int,
+    owner: AuthContextDependable,
+    transactions: TransactionRepositoryDependable,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+) -> StreamingResponse:
+    if not owner.owns(address):
+        raise HTTPException(
+            status_code=403, detail="Unauthorized access to wallet transactions"
+        )
+
+    return export_response(
+        await transactions.iter_wallet_transactions(address),
+        export_format,
+        f"wallet-{address}-transactions",
+    )
+
+
 @api.get("/statistics", status_code=200)
-def get_transaction_statistics(
-    admin_api_key: str, transactions: TransactionRepositoryDependable
+async def get_transaction_statistics(
+    admin_api_key: str,
+    statistics: StatisticsRepositoryDependable,
+    window: StatisticsWindowDependable = None,
 ) -> dict[str, object]:
     if admin_api_key != ADMIN_API_KEY:
         raise HTTPException(status_code=403, detail="Unauthorized to do this operation")
-    all_transactions = transactions.read_all()
+    if window is not None:
+        buckets = await statistics.read_buckets(window)
+        return statistics_buckets_response(buckets, window)
+
+    totals = await statistics.read()
     return {
-        "Total number of transactions": len(all_transactions),
-        "Platform profit": sum(
-            transaction.lost_amount for transaction in all_transactions
-        ),
+        "Total number of transactions": totals.transactions,
+        "Platform profit": satoshi_to_btc(totals.fees),
+        "Total volume": satoshi_to_btc(totals.volume),
     }
+
+
+@api.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(
+    admin_api_key: str, metrics: MetricsRegistryDependable
+) -> PlainTextResponse:
+    if admin_api_key != ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Unauthorized to do this operation")
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+
+@api.get("/admin/slow-queries", status_code=200)
+async def get_slow_queries(
+    admin_api_key: str, slow_queries: SlowQueryLogDependable
+) -> dict[str, object]:
+    if admin_api_key != ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Unauthorized to do this operation")
+    return slow_queries_response(slow_queries)
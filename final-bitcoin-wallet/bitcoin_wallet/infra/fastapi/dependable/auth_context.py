@@ -0,0 +1,8 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.infra.fastapi.request.auth_context import get_auth_context
+
+AuthContextDependable = Annotated[AuthContext, Depends(get_auth_context)]
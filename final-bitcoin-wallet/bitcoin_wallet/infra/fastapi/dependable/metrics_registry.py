@@ -0,0 +1,8 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from bitcoin_wallet.core.metrics.registry import MetricsRegistry
+from bitcoin_wallet.infra.fastapi.repository.metrics import get_metrics_registry
+
+MetricsRegistryDependable = Annotated[MetricsRegistry, Depends(get_metrics_registry)]
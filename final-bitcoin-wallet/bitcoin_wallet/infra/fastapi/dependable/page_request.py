@@ -0,0 +1,8 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from bitcoin_wallet.core.dto.page_request import PageRequest
+from bitcoin_wallet.infra.fastapi.request.page_request import get_page_request
+
+PageRequestDependable = Annotated[PageRequest, Depends(get_page_request)]
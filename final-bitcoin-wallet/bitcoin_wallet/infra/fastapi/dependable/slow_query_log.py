@@ -0,0 +1,8 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from bitcoin_wallet.core.database.slow_query_log import SlowQueryLog
+from bitcoin_wallet.infra.fastapi.repository.slow_query_log import get_slow_query_log
+
+SlowQueryLogDependable = Annotated[SlowQueryLog | None, Depends(get_slow_query_log)]
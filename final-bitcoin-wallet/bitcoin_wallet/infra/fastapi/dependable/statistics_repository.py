@@ -0,0 +1,12 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from bitcoin_wallet.core.repository.async_repository import AsyncStatisticsRepository
+from bitcoin_wallet.infra.fastapi.repository.statistics import (
+    get_statistics_repository,
+)
+
+StatisticsRepositoryDependable = Annotated[
+    AsyncStatisticsRepository, Depends(get_statistics_repository)
+]
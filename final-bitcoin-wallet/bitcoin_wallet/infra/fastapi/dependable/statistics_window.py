@@ -0,0 +1,12 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from bitcoin_wallet.core.dto.statistics_window import StatisticsWindow
+from bitcoin_wallet.infra.fastapi.request.statistics_request import (
+    get_statistics_window,
+)
+
+StatisticsWindowDependable = Annotated[
+    StatisticsWindow | None, Depends(get_statistics_window)
+]
@@ -0,0 +1,55 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from bitcoin_wallet.core.metrics.registry import MetricsRegistry
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetricsMiddleware:
+    # Plain ASGI rather than BaseHTTPMiddleware, which would add a task and a
+    # stream copy to every request just to time it.
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry) -> None:
+        self.app = app
+        self.duration = registry.histogram(
+            "http_request_duration_seconds",
+            "Time to the last byte of the response.",
+            ("method", "route"),
+        )
+        self.responses = registry.counter(
+            "http_responses_total",
+            "Responses sent, by status code.",
+            ("method", "route", "status"),
+        )
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight", "Requests currently being served."
+        ).labels()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.in_flight.dec()
+            # The router leaves the matched route in the scope; its template keeps
+            # /wallets/1 and /wallets/2 in one series.
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            self.duration.labels(method, path).observe(elapsed)
+            self.responses.labels(method, path, status).inc()
@@ -0,0 +1,7 @@
+from fastapi.requests import Request
+
+from bitcoin_wallet.core.metrics.registry import MetricsRegistry
+
+
+def get_metrics_registry(request: Request) -> MetricsRegistry:
+    return request.app.state.metrics  # type: ignore
@@ -0,0 +1,7 @@
+from fastapi.requests import Request
+
+from bitcoin_wallet.core.database.slow_query_log import SlowQueryLog
+
+
+def get_slow_query_log(request: Request) -> SlowQueryLog | None:
+    return request.app.state.slow_query_log  # type: ignore
@@ -0,0 +1,7 @@
+from fastapi.requests import Request
+
+from bitcoin_wallet.core.repository.async_repository import AsyncStatisticsRepository
+
+
+def get_statistics_repository(request: Request) -> AsyncStatisticsRepository:
+    return request.app.state.statistics  # type: ignore
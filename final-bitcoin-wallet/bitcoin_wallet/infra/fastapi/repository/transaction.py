@@ -1,9 +1,7 @@
 from fastapi.requests import Request
 
-from bitcoin_wallet.core.repository.transaction_repository import (
-    BaseTransactionRepository,
-)
+from bitcoin_wallet.core.repository.async_repository import AsyncTransactionRepository
 
 
-def get_transaction_repository(request: Request) -> BaseTransactionRepository:
+def get_transaction_repository(request: Request) -> AsyncTransactionRepository:
     return request.app.state.transactions  # type: ignore
@@ -1,7 +1,7 @@
 from fastapi.requests import Request
 
-from bitcoin_wallet.core.repository.user_repository import BaseUserRepository
+from bitcoin_wallet.core.repository.async_repository import AsyncUserRepository
 
 
-def get_user_repository(request: Request) -> BaseUserRepository:
+def get_user_repository(request: Request) -> AsyncUserRepository:
     return request.app.state.users  # type: ignore
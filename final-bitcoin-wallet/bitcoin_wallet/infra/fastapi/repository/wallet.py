@@ -1,7 +1,7 @@
 from fastapi.requests import Request
 
-from bitcoin_wallet.core.repository.wallet_repository import BaseWalletRepository
+from bitcoin_wallet.core.repository.async_repository import AsyncWalletRepository
 
 
-def get_wallet_repository(request: Request) -> BaseWalletRepository:
+def get_wallet_repository(request: Request) -> AsyncWalletRepository:
     return request.app.state.wallets  # type: ignore
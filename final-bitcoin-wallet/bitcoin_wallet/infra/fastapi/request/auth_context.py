@@ -0,0 +1,21 @@
+from fastapi import HTTPException
+
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.core.exception.user_not_found import UserNotFoundException
+from bitcoin_wallet.core.repository.async_repository import AsyncUserRepository
+from bitcoin_wallet.infra.fastapi.dependable.user_repository import (
+    UserRepositoryDependable,
+)
+
+
+async def resolve_auth_context(users: AsyncUserRepository, user_id: int) -> AuthContext:
+    try:
+        return await users.load_auth_context(user_id)
+    except UserNotFoundException as ex:
+        raise HTTPException(status_code=404, detail=str(ex))
+
+
+async def get_auth_context(
+    user_id: int, users: UserRepositoryDependable
+) -> AuthContext:
+    return await resolve_auth_context(users, user_id)
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+
+from bitcoin_wallet.core.config.constants import MAX_BATCH_LEGS
+from bitcoin_wallet.core.transfer.batch_transfer import BatchMode
+
+
+class BatchTransferLeg(BaseModel):
+    to_wallet_id: int
+    amount_transferred: float
+
+
+class BatchTransferRequest(BaseModel):
+    user_id: int
+    from_wallet_id: int
+    mode: BatchMode = BatchMode.ALL_OR_NOTHING
+    transfers: list[BatchTransferLeg] = Field(min_length=1, max_length=MAX_BATCH_LEGS)
@@ -0,0 +1,36 @@
+import base64
+import binascii
+from typing import Annotated
+
+from fastapi import HTTPException, Query
+
+from bitcoin_wallet.core.config.constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from bitcoin_wallet.core.dto.page_request import PageRequest
+
+CURSOR_PREFIX = "id:"
+
+
+def encode_cursor(transaction_id: int) -> str:
+    raw = f"{CURSOR_PREFIX}{transaction_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    if cursor is None:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, _, transaction_id = raw.partition(":")
+        if f"{prefix}:" != CURSOR_PREFIX:
+            raise ValueError(raw)
+        return int(transaction_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid cursor {cursor!r}")
+
+
+def get_page_request(
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    before: str | None = None,
+) -> PageRequest:
+    return PageRequest(limit, decode_cursor(after), decode_cursor(before))
@@ -0,0 +1,34 @@
+import time
+from datetime import datetime, timezone
+from typing import Annotated
+
+from fastapi import HTTPException, Query
+
+from bitcoin_wallet.core.dto.statistics_window import StatisticsWindow
+from bitcoin_wallet.core.statistics.platform_statistics import Granularity
+
+
+def get_statistics_window(
+    start: Annotated[datetime | None, Query(alias="from")] = None,
+    end: Annotated[datetime | None, Query(alias="to")] = None,
+    granularity: Granularity | None = None,
+) -> StatisticsWindow | None:
+    # Without any of the parameters the endpoint keeps reporting all-time totals.
+    if start is None and end is None and granularity is None:
+        return None
+
+    window = StatisticsWindow(
+        start=0 if start is None else _epoch_seconds(start),
+        end=int(time.time()) if end is None else _epoch_seconds(end),
+        granularity=granularity or Granularity.DAY,
+    )
+    if window.start >= window.end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    return window
+
+
+def _epoch_seconds(moment: datetime) -> int:
+    # Naive timestamps are read as UTC, like the buckets themselves.
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
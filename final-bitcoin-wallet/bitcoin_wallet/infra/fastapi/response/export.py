@@ -0,0 +1,33 @@
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+from bitcoin_wallet.core.entity.transaction import BtcTransaction
+from bitcoin_wallet.core.export.ledger_export import (
+    ExportFormat,
+    export_batch,
+    export_header,
+)
+
+
+def export_response(
+    batches: AsyncIterator[list[BtcTransaction]],
+    export_format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    async def body() -> AsyncIterator[str]:
+        header = export_header(export_format)
+        if header:
+            yield header
+        async for batch in batches:
+            yield export_batch(batch, export_format)
+
+    return StreamingResponse(
+        body(),
+        media_type=export_format.media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{filename}.{export_format.value}"'
+            )
+        },
+    )
@@ -0,0 +1,111 @@
+from datetime import datetime, timezone
+
+from bitcoin_wallet.core.database.slow_query_log import SlowQueryLog
+from bitcoin_wallet.core.dto.page_request import PageRequest
+from bitcoin_wallet.core.dto.statistics_window import StatisticsWindow
+from bitcoin_wallet.core.dto.wallet_dto import WalletDTO
+from bitcoin_wallet.core.entity.transaction import BtcTransaction
+from bitcoin_wallet.core.money.satoshi import satoshi_to_btc
+from bitcoin_wallet.core.statistics.platform_statistics import StatisticsBucket
+from bitcoin_wallet.core.transfer.batch_transfer import LegResult
+from bitcoin_wallet.infra.fastapi.request.page_request import encode_cursor
+
+
+def wallet_response(wallet: WalletDTO) -> dict[str, object]:
+    balance_in_btc = satoshi_to_btc(wallet.balance)
+    return {
+        "wallet_id": wallet.wallet_id,
+        "balance_in_btc": balance_in_btc,
+        "balance_in_usd": round(balance_in_btc * wallet.btc_to_usd, 2),
+    }
+
+
+def transaction_response(transaction: BtcTransaction) -> dict[str, object]:
+    return {
+        "transaction_id": transaction.id,
+        "from_wallet_id": transaction.from_wallet_id,
+        "to_wallet_id": transaction.to_wallet_id,
+        "amount_transferred": satoshi_to_btc(transaction.amount_transferred),
+        "lost_amount": satoshi_to_btc(transaction.lost_amount),
+    }
+
+
+def transaction_page_response(
+    transactions: list[BtcTransaction], page: PageRequest
+) -> dict[str, object]:
+    # "transactions" was fetched with one row of lookahead past the page.
+    has_more = page.limit is not None and len(transactions) > page.limit
+    if has_more:
+        transactions = transactions[1:] if page.backwards else transactions[:-1]
+
+    next_cursor = previous_cursor = None
+    if transactions:
+        first, last = transactions[0].id, transactions[-1].id
+        if page.backwards:
+            next_cursor = encode_cursor(last)
+            previous_cursor = encode_cursor(first) if has_more else None
+        else:
+            next_cursor = encode_cursor(last) if has_more else None
+            previous_cursor = encode_cursor(first) if page.after is not None else None
+
+    return {
+        "transactions": [transaction_response(tx) for tx in transactions],
+        "next_cursor": next_cursor,
+        "previous_cursor": previous_cursor,
+    }
+
+
+def statistics_buckets_response(
+    buckets: list[StatisticsBucket], window: StatisticsWindow
+) -> dict[str, object]:
+    return {
+        "granularity": window.granularity.value,
+        "buckets": [
+            {
+                "start": datetime.fromtimestamp(bucket.start, timezone.utc).isoformat(),
+                "transactions": bucket.transactions,
+                "fees_in_btc": satoshi_to_btc(bucket.fees),
+                "volume_in_btc": satoshi_to_btc(bucket.volume),
+            }
+            for bucket in buckets
+        ],
+    }
+
+
+def batch_transfer_response(results: list[LegResult]) -> dict[str, object]:
+    failed = sum(1 for result in results if result.error is not None)
+    return {
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "transactions": [
+            {
+                "transaction_id": result.transaction_id,
+                "to_wallet_id": result.to_wallet_id,
+                "amount_transferred": satoshi_to_btc(result.amount_transferred),
+                "lost_amount": satoshi_to_btc(result.lost_amount),
+                "error": None if result.error is None else str(result.error),
+            }
+            for result in results
+        ],
+    }
+
+
+def slow_queries_response(log: SlowQueryLog | None) -> dict[str, object]:
+    if log is None:
+        return {"enabled": False, "queries": []}
+    return {
+        "enabled": True,
+        "threshold_ms": log.threshold * 1000,
+        "queries": [
+            {
+                "statement": query.statement,
+                "parameters": query.parameters,
+                "calls": query.calls,
+                "total_ms": round(query.total_seconds * 1000, 3),
+                "max_ms": round(query.max_seconds * 1000, 3),
+                "full_scan": query.full_scan,
+                "plan": list(query.plan),
+            }
+            for query in log.entries()
+        ],
+    }
@@ -1,15 +1,514 @@
 from __future__ import annotations
 
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, ContextManager, Optional, TextIO, TypeVar
+
+import httpx
+import typer
 import uvicorn
 from dotenv import load_dotenv
 from typer import Typer
 
+from bitcoin_wallet.core.config.constants import ADMIN_API_KEY
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+from bitcoin_wallet.core.config.shard_settings import ShardSettings
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.schema import SchemaBootstrapper
+from bitcoin_wallet.core.exception.shard_map_missing import (
+    ShardMapMissingException,
+)
+from bitcoin_wallet.core.exception.shard_not_splittable import (
+    ShardNotSplittableException,
+)
+from bitcoin_wallet.core.exception.user_not_found import UserNotFoundException
+from bitcoin_wallet.core.export.ledger_export import ExportFormat, export_transactions
+from bitcoin_wallet.core.repository.sharded_repository import (
+    ShardedStatisticsRepository,
+    ShardedTransactionRepository,
+    ShardedUserRepository,
+)
+from bitcoin_wallet.core.repository.statistics_repository import (
+    BaseStatisticsRepository,
+    BtcStatisticsRepository,
+)
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BaseTransactionRepository,
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.repository.user_repository import (
+    BaseUserRepository,
+    BtcUserRepository,
+)
+from bitcoin_wallet.core.shard.rebalance import ShardRebalancer
+from bitcoin_wallet.core.shard.shard_map import ShardCatalog, ShardMap
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+from bitcoin_wallet.core.transfer.reconciliation import (
+    LedgerReconciler,
+    Reconciliation,
+)
 from bitcoin_wallet.runner.setup import init_app
 
+APP_FACTORY = "bitcoin_wallet.runner.setup:init_app"
+T = TypeVar("T")
+
 cli = Typer(no_args_is_help=True, add_completion=False)
+db = Typer(no_args_is_help=True, help="Manage the SQLite database.")
+cli.add_typer(db, name="db")
+bench = Typer(no_args_is_help=True, help="Benchmark repositories and routes.")
+cli.add_typer(bench, name="bench")
+shard = Typer(no_args_is_help=True, help="Manage sharded storage (SHARD_MAP).")
+cli.add_typer(shard, name="shard")
 
 
 @cli.command()
-def run(host: str = "127.0.0.1", port: int = 8000) -> None:
+def run(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = typer.Option(1, min=1),
+    max_requests: Optional[int] = typer.Option(
+        None, min=1, help="Recycle a worker after this many requests."
+    ),
+    graceful_timeout: int = typer.Option(
+        30, min=0, help="Seconds in-flight requests get on shutdown."
+    ),
+) -> None:
+    load_dotenv()
+    if workers == 1:
+        if max_requests is not None:
+            raise typer.BadParameter("--max-requests needs --workers 2 or more.")
+        uvicorn.run(
+            host=host,
+            port=port,
+            app=init_app(),
+            timeout_graceful_shutdown=graceful_timeout,
+        )
+        return
+
+    # Migrations run once here rather than racing in every worker, which
+    # inherit DB_BOOTSTRAP_SCHEMA=false and only build their own pool,
+    # executor, writer and price snapshot.
+    _prepare_storage()
+    os.environ["DB_BOOTSTRAP_SCHEMA"] = "false"
+    uvicorn.run(
+        APP_FACTORY,
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        limit_max_requests=max_requests,
+        # Spread recycling out so the workers do not all restart together.
+        limit_max_requests_jitter=(max_requests or 0) // 10,
+        timeout_graceful_shutdown=graceful_timeout,
+    )
+
+
+@cli.command("export")
+def export_ledger(
+    user_id: Optional[int] = None,
+    wallet_id: Optional[int] = None,
+    export_format: ExportFormat = typer.Option(ExportFormat.NDJSON, "--format"),
+    output: Optional[Path] = typer.Option(None, help="Defaults to stdout."),
+) -> None:
+    if (user_id is None) == (wallet_id is None):
+        raise typer.BadParameter("Pass exactly one of --user-id or --wallet-id.")
+
+    load_dotenv()
+    settings = DatabaseSettings.from_env()
+    pools = _shard_pools(settings)
+    users: BaseUserRepository
+    repository: BaseTransactionRepository
+    if pools is None:
+        pool = ConnectionPool.from_settings(settings)
+        users = BtcUserRepository(pool=pool)
+        repository = BtcTransactionRepository(pool=pool)
+        close = pool.close
+    else:
+        # A user's wallets, and so their whole history, live on one shard.
+        users = ShardedUserRepository(pools)
+        repository = ShardedTransactionRepository(pools)
+        close = pools.close
+    try:
+        if user_id is not None:
+            owner = users.load_auth_context(user_id)
+            batches = repository.iter_user_transactions(owner)
+        elif wallet_id is not None:
+            batches = repository.iter_wallet_transactions(wallet_id)
+        with _open_output(output) as stream:
+            stream.writelines(export_transactions(batches, export_format))
+    except UserNotFoundException as ex:
+        typer.echo(str(ex), err=True)
+        raise typer.Exit(code=1)
+    finally:
+        close()
+
+
+@cli.command("slow-queries")
+def slow_queries_report(
+    url: str = "http://127.0.0.1:8000",
+    admin_api_key: str = ADMIN_API_KEY,
+    full_scans_only: bool = False,
+) -> None:
+    try:
+        response = httpx.get(
+            f"{url.rstrip('/')}/admin/slow-queries",
+            params={"admin_api_key": admin_api_key},
+            timeout=10.0,
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as ex:
+        typer.echo(f"Could not fetch slow queries: {ex}", err=True)
+        raise typer.Exit(code=1)
+
+    report = response.json()
+    if not report["enabled"]:
+        typer.echo("Slow-query log is off; set SLOW_QUERY_LOG_ENABLED=true.")
+        return
+    queries = [
+        query
+        for query in report["queries"]
+        if query["full_scan"] or not full_scans_only
+    ]
+    typer.echo(
+        f"{len(queries)} statement(s) over {report['threshold_ms']:g} ms, "
+        f"slowest total first"
+    )
+    for query in queries:
+        flag = "  FULL SCAN" if query["full_scan"] else ""
+        typer.echo(
+            f"\n{query['calls']:>6} calls {query['total_ms']:>10.1f} ms total "
+            f"{query['max_ms']:>8.1f} ms max{flag}"
+        )
+        typer.echo(f"  {query['statement']}")
+        if query["parameters"]:
+            typer.echo(f"  parameters: {query['parameters']}")
+        for step in query["plan"]:
+            typer.echo(f"    {step}")
+
+
+@cli.command("seed")
+def seed_synthetic_data(
+    users: int = typer.Option(1_000_000, min=1),
+    transactions: int = typer.Option(10_000_000, min=0),
+    seed: int = 42,
+    days: int = typer.Option(30, min=1),
+    reset: bool = False,
+) -> None:
+    # The bench modules are imported by the commands that use them, so serving
+    # and the db commands do not load the benchmark harness.
+    from bitcoin_wallet.bench.seeding import Population, seed_database
+
+    load_dotenv()
+    if ShardSettings.from_env().enabled:
+        # Seeded ids are sequential, not placed in their shard's buckets.
+        typer.echo("seed fills DB_PATH only; unset SHARD_MAP to use it.", err=True)
+        raise typer.Exit(code=1)
+    pool = ConnectionPool.from_settings(DatabaseSettings.from_env())
+    schema = SchemaBootstrapper(pool)
+    if reset:
+        schema.drop()
+    schema.create()
+    with pool.connection() as conn:
+        populated = conn.execute("SELECT 1 FROM users LIMIT 1").fetchone()
+    if populated is not None:
+        pool.close()
+        typer.echo("Database already has users; pass --reset to replace it.", err=True)
+        raise typer.Exit(code=1)
+
+    started = time.perf_counter()
+    seed_database(pool, Population(users, transactions, seed, days))
+    with pool.connection() as conn:
+        wallets = conn.execute("SELECT COUNT(*) FROM wallets").fetchone()[0]
+    pool.close()
+    typer.echo(
+        f"Seeded {users} users, {wallets} wallets and {transactions} transactions "
+        f"in {time.perf_counter() - started:.1f}s at {pool.db_path}"
+    )
+
+
+@bench.command("stress")
+def stress_transfers(
+    wallets: int = typer.Option(20, min=2),
+    requests: int = typer.Option(2000, min=1),
+    threads: int = typer.Option(8, min=1),
+    processes: int = typer.Option(2, min=1),
+    seed: int = 42,
+    database: Optional[Path] = typer.Option(
+        None, help="Stressed as it is when it already has wallets."
+    ),
+    url: Optional[str] = typer.Option(
+        None, help="A running server on --database, instead of in-process apps."
+    ),
+) -> None:
+    from bitcoin_wallet.bench.stress import StressConfig, run_stress
+
+    if url is not None and database is None:
+        raise typer.BadParameter("--url needs the server's --database to check.")
+
+    config = StressConfig(wallets, requests, threads, processes, seed, url)
+    with contextlib.ExitStack() as stack:
+        if database is None:
+            tmp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            db_path = os.path.join(tmp_dir, "stress.db")
+        else:
+            db_path = str(database)
+        report = run_stress(config, db_path)
+
+    result = report.result
+    statuses = " ".join(
+        f"{status}={count}" for status, count in sorted(result.statuses.items())
+    )
+    typer.echo(
+        f"{sum(result.statuses.values())} requests in {report.elapsed:.1f}s "
+        f"({report.requests_per_second:.1f}/s) from {processes} process(es) x "
+        f"{threads} thread(s); {len(result.transaction_ids)} transfers committed "
+        f"({report.transfers_per_second:.1f}/s)"
+    )
+    typer.echo(f"statuses: {statuses}")
+    typer.echo(
+        f"lock contention errors: {result.locked}, "
+        f"transport errors: {result.transport_errors}, "
+        f"unresolved: {result.unresolved}"
+    )
+    if not report.violations:
+        typer.echo("violations: none")
+        return
+    typer.echo(f"violations: {len(report.violations)}", err=True)
+    for violation in report.violations:
+        typer.echo(f"  {violation}", err=True)
+    raise typer.Exit(code=1)
+
+
+@db.command("init")
+def init_database(reset: bool = False) -> None:
+    load_dotenv()
+    settings = DatabaseSettings.from_env()
+    pools = _shard_pools(settings)
+    if pools is not None:
+        if reset:
+            pools.drop_schema()
+        pools.create_schema()
+        pools.verify_pragmas()
+        pools.close()
+        for path in pools.shard_map.shards:
+            typer.echo(f"Shard ready at {path}")
+        return
+    if reset:
+        pool = ConnectionPool.from_settings(settings)
+        SchemaBootstrapper(pool).drop()
+        pool.close()
+    _create_schema(settings)
+    typer.echo(f"Database ready at {settings.db_path}")
+
+
+@db.command("rebuild-statistics")
+def rebuild_statistics() -> None:
+    load_dotenv()
+    settings = DatabaseSettings.from_env()
+    pools = _shard_pools(settings)
+    repository: BaseStatisticsRepository
+    if pools is None:
+        pool = ConnectionPool.from_settings(settings)
+        repository = BtcStatisticsRepository(pool=pool)
+        close = pool.close
+    else:
+        repository = ShardedStatisticsRepository(pools)
+        close = pools.close
+    try:
+        statistics = repository.rebuild()
+    finally:
+        close()
+    typer.echo(
+        f"transactions={statistics.transactions} fees={statistics.fees} "
+        f"volume={statistics.volume} (satoshis)"
+    )
+
+
+@db.command("reconcile")
+def reconcile_ledger() -> None:
     load_dotenv()
-    uvicorn.run(host=host, port=port, app=init_app())
+    settings = DatabaseSettings.from_env()
+    shards = ShardSettings.from_env()
+    if shards.enabled:
+        rebalancer = ShardRebalancer(ShardCatalog(shards.catalog), settings)
+        _report_reconciliation(_or_exit(rebalancer.reconcile))
+        return
+    pool = ConnectionPool.from_settings(settings)
+    result = LedgerReconciler(pool).reconcile()
+    pool.close()
+    _report_reconciliation(result)
+
+
+@shard.command("init")
+def init_shards(shards: int = typer.Option(4, min=1)) -> None:
+    catalog = _shard_catalog()
+    if catalog.exists():
+        typer.echo(f"{catalog.path} already holds a shard map.", err=True)
+        raise typer.Exit(code=1)
+    shard_map = ShardMap.uniform(
+        [catalog.shard_path(f"shard-{index:02d}.db") for index in range(shards)]
+    )
+    pools = ShardPools(shard_map, DatabaseSettings.from_env())
+    pools.create_schema()
+    pools.verify_pragmas()
+    pools.close()
+    catalog.save(shard_map)
+    for path in shard_map.shards:
+        typer.echo(f"Shard ready at {path}")
+
+
+@shard.command("status")
+def shard_status() -> None:
+    rebalancer = ShardRebalancer(_shard_catalog(), DatabaseSettings.from_env())
+    for load in _or_exit(rebalancer.loads):
+        typer.echo(
+            f"{load.shard}  buckets={load.buckets} users={load.users} "
+            f"wallets={load.wallets} transfers={load.transfers} "
+            f"pending={load.pending}"
+        )
+
+
+@shard.command("split")
+def split_shard(
+    source: Optional[str] = typer.Argument(
+        None, help="Defaults to the shard that sent the most transfers."
+    ),
+    into: Optional[str] = typer.Option(
+        None, help="Defaults to the next free shard-NN.db."
+    ),
+) -> None:
+    rebalancer = ShardRebalancer(_shard_catalog(), DatabaseSettings.from_env())
+    result = _or_exit(lambda: rebalancer.split(source, into))
+    typer.echo(
+        f"Moved {len(result.buckets)} bucket(s) from {result.source} to "
+        f"{result.target}: users={result.users} wallets={result.wallets} "
+        f"transfers={result.transfers}"
+    )
+    _report_reconciliation(rebalancer.reconcile())
+
+
+@shard.command("reconcile")
+def reconcile_shards() -> None:
+    rebalancer = ShardRebalancer(_shard_catalog(), DatabaseSettings.from_env())
+    drifted = _or_exit(rebalancer.drifted_wallets)
+    for drift in drifted:
+        typer.echo(
+            f"wallet {drift.wallet_id}: balance={drift.balance} "
+            f"expected={drift.expected}",
+            err=True,
+        )
+    _report_reconciliation(rebalancer.reconcile())
+    if drifted:
+        raise typer.Exit(code=1)
+
+
+@bench.command("run")
+def run_benchmarks(
+    users: int = 10_000,
+    transactions: int = 1_000_000,
+    seed: int = 42,
+    iterations: int = 200,
+    database: Optional[Path] = typer.Option(
+        None, help="Seeded once, then reused by later runs. Defaults to a temp file."
+    ),
+    output: Path = Path("bench.json"),
+) -> None:
+    from bitcoin_wallet.bench.seeding import Population
+    from bitcoin_wallet.bench.suite import run_suite
+
+    population = Population(users=users, transactions=transactions, seed=seed)
+    result = run_suite(
+        population, iterations, None if database is None else str(database)
+    )
+    output.write_text(result.to_json(), encoding="utf-8")
+    for case in result.results:
+        typer.echo(
+            f"{case.name:<50} p50 {case.p50_ms:>9.3f} ms  p95 {case.p95_ms:>9.3f} ms"
+            f"  p99 {case.p99_ms:>9.3f} ms  errors {case.errors}"
+        )
+    typer.echo(f"Results written to {output}")
+
+
+@bench.command("compare")
+def compare_benchmarks(base: Path, head: Path, tolerance: float = 0.10) -> None:
+    from bitcoin_wallet.bench.suite import SuiteResult, compare
+
+    comparisons = compare(
+        SuiteResult.from_json(base.read_text(encoding="utf-8")),
+        SuiteResult.from_json(head.read_text(encoding="utf-8")),
+    )
+    regressions = [item for item in comparisons if item.change > tolerance]
+    for item in comparisons:
+        flag = "  REGRESSION" if item in regressions else ""
+        typer.echo(
+            f"{item.name:<50} p50 {item.base_ms:>9.3f} -> {item.head_ms:>9.3f} ms"
+            f" {item.change:>+8.1%}{flag}"
+        )
+    if regressions:
+        typer.echo(f"{len(regressions)} case(s) slower than {tolerance:.0%}", err=True)
+        raise typer.Exit(code=1)
+
+
+def _report_reconciliation(result: Reconciliation) -> None:
+    in_flight = f" in_flight={result.in_flight}" if result.in_flight else ""
+    typer.echo(
+        f"minted={result.minted} balances={result.balances} fees={result.fees}"
+        f"{in_flight} (satoshis)"
+    )
+    if not result.balanced:
+        drift = result.balances + result.in_flight + result.fees - result.minted
+        typer.echo(f"Ledger is out of balance by {drift} satoshis", err=True)
+        raise typer.Exit(code=1)
+    typer.echo("Ledger is balanced")
+
+
+def _shard_catalog() -> ShardCatalog:
+    load_dotenv()
+    settings = ShardSettings.from_env()
+    if not settings.enabled:
+        typer.echo("Set SHARD_MAP to the shard catalog's path.", err=True)
+        raise typer.Exit(code=1)
+    return ShardCatalog(settings.catalog)
+
+
+def _or_exit(action: Callable[[], T]) -> T:
+    try:
+        return action()
+    except (ShardMapMissingException, ShardNotSplittableException) as ex:
+        typer.echo(str(ex), err=True)
+        raise typer.Exit(code=1)
+
+
+def _shard_pools(settings: DatabaseSettings) -> Optional[ShardPools]:
+    shards = ShardSettings.from_env()
+    if not shards.enabled:
+        return None
+    return ShardPools(_or_exit(ShardCatalog(shards.catalog).load), settings)
+
+
+def _prepare_storage() -> None:
+    settings = DatabaseSettings.from_env()
+    pools = _shard_pools(settings)
+    if pools is None:
+        _create_schema(settings)
+        return
+    pools.create_schema()
+    pools.verify_pragmas()
+    pools.close()
+
+
+def _create_schema(settings: DatabaseSettings) -> None:
+    pool = ConnectionPool.from_settings(settings)
+    SchemaBootstrapper(pool).create()
+    pool.verify_pragmas()
+    pool.close()
+
+
+def _open_output(output: Optional[Path]) -> ContextManager[TextIO]:
+    if output is None:
+        return contextlib.nullcontext(sys.stdout)
+    return output.open("w", encoding="utf-8", newline="")
@@ -1,19 +1,267 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
+from bitcoin_wallet.core.cache.ownership_cache import OwnershipCache
+from bitcoin_wallet.core.config.cache_settings import OwnershipCacheSettings
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+from bitcoin_wallet.core.config.idempotency_settings import IdempotencySettings
+from bitcoin_wallet.core.config.price_settings import PriceSettings
+from bitcoin_wallet.core.config.shard_settings import ShardSettings
+from bitcoin_wallet.core.config.slow_query_settings import SlowQuerySettings
+from bitcoin_wallet.core.config.transfer_settings import TransferSettings
+from bitcoin_wallet.core.currencyconverter.cached_converter import CachedConverter
+from bitcoin_wallet.core.currencyconverter.convert_api import (
+    AsyncBitfinexConverter,
+    BitfinexConverter,
+    ConvertBitcoinToUsd,
+)
+from bitcoin_wallet.core.currencyconverter.price_feed import (
+    PriceFeed,
+    PriceSnapshot,
+    SnapshotConverter,
+)
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.executor import DatabaseExecutor
+from bitcoin_wallet.core.database.schema import SchemaBootstrapper
+from bitcoin_wallet.core.database.slow_query_log import SlowQueryLog
+from bitcoin_wallet.core.metrics.collectors import (
+    track_cache,
+    track_group_commit,
+    track_outbox,
+    track_pool,
+    track_price_cache,
+    track_price_feed,
+    track_shard_pools,
+)
+from bitcoin_wallet.core.metrics.registry import MetricsRegistry
+from bitcoin_wallet.core.repository.async_repository import (
+    AsyncStatisticsRepository,
+    AsyncTransactionRepository,
+    AsyncUserRepository,
+    AsyncWalletRepository,
+)
+from bitcoin_wallet.core.repository.sharded_repository import (
+    ShardedStatisticsRepository,
+    ShardedTransactionRepository,
+    ShardedUserRepository,
+    ShardedWalletRepository,
+)
+from bitcoin_wallet.core.repository.statistics_repository import (
+    BtcStatisticsRepository,
+)
 from bitcoin_wallet.core.repository.transaction_repository import (
     BtcTransactionRepository,
 )
 from bitcoin_wallet.core.repository.user_repository import BtcUserRepository
 from bitcoin_wallet.core.repository.wallet_repository import BtcWalletRepository
+from bitcoin_wallet.core.shard.outbox import OutboxRelay
+from bitcoin_wallet.core.shard.shard_map import ShardCatalog
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+from bitcoin_wallet.core.shard.transfer_writer import ShardedTransferWriter
+from bitcoin_wallet.core.transfer.group_commit import GroupCommitWriter
+from bitcoin_wallet.core.transfer.idempotency import (
+    IdempotencyCache,
+    IdempotencySweeper,
+)
+from bitcoin_wallet.core.transfer.transfer_engine import TransferEngine
 from bitcoin_wallet.infra.fastapi.api.api import api
+from bitcoin_wallet.infra.fastapi.middleware.metrics import RequestMetricsMiddleware
 
 
 def init_app() -> FastAPI:
-    app: FastAPI = FastAPI()
+    prices = PriceSettings.from_env()
+    database = DatabaseSettings.from_env()
+    app: FastAPI = FastAPI(lifespan=lifespan)
     app.include_router(api)
+    registry = MetricsRegistry()
+    app.add_middleware(RequestMetricsMiddleware, registry=registry)
 
-    app.state.users = BtcUserRepository()
-    app.state.wallets = BtcWalletRepository()
-    app.state.transactions = BtcTransactionRepository()
+    slow_query_log = build_slow_query_log(SlowQuerySettings.from_env())
+    executor = DatabaseExecutor.from_settings(database, registry)
+    app.state.metrics = registry
+    app.state.slow_query_log = slow_query_log
+    app.state.executor = executor
+    app.state.price_feed = build_price_feed(prices)
+    app.state.converter = build_converter(prices, app.state.price_feed)
+    app.state.ownership_cache = build_ownership_cache(OwnershipCacheSettings.from_env())
+    idempotency = IdempotencySettings.from_env()
+    shards = ShardSettings.from_env()
+    if shards.enabled:
+        build_sharded_storage(app, database, shards, idempotency, slow_query_log)
+    else:
+        build_storage(app, database, idempotency, slow_query_log)
+    app.state.transactions = AsyncTransactionRepository(
+        app.state.transactions,
+        executor,
+        app.state.transfer_writer,
+        IdempotencyCache(max_entries=idempotency.cache_size, ttl=idempotency.ttl),
+    )
+    app.state.idempotency_sweeper = build_idempotency_sweeper(
+        idempotency, app.state.transactions
+    )
+    app.state.users = AsyncUserRepository(app.state.users, executor)
+    app.state.wallets = AsyncWalletRepository(
+        app.state.wallets, executor, app.state.converter
+    )
+    app.state.statistics = AsyncStatisticsRepository(app.state.statistics, executor)
+    track_components(app)
 
     return app
+
+
+def build_storage(
+    app: FastAPI,
+    database: DatabaseSettings,
+    idempotency: IdempotencySettings,
+    slow_query_log: SlowQueryLog | None,
+) -> None:
+    pool = ConnectionPool.from_settings(database, slow_query_log)
+    pool.verify_pragmas()
+    if database.bootstrap_schema:
+        SchemaBootstrapper(pool).create()
+    transfers = TransferSettings.from_env()
+    app.state.pool = pool
+    app.state.transfer_writer = GroupCommitWriter(
+        pool,
+        TransferEngine(idempotency_ttl=idempotency.ttl),
+        batch_size=transfers.batch_size,
+        linger=transfers.linger_ms / 1000,
+    )
+    app.state.outbox_relay = None
+    app.state.users = BtcUserRepository(
+        pool=pool, ownership_cache=app.state.ownership_cache
+    )
+    app.state.wallets = BtcWalletRepository(
+        pool=pool,
+        converter=app.state.converter,
+        ownership_cache=app.state.ownership_cache,
+    )
+    app.state.transactions = BtcTransactionRepository(
+        pool=pool, idempotency_ttl=idempotency.ttl
+    )
+    app.state.statistics = BtcStatisticsRepository(pool=pool)
+
+
+def build_sharded_storage(
+    app: FastAPI,
+    database: DatabaseSettings,
+    shards: ShardSettings,
+    idempotency: IdempotencySettings,
+    slow_query_log: SlowQueryLog | None,
+) -> None:
+    # DB_PATH is unused here: the shard map names every database file, and
+    # DATABASE settings apply to each of them.
+    pools = ShardPools(ShardCatalog(shards.catalog).load(), database, slow_query_log)
+    pools.verify_pragmas()
+    if database.bootstrap_schema:
+        pools.create_schema()
+    transfers = TransferSettings.from_env()
+    app.state.pool = pools
+    app.state.transfer_writer = ShardedTransferWriter(
+        pools,
+        batch_size=transfers.batch_size,
+        linger=transfers.linger_ms / 1000,
+        idempotency_ttl=idempotency.ttl,
+    )
+    app.state.outbox_relay = OutboxRelay(
+        pools, batch_size=shards.relay_batch_size, interval=shards.relay_interval
+    )
+    app.state.users = ShardedUserRepository(pools, app.state.ownership_cache)
+    app.state.wallets = ShardedWalletRepository(
+        pools, app.state.converter, app.state.ownership_cache
+    )
+    app.state.transactions = ShardedTransactionRepository(pools, idempotency.ttl)
+    app.state.statistics = ShardedStatisticsRepository(pools)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.transfer_writer.start()
+    try:
+        async with AsyncExitStack() as background:
+            if app.state.price_feed is not None:
+                await background.enter_async_context(app.state.price_feed.lifespan(app))
+            if app.state.idempotency_sweeper is not None:
+                await background.enter_async_context(
+                    app.state.idempotency_sweeper.lifespan(app)
+                )
+            if app.state.outbox_relay is not None:
+                await background.enter_async_context(
+                    app.state.outbox_relay.lifespan(app)
+                )
+            yield
+    finally:
+        app.state.transfer_writer.stop()
+        app.state.executor.shutdown()
+        app.state.pool.close()
+
+
+def build_price_feed(settings: PriceSettings) -> PriceFeed | None:
+    if settings.poll_interval <= 0:
+        return None
+    return PriceFeed(
+        AsyncBitfinexConverter(settings.source_url, settings.request_timeout),
+        PriceSnapshot(),
+        interval=settings.poll_interval,
+    )
+
+
+def build_converter(
+    settings: PriceSettings, feed: PriceFeed | None
+) -> ConvertBitcoinToUsd:
+    if feed is not None:
+        return SnapshotConverter(feed.snapshot, settings.max_staleness)
+    return CachedConverter(
+        BitfinexConverter(settings.source_url, settings.request_timeout),
+        ttl=settings.ttl,
+        stale_ttl=settings.stale_ttl,
+        retry_interval=settings.retry_interval,
+    )
+
+
+def build_idempotency_sweeper(
+    settings: IdempotencySettings, transactions: AsyncTransactionRepository
+) -> IdempotencySweeper | None:
+    if settings.sweep_interval <= 0:
+        return None
+    return IdempotencySweeper(
+        transactions.sweep_idempotency_keys,
+        ttl=settings.ttl,
+        interval=settings.sweep_interval,
+        batch_size=settings.sweep_batch_size,
+    )
+
+
+def build_ownership_cache(settings: OwnershipCacheSettings) -> OwnershipCache | None:
+    if not settings.enabled:
+        return None
+    return OwnershipCache(max_entries=settings.max_entries, ttl=settings.ttl)
+
+
+def build_slow_query_log(settings: SlowQuerySettings) -> SlowQueryLog | None:
+    if not settings.enabled:
+        return None
+    return SlowQueryLog(
+        threshold=settings.threshold_ms / 1000, max_entries=settings.max_entries
+    )
+
+
+def track_components(app: FastAPI) -> None:
+    registry = app.state.metrics
+    if isinstance(app.state.pool, ShardPools):
+        track_shard_pools(registry, app.state.pool)
+    else:
+        track_pool(registry, app.state.pool)
+    if app.state.outbox_relay is not None:
+        track_outbox(registry, app.state.outbox_relay)
+    track_group_commit(registry, app.state.transfer_writer)
+    if app.state.price_feed is not None:
+        track_price_feed(registry, app.state.price_feed)
+    if isinstance(app.state.converter, CachedConverter):
+        track_price_cache(registry, app.state.converter)
+    if app.state.ownership_cache is not None:
+        track_cache(registry, "ownership", app.state.ownership_cache)
+    if app.state.transactions.idempotency_cache is not None:
+        track_cache(registry, "idempotency", app.state.transactions.idempotency_cache)
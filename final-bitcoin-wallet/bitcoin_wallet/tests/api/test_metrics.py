@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bitcoin_wallet.core.cache.ownership_cache import OwnershipCache
+from bitcoin_wallet.core.config.constants import ADMIN_API_KEY, SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.executor import DatabaseExecutor
+from bitcoin_wallet.core.metrics.collectors import track_cache, track_pool
+from bitcoin_wallet.core.metrics.registry import MetricsRegistry
+from bitcoin_wallet.core.repository.async_repository import (
+    AsyncUserRepository,
+    AsyncWalletRepository,
+)
+from bitcoin_wallet.core.repository.user_repository import BtcUserRepository
+from bitcoin_wallet.core.repository.wallet_repository import BtcWalletRepository
+from bitcoin_wallet.infra.fastapi.api.api import api
+from bitcoin_wallet.infra.fastapi.middleware.metrics import RequestMetricsMiddleware
+from bitcoin_wallet.tests.currencyconverter.stub_price_source import StubPriceSource
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmp_dir.name, "metrics.db")
+        SetupForTests.create_tables(db_path)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("INSERT INTO users (id, mail) VALUES (1, 'first@gmail.com')")
+            conn.execute(
+                "INSERT INTO wallets (id, user_id, balance) VALUES (1, 1, ?)", (BTC,)
+            )
+            conn.execute("INSERT INTO user_wallets (user_id, wallet_id) VALUES (1, 1)")
+        self.pool = ConnectionPool(db_path)
+        registry = MetricsRegistry()
+        self.executor = DatabaseExecutor(readers=1, registry=registry)
+        cache = OwnershipCache()
+        converter = StubPriceSource()
+        app = FastAPI()
+        app.include_router(api)
+        app.add_middleware(RequestMetricsMiddleware, registry=registry)
+        app.state.metrics = registry
+        app.state.users = AsyncUserRepository(
+            BtcUserRepository(pool=self.pool, ownership_cache=cache), self.executor
+        )
+        app.state.wallets = AsyncWalletRepository(
+            BtcWalletRepository(
+                pool=self.pool, converter=converter, ownership_cache=cache
+            ),
+            self.executor,
+            converter,
+        )
+        track_pool(registry, self.pool)
+        track_cache(registry, "ownership", cache)
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.executor.shutdown()
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def _scrape(self) -> str:
+        response = self.client.get("/metrics", params={"admin_api_key": ADMIN_API_KEY})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        text: str = response.text
+        return text
+
+    def test_requests_are_labelled_by_route_template(self) -> None:
+        self.client.get("/wallets/1", params={"user_id": 1})
+        self.client.get("/wallets/1", params={"user_id": 1})
+        self.client.get("/wallets/2", params={"user_id": 1})
+        self.client.get("/nowhere")
+
+        metrics = self._scrape()
+
+        wallet = 'method="GET",route="/wallets/{address}"'
+        self.assertIn(f"http_request_duration_seconds_count{{{wallet}}} 3", metrics)
+        self.assertIn(f'http_responses_total{{{wallet},status="200"}} 2', metrics)
+        self.assertIn(f'http_responses_total{{{wallet},status="405"}} 1', metrics)
+        self.assertIn(
+            'http_responses_total{method="GET",route="unmatched",status="404"} 1',
+            metrics,
+        )
+        # The scrape itself is the one request in flight.
+        self.assertIn("http_requests_in_flight 1\n", metrics)
+
+    def test_repository_methods_and_components_are_exported(self) -> None:
+        self.client.get("/wallets/1", params={"user_id": 1})
+        self.client.get("/wallets/1", params={"user_id": 1})
+
+        metrics = self._scrape()
+
+        self.assertIn(
+            "db_operation_duration_seconds_count"
+            '{operation="BtcWalletRepository.retrieve_wallet_info"} 2',
+            metrics,
+        )
+        self.assertIn('cache_hits_total{cache="ownership"} 1', metrics)
+        self.assertIn('cache_hit_ratio{cache="ownership"} 0.5', metrics)
+        self.assertIn("sqlite_pool_in_use 0\n", metrics)
+
+    def test_metrics_require_the_admin_key(self) -> None:
+        response = self.client.get("/metrics", params={"admin_api_key": "wrong"})
+
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from fastapi import HTTPException
+
+from bitcoin_wallet.core.dto.page_request import PageRequest
+from bitcoin_wallet.infra.fastapi.request.page_request import (
+    decode_cursor,
+    encode_cursor,
+    get_page_request,
+)
+
+
+class TestPageRequest(unittest.TestCase):
+    def test_cursor_round_trips(self) -> None:
+        cursor = encode_cursor(123456)
+
+        self.assertNotIn("123456", cursor)
+        self.assertEqual(decode_cursor(cursor), 123456)
+
+    def test_malformed_cursor_is_rejected(self) -> None:
+        for cursor in ("not a cursor", encode_cursor(1)[:-1] + "!", "eDox"):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(HTTPException) as context:
+                    decode_cursor(cursor)
+                self.assertEqual(context.exception.status_code, 400)
+
+    def test_page_request_decodes_both_bounds(self) -> None:
+        page = get_page_request(20, encode_cursor(5), encode_cursor(50))
+
+        self.assertEqual(page, PageRequest(limit=20, after=5, before=50))
+        self.assertFalse(page.backwards)
+        self.assertEqual(page.with_lookahead().limit, 21)
+
+
+if __name__ == "__main__":
+    unittest.main()
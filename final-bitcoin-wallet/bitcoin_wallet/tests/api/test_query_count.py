@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bitcoin_wallet.core.cache.ownership_cache import OwnershipCache
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.executor import DatabaseExecutor
+from bitcoin_wallet.core.repository.async_repository import (
+    AsyncTransactionRepository,
+    AsyncUserRepository,
+    AsyncWalletRepository,
+)
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.repository.user_repository import BtcUserRepository
+from bitcoin_wallet.core.repository.wallet_repository import BtcWalletRepository
+from bitcoin_wallet.infra.fastapi.api.api import api
+from bitcoin_wallet.tests.currencyconverter.stub_price_source import StubPriceSource
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+IDENTITY_LOOKUP = "FROM users"
+
+
+class TracingPool(ConnectionPool):
+    def __init__(self, db_path: str) -> None:
+        super().__init__(db_path)
+        self.statements: list[str] = []
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        with super().connection() as conn:
+            conn.set_trace_callback(self.statements.append)
+            try:
+                yield conn
+            finally:
+                conn.set_trace_callback(None)
+
+
+class TestQueryCount(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmp_dir.name, "query_count.db")
+        SetupForTests.create_tables(db_path)
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany(
+                "INSERT INTO users (id, mail) VALUES (?, ?)",
+                [(1, "first@gmail.com"), (2, "second@gmail.com")],
+            )
+            conn.executemany(
+                "INSERT INTO wallets (id, user_id, balance) VALUES (?, ?, ?)",
+                [(1, 1, BTC), (2, 1, BTC), (3, 2, BTC)],
+            )
+            conn.executemany(
+                "INSERT INTO user_wallets (user_id, wallet_id) VALUES (?, ?)",
+                [(1, 1), (1, 2), (2, 3)],
+            )
+        self.pool = TracingPool(db_path)
+        self.executor = DatabaseExecutor(readers=1)
+        self.cache = OwnershipCache()
+        converter = StubPriceSource()
+        app = FastAPI()
+        app.include_router(api)
+        app.state.users = AsyncUserRepository(
+            BtcUserRepository(pool=self.pool, ownership_cache=self.cache),
+            self.executor,
+        )
+        app.state.wallets = AsyncWalletRepository(
+            BtcWalletRepository(
+                pool=self.pool,
+                converter=converter,
+                ownership_cache=self.cache,
+            ),
+            self.executor,
+            converter,
+        )
+        app.state.transactions = AsyncTransactionRepository(
+            BtcTransactionRepository(pool=self.pool), self.executor
+        )
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.executor.shutdown()
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def _queries(self, send: Callable[[], httpx.Response]) -> list[str]:
+        self.pool.statements.clear()
+        response = send()
+        self.assertLess(response.status_code, 300, response.text)
+        return [
+            statement
+            for statement in self.pool.statements
+            if statement.startswith(("SELECT", "INSERT", "UPDATE"))
+        ]
+
+    def test_each_request_resolves_the_caller_once(self) -> None:
+        client = self.client
+        requests: list[tuple[str, Callable[[], httpx.Response], int]] = [
+            ("GET /wallets", lambda: client.get("/wallets/2?user_id=1"), 2),
+            ("GET /transactions", lambda: client.get("/transactions?user_id=1"), 2),
+            (
+                "GET /wallets/transactions",
+                lambda: client.get("/wallets/2/transactions?user_id=1"),
+                2,
+            ),
+            (
+                "POST /transactions",
+                lambda: client.post(
+                    "/transactions",
+                    params={
+                        "from_wallet_id": 1,
+                        "to_wallet_id": 3,
+                        "amount_transferred": 0.1,
+                        "user_id": 1,
+                    },
+                ),
+                7,
+            ),
+            (
+                "POST /wallets",
+                lambda: client.post(
+                    "/wallets", json={"user_id": 2, "initial_balance": 1}
+                ),
+                5,
+            ),
+        ]
+        for endpoint, send, expected in requests:
+            with self.subTest(endpoint):
+                queries = self._queries(send)
+                lookups = [query for query in queries if IDENTITY_LOOKUP in query]
+                self.assertEqual(len(lookups), 1, queries)
+                self.assertEqual(len(queries), expected, queries)
+
+    def test_cached_caller_is_only_revalidated(self) -> None:
+        self._queries(lambda: self.client.get("/transactions?user_id=1"))
+
+        queries = self._queries(lambda: self.client.get("/transactions?user_id=1"))
+
+        self.assertEqual(
+            queries[0], "SELECT wallets_generation FROM users WHERE id = 1"
+        )
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(self.cache.metrics().hits, 1)
+
+    def test_foreign_wallet_is_rejected_without_touching_it(self) -> None:
+        self.pool.statements.clear()
+
+        response = self.client.get("/wallets/3", params={"user_id": 1})
+
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(len(self.pool.statements), 1)
+
+    def test_unknown_user_is_not_found(self) -> None:
+        response = self.client.get("/transactions", params={"user_id": 42})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["detail"], "User with ID 42 not found.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import sqlite3
+import unittest
+
+from fastapi import HTTPException
+
+from bitcoin_wallet.core.config.constants import ADMIN_API_KEY
+from bitcoin_wallet.core.database.slow_query_log import SlowQueryLog
+from bitcoin_wallet.infra.fastapi.api.api import get_slow_queries
+
+
+class TestGetSlowQueries(unittest.IsolatedAsyncioTestCase):
+    async def test_reports_statements_with_their_plan(self) -> None:
+        log = SlowQueryLog(threshold=0.25)
+        with sqlite3.connect(":memory:") as conn:
+            conn.execute("CREATE TABLE wallets (id INTEGER PRIMARY KEY, balance)")
+            log.record(conn, "SELECT balance FROM wallets", (), 0.5)
+
+        actual = await get_slow_queries(ADMIN_API_KEY, log)
+
+        self.assertEqual(
+            actual,
+            {
+                "enabled": True,
+                "threshold_ms": 250.0,
+                "queries": [
+                    {
+                        "statement": "SELECT balance FROM wallets",
+                        "parameters": "",
+                        "calls": 1,
+                        "total_ms": 500.0,
+                        "max_ms": 500.0,
+                        "full_scan": True,
+                        "plan": ["SCAN wallets"],
+                    }
+                ],
+            },
+        )
+
+    async def test_reports_when_the_log_is_off(self) -> None:
+        actual = await get_slow_queries(ADMIN_API_KEY, None)
+
+        self.assertEqual(actual, {"enabled": False, "queries": []})
+
+    async def test_requires_the_admin_key(self) -> None:
+        with self.assertRaises(HTTPException) as cm:
+            await get_slow_queries("wrong", None)
+        self.assertEqual(cm.exception.status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
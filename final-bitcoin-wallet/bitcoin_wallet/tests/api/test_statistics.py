@@ -1,40 +1,72 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock
 
 from fastapi import HTTPException
 
 from bitcoin_wallet.core.config.constants import ADMIN_API_KEY
+from bitcoin_wallet.core.dto.statistics_window import StatisticsWindow
+from bitcoin_wallet.core.statistics.platform_statistics import (
+    Granularity,
+    PlatformStatistics,
+    StatisticsBucket,
+)
 from bitcoin_wallet.infra.fastapi.api.api import get_transaction_statistics
 
 
-class TestGetTransactionStatistics(unittest.TestCase):
+class TestGetTransactionStatistics(unittest.IsolatedAsyncioTestCase):
     def setUp(self) -> None:
-        self.mock_transaction_repository = MagicMock()
-
-    def test_get_transaction_statistics_success(self) -> None:
-        expected = {"Platform profit": 350.9, "Total number of transactions": 7}
-        self.mock_transaction_repository.read_all.return_value = [
-            MagicMock(lost_amount=10.0),
-            MagicMock(lost_amount=20.0),
-            MagicMock(lost_amount=27.7),
-            MagicMock(lost_amount=112.55),
-            MagicMock(lost_amount=80.05),
-            MagicMock(lost_amount=0.6),
-            MagicMock(lost_amount=100.0),
-        ]
-        actual = get_transaction_statistics(
-            ADMIN_API_KEY, self.mock_transaction_repository
+        self.mock_statistics_repository = AsyncMock()
+
+    async def test_get_transaction_statistics_success(self) -> None:
+        expected = {
+            "Platform profit": 350.9,
+            "Total number of transactions": 7,
+            "Total volume": 23393.5,
+        }
+        self.mock_statistics_repository.read.return_value = PlatformStatistics(
+            transactions=7, fees=35_090_000_000, volume=2_339_350_000_000
+        )
+        actual = await get_transaction_statistics(
+            ADMIN_API_KEY, self.mock_statistics_repository
         )
         self.assertEqual(expected, actual)
 
-    def test_get_transaction_statistics_unauthorized(self) -> None:
+    async def test_get_transaction_statistics_by_bucket(self) -> None:
+        window = StatisticsWindow(0, 2 * 86_400, Granularity.DAY)
+        self.mock_statistics_repository.read_buckets.return_value = [
+            StatisticsBucket(86_400, 3, 1_500_000, 100_000_000)
+        ]
+
+        actual = await get_transaction_statistics(
+            ADMIN_API_KEY, self.mock_statistics_repository, window
+        )
+
+        self.assertEqual(
+            actual,
+            {
+                "granularity": "day",
+                "buckets": [
+                    {
+                        "start": "1970-01-02T00:00:00+00:00",
+                        "transactions": 3,
+                        "fees_in_btc": 0.015,
+                        "volume_in_btc": 1.0,
+                    }
+                ],
+            },
+        )
+        self.mock_statistics_repository.read_buckets.assert_called_once_with(window)
+        self.mock_statistics_repository.read.assert_not_called()
+
+    async def test_get_transaction_statistics_unauthorized(self) -> None:
         invalid_api_key = "INVALID-KEY"
         with self.assertRaises(HTTPException) as cm:
-            get_transaction_statistics(
-                invalid_api_key, self.mock_transaction_repository
+            await get_transaction_statistics(
+                invalid_api_key, self.mock_statistics_repository
             )
         self.assertEqual(cm.exception.status_code, 403)
         self.assertEqual(cm.exception.detail, "Unauthorized to do this operation")
+        self.mock_statistics_repository.read.assert_not_called()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+
+from bitcoin_wallet.core.dto.statistics_window import StatisticsWindow
+from bitcoin_wallet.core.statistics.platform_statistics import Granularity
+from bitcoin_wallet.infra.fastapi.request.statistics_request import (
+    get_statistics_window,
+)
+
+
+class TestStatisticsWindow(unittest.TestCase):
+    def test_no_parameters_means_all_time_totals(self) -> None:
+        self.assertIsNone(get_statistics_window())
+
+    def test_naive_bounds_are_read_as_utc(self) -> None:
+        window = get_statistics_window(
+            datetime(1970, 1, 2), datetime(1970, 1, 3, 1), Granularity.HOUR
+        )
+
+        self.assertEqual(window, StatisticsWindow(86_400, 176_400, Granularity.HOUR))
+
+    def test_aware_bounds_are_converted(self) -> None:
+        plus_two = timezone(timedelta(hours=2))
+
+        window = get_statistics_window(end=datetime(1970, 1, 2, 2, tzinfo=plus_two))
+
+        self.assertEqual(window, StatisticsWindow(0, 86_400, Granularity.DAY))
+
+    def test_empty_window_is_rejected(self) -> None:
+        with self.assertRaises(HTTPException) as context:
+            get_statistics_window(datetime(2024, 1, 2), datetime(2024, 1, 1))
+        self.assertEqual(context.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,37 +1,62 @@
 import unittest
-from unittest.mock import MagicMock, patch
+from typing import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi import HTTPException
 
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.core.dto.page_request import PageRequest
+from bitcoin_wallet.core.entity.transaction import BtcTransaction
+from bitcoin_wallet.core.exception.idempotency_key_reused import (
+    IdempotencyKeyReusedException,
+)
+from bitcoin_wallet.core.exception.user_not_found import UserNotFoundException
+from bitcoin_wallet.core.exception.wallet_not_found import WalletNotFoundException
+from bitcoin_wallet.core.export.ledger_export import ExportFormat
+from bitcoin_wallet.core.transfer.batch_transfer import (
+    BatchMode,
+    LegResult,
+    TransferLeg,
+)
+from bitcoin_wallet.core.transfer.idempotency import IdempotencyKey
 from bitcoin_wallet.infra.fastapi.api.api import (
+    export_transactions,
+    export_wallet_transactions,
     get_transactions,
     get_wallet_transactions,
+    make_batch_transaction,
     make_transaction,
 )
+from bitcoin_wallet.infra.fastapi.request.batch_transfer_request import (
+    BatchTransferLeg,
+    BatchTransferRequest,
+)
+from bitcoin_wallet.infra.fastapi.request.page_request import encode_cursor
 
 
-class TestTransactionAPI(unittest.TestCase):
+class TestTransactionAPI(unittest.IsolatedAsyncioTestCase):
     def setUp(self) -> None:
-        self.transactions_mock = MagicMock()
+        self.transactions_mock = AsyncMock()
+        self.users_mock = AsyncMock()
+        self.page = PageRequest(limit=10)
+        self.owner = AuthContext(1, frozenset({1, 2}))
 
     @patch(
         "bitcoin_wallet.infra.fastapi.dependable."
         "transaction_repository.TransactionRepositoryDependable",
         autospec=True,
     )
-    def test_make_transaction_success(self, mock_transactions: MagicMock) -> None:
+    async def test_make_transaction_success(self, mock_transactions: MagicMock) -> None:
         mock_transactions.return_value = self.transactions_mock
-        user_id = 1
         from_wallet_id = 1
         to_wallet_id = 2
         amount_transferred = 10.0
         expected_transaction_id = 123
 
-        self.transactions_mock.authorize_transaction.return_value = True
         self.transactions_mock.make_transaction.return_value = expected_transaction_id
 
-        response = make_transaction(
-            user_id=user_id,
+        response = await make_transaction(
+            owner=self.owner,
             from_wallet_id=from_wallet_id,
             to_wallet_id=to_wallet_id,
             amount_transferred=amount_transferred,
@@ -39,37 +64,67 @@ class TestTransactionAPI(unittest.TestCase):
         )
 
         self.assertEqual(response, {"transaction_id": expected_transaction_id})
-        self.transactions_mock.authorize_transaction.assert_called_once_with(
-            from_wallet_id, user_id
+        self.transactions_mock.authorize_transaction.assert_not_called()
+        self.transactions_mock.make_transaction.assert_called_once_with(
+            from_wallet_id, to_wallet_id, 1_000_000_000, None
+        )
+
+    async def test_idempotency_key_is_scoped_to_the_caller(self) -> None:
+        self.transactions_mock.make_transaction.return_value = 5
+
+        response = await make_transaction(
+            from_wallet_id=1,
+            to_wallet_id=3,
+            amount_transferred=0.5,
+            owner=self.owner,
+            transactions=self.transactions_mock,
+            idempotency_key="retry-me",
         )
+
+        self.assertEqual(response, {"transaction_id": 5})
         self.transactions_mock.make_transaction.assert_called_once_with(
-            from_wallet_id, to_wallet_id, amount_transferred
+            1, 3, 50_000_000, IdempotencyKey(1, "retry-me")
         )
 
+    async def test_reused_idempotency_key_is_unprocessable(self) -> None:
+        self.transactions_mock.make_transaction.side_effect = (
+            IdempotencyKeyReusedException("retry-me")
+        )
+
+        with self.assertRaises(HTTPException) as context:
+            await make_transaction(
+                from_wallet_id=1,
+                to_wallet_id=3,
+                amount_transferred=0.5,
+                owner=self.owner,
+                transactions=self.transactions_mock,
+                idempotency_key="retry-me",
+            )
+
+        self.assertEqual(context.exception.status_code, 422)
+
     @patch(
         "bitcoin_wallet.infra.fastapi.dependable."
         "transaction_repository.TransactionRepositoryDependable",
         autospec=True,
     )
-    def test_make_transaction_unauthorized(self, mock_transactions: MagicMock) -> None:
+    async def test_make_transaction_unauthorized(
+        self, mock_transactions: MagicMock
+    ) -> None:
         mock_transactions.return_value = self.transactions_mock
-        user_id = 1
-        from_wallet_id = 1
+        from_wallet_id = 3
         to_wallet_id = 2
         amount_transferred = 10.0
 
-        self.transactions_mock.authorize_transaction.return_value = False
-        with self.assertRaises(HTTPException):
-            make_transaction(
-                user_id=user_id,
+        with self.assertRaises(HTTPException) as context:
+            await make_transaction(
+                owner=self.owner,
                 from_wallet_id=from_wallet_id,
                 to_wallet_id=to_wallet_id,
                 amount_transferred=amount_transferred,
                 transactions=self.transactions_mock,
             )
-        self.transactions_mock.authorize_transaction.assert_called_once_with(
-            from_wallet_id, user_id
-        )
+        self.assertEqual(context.exception.status_code, 403)
         self.transactions_mock.make_transaction.assert_not_called()
 
     @patch(
@@ -77,23 +132,22 @@ class TestTransactionAPI(unittest.TestCase):
         "transaction_repository.TransactionRepositoryDependable",
         autospec=True,
     )
-    def test_get_transactions_success(self, mock_transactions: MagicMock) -> None:
+    async def test_get_transactions_success(self, mock_transactions: MagicMock) -> None:
         mock_transactions.return_value = self.transactions_mock
-        user_id = 1
         expected_user_transactions = [
             MagicMock(
                 id=1,
                 from_wallet_id=1,
                 to_wallet_id=2,
-                amount_transferred=10.0,
-                lost_amount=0.0,
+                amount_transferred=1_000_000_000,
+                lost_amount=0,
             ),
             MagicMock(
                 id=2,
                 from_wallet_id=2,
                 to_wallet_id=3,
-                amount_transferred=5.0,
-                lost_amount=0.0,
+                amount_transferred=500_000_000,
+                lost_amount=0,
             ),
         ]
 
@@ -101,12 +155,12 @@ class TestTransactionAPI(unittest.TestCase):
             expected_user_transactions
         )
 
-        response = get_transactions(
-            user_id=user_id, transactions=self.transactions_mock
+        response = await get_transactions(
+            owner=self.owner, page=self.page, transactions=self.transactions_mock
         )
 
         self.assertEqual(
-            response,
+            response["transactions"],
             [
                 {
                     "transaction_id": 1,
@@ -124,67 +178,76 @@ class TestTransactionAPI(unittest.TestCase):
                 },
             ],
         )
-        self.transactions_mock.get_user_transactions.assert_called_once_with(user_id)
+        self.assertIsNone(response["next_cursor"])
+        self.transactions_mock.get_user_transactions.assert_called_once_with(
+            self.owner, PageRequest(limit=11)
+        )
 
     @patch(
         "bitcoin_wallet.infra.fastapi.dependable."
         "transaction_repository.TransactionRepositoryDependable",
         autospec=True,
     )
-    def test_get_transactions_exception(self, mock_transactions: MagicMock) -> None:
+    async def test_get_transactions_exception(
+        self, mock_transactions: MagicMock
+    ) -> None:
         mock_transactions.return_value = self.transactions_mock
-        user_id = 1
 
         self.transactions_mock.get_user_transactions.side_effect = Exception(
             "Test exception"
         )
 
         with self.assertRaises(HTTPException) as context:
-            get_transactions(user_id=user_id, transactions=self.transactions_mock)
+            await get_transactions(
+                owner=self.owner, page=self.page, transactions=self.transactions_mock
+            )
 
         self.assertEqual(context.exception.status_code, 400)
-        self.transactions_mock.get_user_transactions.assert_called_once_with(user_id)
+        self.transactions_mock.get_user_transactions.assert_called_once_with(
+            self.owner, PageRequest(limit=11)
+        )
 
     @patch(
         "bitcoin_wallet.infra.fastapi.dependable."
         "transaction_repository.TransactionRepositoryDependable",
         autospec=True,
     )
-    def test_get_wallet_transactions_success(
+    async def test_get_wallet_transactions_success(
         self, mock_transactions: MagicMock
     ) -> None:
         mock_transactions.return_value = self.transactions_mock
-        user_id = 1
         address = 2
         expected_wallet_transactions = [
             MagicMock(
                 id=1,
                 from_wallet_id=2,
                 to_wallet_id=3,
-                amount_transferred=5.0,
-                lost_amount=0.0,
+                amount_transferred=500_000_000,
+                lost_amount=0,
             ),
             MagicMock(
                 id=2,
                 from_wallet_id=3,
                 to_wallet_id=4,
-                amount_transferred=8.0,
-                lost_amount=0.0,
+                amount_transferred=800_000_000,
+                lost_amount=0,
             ),
         ]
 
-        self.transactions_mock.authorize_transaction.return_value = True
         self.transactions_mock.get_wallet_transactions.return_value = (
             expected_wallet_transactions
         )
 
         # Test
-        response = get_wallet_transactions(
-            address=address, user_id=user_id, transactions=self.transactions_mock
+        response = await get_wallet_transactions(
+            address=address,
+            owner=self.owner,
+            page=self.page,
+            transactions=self.transactions_mock,
         )
 
         self.assertEqual(
-            response,
+            response["transactions"],
             [
                 {
                     "transaction_id": 1,
@@ -202,34 +265,176 @@ class TestTransactionAPI(unittest.TestCase):
                 },
             ],
         )
-        self.transactions_mock.authorize_transaction.assert_called_once_with(
-            address, user_id
+        self.transactions_mock.get_wallet_transactions.assert_called_once_with(
+            address, PageRequest(limit=11)
         )
-        self.transactions_mock.get_wallet_transactions.assert_called_once_with(address)
 
     @patch(
         "bitcoin_wallet.infra.fastapi.dependable."
         "transaction_repository.TransactionRepositoryDependable",
         autospec=True,
     )
-    def test_get_wallet_transactions_unauthorized(
+    async def test_get_wallet_transactions_unauthorized(
         self, mock_transactions: MagicMock
     ) -> None:
         mock_transactions.return_value = self.transactions_mock
-        user_id = 1
-        address = 2
+        address = 3
+
+        with self.assertRaises(HTTPException) as context:
+            await get_wallet_transactions(
+                address=address,
+                owner=self.owner,
+                page=self.page,
+                transactions=self.transactions_mock,
+            )
 
-        self.transactions_mock.authorize_transaction.return_value = False
+        self.assertEqual(context.exception.status_code, 403)
+        self.transactions_mock.get_wallet_transactions.assert_not_called()
 
-        with self.assertRaises(HTTPException):
-            get_wallet_transactions(
-                address=address, user_id=user_id, transactions=self.transactions_mock
+    async def test_full_page_returns_cursor_to_the_next_page(self) -> None:
+        self.transactions_mock.get_wallet_transactions.return_value = [
+            MagicMock(
+                id=transaction_id,
+                from_wallet_id=2,
+                to_wallet_id=3,
+                amount_transferred=100_000_000,
+                lost_amount=0,
             )
+            for transaction_id in (4, 7, 9)
+        ]
 
-        self.transactions_mock.authorize_transaction.assert_called_once_with(
-            address, user_id
+        response = await get_wallet_transactions(
+            address=2,
+            owner=self.owner,
+            page=PageRequest(limit=2, after=3),
+            transactions=self.transactions_mock,
         )
-        self.transactions_mock.get_wallet_transactions.assert_not_called()
+
+        transactions = response["transactions"]
+        assert isinstance(transactions, list)
+        self.assertEqual([tx["transaction_id"] for tx in transactions], [4, 7])
+        self.assertEqual(response["next_cursor"], encode_cursor(7))
+        self.assertEqual(response["previous_cursor"], encode_cursor(4))
+
+    async def test_export_streams_wallet_history(self) -> None:
+        async def batches() -> AsyncIterator[list[BtcTransaction]]:
+            yield [BtcTransaction(1, 2, 3, 100, 2)]
+            yield [BtcTransaction(4, 3, 2, 50, 0)]
+
+        self.transactions_mock.iter_wallet_transactions.return_value = batches()
+
+        response = await export_wallet_transactions(
+            address=2,
+            owner=self.owner,
+            transactions=self.transactions_mock,
+            export_format=ExportFormat.CSV,
+        )
+
+        body = [chunk async for chunk in response.body_iterator]
+        self.assertEqual(response.media_type, "text/csv")
+        self.assertEqual(
+            "".join(str(chunk) for chunk in body).splitlines()[1:],
+            ["1,2,3,100,2", "4,3,2,50,0"],
+        )
+
+    async def test_export_names_the_file_after_the_caller(self) -> None:
+        async def batches() -> AsyncIterator[list[BtcTransaction]]:
+            yield []
+
+        self.transactions_mock.iter_user_transactions.return_value = batches()
+
+        response = await export_transactions(
+            owner=self.owner, transactions=self.transactions_mock
+        )
+
+        self.assertIn("user-1-transactions", response.headers["content-disposition"])
+        self.transactions_mock.iter_user_transactions.assert_called_once_with(
+            self.owner
+        )
+
+    async def test_batch_is_authorized_once_and_reports_every_leg(self) -> None:
+        self.users_mock.load_auth_context.return_value = self.owner
+        self.transactions_mock.make_batch_transaction.return_value = [
+            LegResult(2, 50_000_000, transaction_id=7, lost_amount=750_000),
+            LegResult(9, 10_000_000, error=WalletNotFoundException(9)),
+        ]
+        request = BatchTransferRequest(
+            user_id=1,
+            from_wallet_id=1,
+            mode=BatchMode.BEST_EFFORT,
+            transfers=[
+                BatchTransferLeg(to_wallet_id=2, amount_transferred=0.5),
+                BatchTransferLeg(to_wallet_id=9, amount_transferred=0.1),
+            ],
+        )
+
+        response = await make_batch_transaction(
+            request=request,
+            users=self.users_mock,
+            transactions=self.transactions_mock,
+        )
+
+        self.assertEqual((response["succeeded"], response["failed"]), (1, 1))
+        self.assertEqual(
+            response["transactions"],
+            [
+                {
+                    "transaction_id": 7,
+                    "to_wallet_id": 2,
+                    "amount_transferred": 0.5,
+                    "lost_amount": 0.0075,
+                    "error": None,
+                },
+                {
+                    "transaction_id": None,
+                    "to_wallet_id": 9,
+                    "amount_transferred": 0.1,
+                    "lost_amount": 0.0,
+                    "error": "Wallet with ID 9 not found.",
+                },
+            ],
+        )
+        self.users_mock.load_auth_context.assert_called_once_with(1)
+        self.transactions_mock.make_batch_transaction.assert_called_once_with(
+            1,
+            [TransferLeg(2, 50_000_000), TransferLeg(9, 10_000_000)],
+            BatchMode.BEST_EFFORT,
+        )
+
+    async def test_batch_from_foreign_wallet_is_forbidden(self) -> None:
+        self.users_mock.load_auth_context.return_value = AuthContext(2, frozenset({3}))
+        request = BatchTransferRequest(
+            user_id=2,
+            from_wallet_id=1,
+            transfers=[BatchTransferLeg(to_wallet_id=2, amount_transferred=0.5)],
+        )
+
+        with self.assertRaises(HTTPException) as context:
+            await make_batch_transaction(
+                request=request,
+                users=self.users_mock,
+                transactions=self.transactions_mock,
+            )
+
+        self.assertEqual(context.exception.status_code, 403)
+        self.transactions_mock.make_batch_transaction.assert_not_called()
+
+    async def test_batch_of_unknown_user_is_not_found(self) -> None:
+        self.users_mock.load_auth_context.side_effect = UserNotFoundException(42)
+        request = BatchTransferRequest(
+            user_id=42,
+            from_wallet_id=1,
+            transfers=[BatchTransferLeg(to_wallet_id=2, amount_transferred=0.5)],
+        )
+
+        with self.assertRaises(HTTPException) as context:
+            await make_batch_transaction(
+                request=request,
+                users=self.users_mock,
+                transactions=self.transactions_mock,
+            )
+
+        self.assertEqual(context.exception.status_code, 404)
 
 
 if __name__ == "__main__":
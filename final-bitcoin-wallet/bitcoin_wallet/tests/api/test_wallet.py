@@ -1,65 +1,89 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock
 
 from fastapi import HTTPException
 
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC
+from bitcoin_wallet.core.dto.auth_context import AuthContext
 from bitcoin_wallet.core.dto.wallet_dto import WalletDTO
+from bitcoin_wallet.core.exception.no_more_wallets import NoMoreWalletsLeftException
+from bitcoin_wallet.core.exception.user_not_found import UserNotFoundException
 from bitcoin_wallet.infra.fastapi.api.api import create_wallet, get_wallet_info
 from bitcoin_wallet.infra.fastapi.request.create_wallet_request import (
     CreateWalletRequest,
 )
 
 
-class TestCreateWallet(unittest.TestCase):
+class TestCreateWallet(unittest.IsolatedAsyncioTestCase):
     def setUp(self) -> None:
-        self.mock_wallet_repository = MagicMock()
+        self.mock_user_repository = AsyncMock()
+        self.mock_wallet_repository = AsyncMock()
+        self.owner = AuthContext(1, frozenset({1}))
 
-    def test_create_wallet_success(self) -> None:
+    async def test_create_wallet_success(self) -> None:
         request = CreateWalletRequest(user_id=1, initial_balance=5)
-        self.mock_wallet_repository.authorize_user.return_value = True
+        self.mock_user_repository.load_auth_context.return_value = self.owner
         self.mock_wallet_repository.create_wallet.return_value = WalletDTO(
-            wallet_id=1, balance_in_btc=5, balance_in_usd=15
+            wallet_id=1, balance=5 * SATOSHIS_PER_BTC, btc_to_usd=3
+        )
+        response = await create_wallet(
+            request, self.mock_user_repository, self.mock_wallet_repository
+        )
+        self.mock_user_repository.load_auth_context.assert_called_once_with(1)
+        self.mock_wallet_repository.create_wallet.assert_called_once_with(
+            self.owner, 5 * SATOSHIS_PER_BTC
         )
-        response = create_wallet(request, self.mock_wallet_repository)
         self.assertEqual(
             response, {"wallet_id": 1, "balance_in_btc": 5, "balance_in_usd": 15}
         )
 
-    def test_create_wallet_authorise_exception(self) -> None:
+    async def test_create_wallet_authorise_exception(self) -> None:
         request = CreateWalletRequest(user_id=1, initial_balance=5)
-        self.mock_wallet_repository.authorize_user.return_value = False
+        self.mock_user_repository.load_auth_context.side_effect = UserNotFoundException(
+            1
+        )
         with self.assertRaises(HTTPException) as cm:
-            create_wallet(request, self.mock_wallet_repository)
+            await create_wallet(
+                request, self.mock_user_repository, self.mock_wallet_repository
+            )
         self.assertEqual(cm.exception.status_code, 404)
+        self.mock_wallet_repository.create_wallet.assert_not_called()
 
-    def test_get_wallet_info_success(self) -> None:
-        user_id = 1
+    async def test_create_wallet_maps_refusals_to_client_errors(self) -> None:
+        request = CreateWalletRequest(user_id=1, initial_balance=5)
+        self.mock_user_repository.load_auth_context.return_value = self.owner
+        for error, status in (
+            (NoMoreWalletsLeftException(1), 400),
+            (UserNotFoundException(1), 404),
+        ):
+            self.mock_wallet_repository.create_wallet.side_effect = error
+            with self.assertRaises(HTTPException) as cm:
+                await create_wallet(
+                    request, self.mock_user_repository, self.mock_wallet_repository
+                )
+            self.assertEqual(cm.exception.status_code, status)
+
+    async def test_get_wallet_info_success(self) -> None:
         wallet_id = 1
-        self.mock_wallet_repository.authorize_user.return_value = True
         self.mock_wallet_repository.retrieve_wallet_info.return_value = WalletDTO(
-            wallet_id=1, balance_in_btc=5, balance_in_usd=15
+            wallet_id=1, balance=5 * SATOSHIS_PER_BTC, btc_to_usd=3
         )
 
-        response = get_wallet_info(user_id, wallet_id, self.mock_wallet_repository)
+        response = await get_wallet_info(
+            wallet_id, self.owner, self.mock_wallet_repository
+        )
+        self.mock_wallet_repository.retrieve_wallet_info.assert_called_once_with(
+            self.owner, wallet_id
+        )
         self.assertEqual(
             response, {"wallet_id": 1, "balance_in_btc": 5, "balance_in_usd": 15}
         )
 
-    def test_get_wallet_info_authorise_exception(self) -> None:
-        user_id = 1
-        wallet_id = 1
-        self.mock_wallet_repository.authorize_user.return_value = False
-        with self.assertRaises(HTTPException) as cm:
-            get_wallet_info(user_id, wallet_id, self.mock_wallet_repository)
-        self.assertEqual(cm.exception.status_code, 404)
-
-    def test_get_wallet_info_not_found_exception(self) -> None:
-        user_id = 1
+    async def test_get_wallet_info_not_found_exception(self) -> None:
         wallet_id = 1
-        self.mock_wallet_repository.authorize_user.return_value = True
         self.mock_wallet_repository.retrieve_wallet_info.return_value = None
         with self.assertRaises(HTTPException) as cm:
-            get_wallet_info(user_id, wallet_id, self.mock_wallet_repository)
+            await get_wallet_info(wallet_id, self.owner, self.mock_wallet_repository)
         self.assertEqual(cm.exception.status_code, 404)
         self.assertEqual(cm.exception.detail, "Wallet not found")
 
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from bitcoin_wallet.core.cache.ownership_cache import OwnershipCache
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.core.repository.user_repository import BtcUserRepository
+from bitcoin_wallet.core.repository.wallet_repository import BtcWalletRepository
+from bitcoin_wallet.tests.currencyconverter.stub_price_source import (
+    FakeClock,
+    StubPriceSource,
+)
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+
+class TestOwnershipCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.cache = OwnershipCache(max_entries=2, ttl=10.0, clock=self.clock)
+
+    def test_entry_is_served_while_its_generation_matches(self) -> None:
+        context = AuthContext(1, frozenset({1}))
+        self.assertIsNone(self.cache.get(1, lambda: 0))
+        self.cache.put(context, 0)
+
+        self.assertEqual(self.cache.get(1, lambda: 0), context)
+        self.assertIsNone(self.cache.get(1, lambda: 1))
+        self.assertIsNone(self.cache.get(1, lambda: 1))
+
+        metrics = self.cache.metrics()
+        self.assertEqual((metrics.hits, metrics.misses, metrics.stale), (1, 3, 1))
+        self.assertEqual(metrics.hit_rate, 0.25)
+
+    def test_entries_expire_after_ttl(self) -> None:
+        self.cache.put(AuthContext(1, frozenset()), 0)
+        self.clock.now = 10.0
+
+        self.assertIsNone(self.cache.get(1, lambda: 0))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self) -> None:
+        for user_id in (1, 2):
+            self.cache.put(AuthContext(user_id, frozenset()), 0)
+        self.cache.get(1, lambda: 0)
+        self.cache.put(AuthContext(3, frozenset()), 0)
+
+        self.assertIsNotNone(self.cache.get(1, lambda: 0))
+        self.assertIsNone(self.cache.get(2, lambda: 0))
+        self.assertEqual(self.cache.metrics().evictions, 1)
+
+    def test_invalidate_drops_the_entry(self) -> None:
+        self.cache.put(AuthContext(1, frozenset()), 0)
+        self.cache.invalidate(1)
+        self.cache.invalidate(1)
+
+        self.assertIsNone(self.cache.get(1, lambda: 0))
+        self.assertEqual(self.cache.metrics().invalidations, 1)
+
+
+class TestCachedOwnership(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "ownership.db")
+        SetupForTests.create_tables(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT INTO users (id, mail) VALUES (1, 'first@gmail.com')")
+        self.pool = ConnectionPool(self.db_path)
+        self.cache = OwnershipCache()
+        self.users = BtcUserRepository(pool=self.pool, ownership_cache=self.cache)
+        self.wallets = BtcWalletRepository(
+            pool=self.pool, converter=StubPriceSource(), ownership_cache=self.cache
+        )
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def test_new_wallet_invalidates_write_through(self) -> None:
+        owner = self.users.load_auth_context(1)
+        wallet = self.wallets.create_wallet(owner, BTC)
+
+        expected = AuthContext(1, frozenset({wallet.wallet_id}))
+        self.assertEqual(self.users.load_auth_context(1), expected)
+        self.assertEqual(self.users.load_auth_context(1), expected)
+        metrics = self.cache.metrics()
+        self.assertEqual((metrics.invalidations, metrics.stale), (1, 0))
+        self.assertEqual((metrics.hits, metrics.misses), (1, 2))
+
+    def test_wallet_created_by_another_worker_is_seen(self) -> None:
+        other_worker = BtcWalletRepository(
+            pool=ConnectionPool(self.db_path),
+            converter=StubPriceSource(),
+            ownership_cache=OwnershipCache(),
+        )
+        self.users.load_auth_context(1)
+
+        wallet = other_worker.create_wallet(AuthContext(1, frozenset()), BTC)
+        other_worker.pool.close()
+
+        self.assertTrue(self.users.load_auth_context(1).owns(wallet.wallet_id))
+        self.assertEqual(self.cache.metrics().stale, 1)
+
+    def test_registered_wallet_invalidates_the_user(self) -> None:
+        self.users.load_auth_context(1)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT INTO wallets (id, user_id) VALUES (7, 1)")
+
+        self.users.register_new_wallet(1, 7)
+
+        self.assertEqual(self.users.load_auth_context(1).wallet_ids, frozenset({7}))
+        self.assertEqual(self.cache.metrics().invalidations, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
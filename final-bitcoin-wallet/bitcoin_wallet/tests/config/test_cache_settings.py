@@ -0,0 +1,31 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from bitcoin_wallet.core.config.cache_settings import OwnershipCacheSettings
+
+
+class TestOwnershipCacheSettings(unittest.TestCase):
+    @patch.dict(os.environ, {}, clear=True)
+    def test_cache_is_enabled_by_default(self) -> None:
+        self.assertEqual(OwnershipCacheSettings.from_env(), OwnershipCacheSettings())
+        self.assertTrue(OwnershipCacheSettings().enabled)
+
+    @patch.dict(
+        os.environ,
+        {
+            "OWNERSHIP_CACHE_ENABLED": "false",
+            "OWNERSHIP_CACHE_SIZE": "50",
+            "OWNERSHIP_CACHE_TTL_S": "5",
+        },
+        clear=True,
+    )
+    def test_reads_overrides_from_environment(self) -> None:
+        self.assertEqual(
+            OwnershipCacheSettings.from_env(),
+            OwnershipCacheSettings(enabled=False, max_entries=50, ttl=5.0),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+
+
+class TestDatabaseSettings(unittest.TestCase):
+    @patch.dict(os.environ, {}, clear=True)
+    def test_defaults_enable_wal(self) -> None:
+        settings = DatabaseSettings.from_env()
+
+        self.assertTrue(settings.db_path.endswith("bitcoin_wallet.db"))
+        self.assertEqual(settings.pragmas()["journal_mode"], "wal")
+        self.assertEqual(settings.pragmas()["synchronous"], "normal")
+        self.assertTrue(settings.bootstrap_schema)
+
+    @patch.dict(
+        os.environ,
+        {
+            "DB_PATH": "/tmp/custom.db",
+            "DB_JOURNAL_MODE": "delete",
+            "DB_SYNCHRONOUS": "full",
+            "DB_MMAP_SIZE": "0",
+            "DB_CACHE_SIZE": "-2000",
+            "DB_BUSY_TIMEOUT_MS": "250",
+            "DB_POOL_SIZE": "2",
+            "DB_BOOTSTRAP_SCHEMA": "false",
+        },
+        clear=True,
+    )
+    def test_reads_overrides_from_environment(self) -> None:
+        settings = DatabaseSettings.from_env()
+
+        self.assertEqual(settings.db_path, "/tmp/custom.db")
+        self.assertEqual(settings.pool_size, 2)
+        self.assertFalse(settings.bootstrap_schema)
+        self.assertEqual(
+            settings.pragmas(),
+            {
+                "journal_mode": "delete",
+                "synchronous": "full",
+                "mmap_size": 0,
+                "cache_size": -2000,
+                "busy_timeout": 250,
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
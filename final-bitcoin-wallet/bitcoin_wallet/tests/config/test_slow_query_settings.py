@@ -0,0 +1,31 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from bitcoin_wallet.core.config.slow_query_settings import SlowQuerySettings
+
+
+class TestSlowQuerySettings(unittest.TestCase):
+    @patch.dict(os.environ, {}, clear=True)
+    def test_log_is_disabled_by_default(self) -> None:
+        self.assertEqual(SlowQuerySettings.from_env(), SlowQuerySettings())
+        self.assertFalse(SlowQuerySettings().enabled)
+
+    @patch.dict(
+        os.environ,
+        {
+            "SLOW_QUERY_LOG_ENABLED": "true",
+            "SLOW_QUERY_THRESHOLD_MS": "2.5",
+            "SLOW_QUERY_LOG_SIZE": "10",
+        },
+        clear=True,
+    )
+    def test_reads_overrides_from_environment(self) -> None:
+        self.assertEqual(
+            SlowQuerySettings.from_env(),
+            SlowQuerySettings(enabled=True, threshold_ms=2.5, max_entries=10),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import time
+
+
+class StubPriceSource:
+    def __init__(self, price: float = 50_000.0, delay: float = 0.0) -> None:
+        self.price = price
+        self.delay = delay
+        self.calls = 0
+        self.failing = False
+
+    def convert_btc_to_usd(self) -> float:
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.failing:
+            raise ConnectionError("upstream down")
+        return self.price
+
+
+class AsyncStubPriceSource:
+    def __init__(self, source: StubPriceSource) -> None:
+        self.source = source
+        self.closed = False
+
+    async def convert_btc_to_usd(self) -> float:
+        return self.source.convert_btc_to_usd()
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
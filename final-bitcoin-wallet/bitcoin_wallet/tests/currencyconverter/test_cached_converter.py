@@ -0,0 +1,112 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from bitcoin_wallet.core.currencyconverter.cached_converter import CachedConverter
+from bitcoin_wallet.core.exception.price_unavailable import PriceUnavailableException
+from bitcoin_wallet.tests.currencyconverter.stub_price_source import (
+    FakeClock,
+    StubPriceSource,
+)
+
+
+class TestCachedConverter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.source = StubPriceSource()
+        self.clock = FakeClock()
+        self.converter = CachedConverter(
+            self.source, ttl=10.0, stale_ttl=20.0, clock=self.clock
+        )
+
+    def test_fresh_price_is_served_from_cache(self) -> None:
+        self.assertEqual(self.converter.convert_btc_to_usd(), 50_000.0)
+        self.source.price = 60_000.0
+        self.clock.now = 9.0
+
+        self.assertEqual(self.converter.convert_btc_to_usd(), 50_000.0)
+        self.assertEqual(self.source.calls, 1)
+        metrics = self.converter.metrics()
+        self.assertEqual((metrics.misses, metrics.hits), (1, 1))
+
+    def test_stale_price_is_served_while_refreshing(self) -> None:
+        self.converter.convert_btc_to_usd()
+        self.source.price = 60_000.0
+        self.clock.now = 15.0
+
+        self.assertEqual(self.converter.convert_btc_to_usd(), 50_000.0)
+        # The refresh lock is held until the background quote is stored.
+        with self.converter._refresh_lock:
+            pass
+
+        self.assertEqual(self.converter.convert_btc_to_usd(), 60_000.0)
+        self.assertEqual(self.converter.metrics().stale, 1)
+
+    def test_expired_price_is_refetched(self) -> None:
+        self.converter.convert_btc_to_usd()
+        self.source.price = 60_000.0
+        self.clock.now = 31.0
+
+        self.assertEqual(self.converter.convert_btc_to_usd(), 60_000.0)
+        self.assertEqual(self.converter.metrics().misses, 2)
+
+    def test_concurrent_misses_make_one_upstream_call(self) -> None:
+        source = StubPriceSource(delay=0.05)
+        converter = CachedConverter(source, ttl=10.0)
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            prices = list(
+                executor.map(lambda _: converter.convert_btc_to_usd(), range(16))
+            )
+
+        self.assertEqual(set(prices), {50_000.0})
+        self.assertEqual(source.calls, 1)
+
+    def test_failed_refresh_falls_back_to_last_known_price(self) -> None:
+        self.converter.convert_btc_to_usd()
+        self.source.failing = True
+        self.clock.now = 100.0
+
+        self.assertEqual(self.converter.convert_btc_to_usd(), 50_000.0)
+        metrics = self.converter.metrics()
+        self.assertEqual((metrics.fallbacks, metrics.upstream_failures), (1, 1))
+
+    def test_failed_refresh_backs_off_until_the_retry_window(self) -> None:
+        self.converter.convert_btc_to_usd()
+        self.source.failing = True
+        self.clock.now = 100.0
+
+        for _ in range(5):
+            self.assertEqual(self.converter.convert_btc_to_usd(), 50_000.0)
+        self.assertEqual(self.source.calls, 2)
+
+        self.source.failing = False
+        self.source.price = 60_000.0
+        self.clock.now = 105.0
+        self.assertEqual(self.converter.convert_btc_to_usd(), 60_000.0)
+        self.assertEqual(self.source.calls, 3)
+
+    def test_concurrent_waiters_share_a_failed_call(self) -> None:
+        source = StubPriceSource(delay=0.05)
+        source.failing = True
+        converter = CachedConverter(source, ttl=10.0)
+
+        def convert(_: int) -> bool:
+            try:
+                converter.convert_btc_to_usd()
+            except PriceUnavailableException:
+                return False
+            return True
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(convert, range(8)))
+
+        self.assertEqual(results, [False] * 8)
+        self.assertEqual(source.calls, 1)
+
+    def test_failure_without_known_price_raises(self) -> None:
+        self.source.failing = True
+        with self.assertRaises(PriceUnavailableException):
+            self.converter.convert_btc_to_usd()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import asyncio
+import unittest
+
+from fastapi import FastAPI
+
+from bitcoin_wallet.core.currencyconverter.price_feed import (
+    PriceFeed,
+    PriceSnapshot,
+    SnapshotConverter,
+)
+from bitcoin_wallet.core.exception.price_unavailable import PriceUnavailableException
+from bitcoin_wallet.tests.currencyconverter.stub_price_source import (
+    AsyncStubPriceSource,
+    FakeClock,
+    StubPriceSource,
+)
+
+
+class TestSnapshotConverter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.snapshot = PriceSnapshot(clock=self.clock)
+        self.converter = SnapshotConverter(self.snapshot, max_staleness=60.0)
+
+    def test_no_quote_before_first_publish(self) -> None:
+        with self.assertRaises(PriceUnavailableException):
+            self.converter.convert_btc_to_usd()
+
+    def test_reads_latest_published_quote(self) -> None:
+        self.snapshot.publish(50_000.0)
+        self.snapshot.publish(51_000.0)
+
+        self.assertEqual(self.converter.convert_btc_to_usd(), 51_000.0)
+
+    def test_rejects_quote_older_than_max_staleness(self) -> None:
+        self.snapshot.publish(50_000.0)
+        self.clock.now = 60.0
+        self.assertEqual(self.converter.convert_btc_to_usd(), 50_000.0)
+
+        self.clock.now = 61.0
+        with self.assertRaises(PriceUnavailableException):
+            self.converter.convert_btc_to_usd()
+
+
+class TestPriceFeed(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.source = StubPriceSource()
+        self.snapshot = PriceSnapshot()
+        self.http = AsyncStubPriceSource(self.source)
+        self.feed = PriceFeed(self.http, self.snapshot, interval=0.01)
+
+    async def test_failed_poll_keeps_previous_quote(self) -> None:
+        self.assertTrue(await self.feed.poll_once())
+        self.source.failing = True
+
+        self.assertFalse(await self.feed.poll_once())
+        quote = self.snapshot.latest()
+        self.assertEqual(quote.price if quote else None, 50_000.0)
+        self.assertEqual(self.feed.metrics().failures, 1)
+
+    async def test_lifespan_publishes_before_serving_and_keeps_polling(self) -> None:
+        async with self.feed.lifespan(FastAPI()):
+            self.assertIsNotNone(self.snapshot.latest())
+            await asyncio.sleep(0.05)
+            self.assertGreater(self.source.calls, 1)
+
+        calls = self.source.calls
+        await asyncio.sleep(0.03)
+        self.assertEqual(self.source.calls, calls)
+        self.assertTrue(self.http.closed)
+
+    async def test_lifespan_starts_without_a_quote_when_source_is_down(self) -> None:
+        self.source.failing = True
+        async with self.feed.lifespan(FastAPI()):
+            self.assertIsNone(self.snapshot.latest())
+
+
+if __name__ == "__main__":
+    unittest.main()
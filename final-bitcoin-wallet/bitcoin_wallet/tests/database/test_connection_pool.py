@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.exception.database_misconfigured import (
+    DatabaseMisconfiguredException,
+)
+from bitcoin_wallet.core.exception.pool_exhausted import (
+    ConnectionPoolExhaustedException,
+)
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "pool.db")
+        self.pool = ConnectionPool(self.db_path, max_size=2, timeout=0.1)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def test_connection_is_reused(self) -> None:
+        with self.pool.connection() as first:
+            pass
+        with self.pool.connection() as second:
+            pass
+
+        self.assertIs(first, second)
+        metrics = self.pool.metrics()
+        self.assertEqual(metrics.checkouts, 2)
+        self.assertEqual(metrics.connections_created, 1)
+        self.assertEqual(metrics.in_use, 0)
+
+    def test_commits_on_success_and_rolls_back_on_error(self) -> None:
+        with self.pool.connection() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+            conn.execute("INSERT INTO items (id) VALUES (1)")
+
+        with self.assertRaises(RuntimeError):
+            with self.pool.connection() as conn:
+                conn.execute("INSERT INTO items (id) VALUES (2)")
+                raise RuntimeError("boom")
+
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute("SELECT id FROM items").fetchall()
+        self.assertEqual(rows, [(1,)])
+
+    def test_pool_is_bounded(self) -> None:
+        with self.pool.connection(), self.pool.connection():
+            with self.assertRaises(ConnectionPoolExhaustedException):
+                with self.pool.connection():
+                    pass
+
+    def test_waiting_checkout_is_measured(self) -> None:
+        pool = ConnectionPool(self.db_path, max_size=1, timeout=2.0)
+
+        def checkout() -> None:
+            with pool.connection():
+                pass
+
+        with pool.connection():
+            waiter = threading.Thread(target=checkout)
+            waiter.start()
+            time.sleep(0.05)
+        waiter.join()
+
+        metrics = pool.metrics()
+        self.assertEqual(metrics.checkouts, 2)
+        self.assertEqual(metrics.connections_created, 1)
+        self.assertGreater(metrics.max_wait_seconds, 0.0)
+        pool.close()
+
+    def test_pragmas_are_applied(self) -> None:
+        pool = ConnectionPool(self.db_path, pragmas={"cache_size": -4096})
+        with pool.connection() as conn:
+            cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+        self.assertEqual(cache_size, -4096)
+        pool.close()
+
+    def test_verify_pragmas_accepts_applied_settings(self) -> None:
+        pool = ConnectionPool(
+            self.db_path, pragmas={"journal_mode": "WAL", "synchronous": "normal"}
+        )
+        pool.verify_pragmas()
+        pool.close()
+
+    def test_verify_pragmas_rejects_unsupported_settings(self) -> None:
+        pool = ConnectionPool(":memory:", pragmas={"journal_mode": "wal"})
+        with self.assertRaises(DatabaseMisconfiguredException):
+            pool.verify_pragmas()
+        pool.close()
+
+    def test_unhealthy_connection_is_replaced(self) -> None:
+        pool = ConnectionPool(self.db_path, health_check_interval=0)
+        with pool.connection() as first:
+            pass
+        first.close()
+
+        with pool.connection() as second:
+            second.execute("SELECT 1")
+
+        self.assertIsNot(first, second)
+        self.assertEqual(pool.metrics().connections_discarded, 1)
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import asyncio
+import sqlite3
+import threading
+import unittest
+
+from bitcoin_wallet.core.database.executor import DatabaseExecutor
+from bitcoin_wallet.core.metrics.registry import MetricsRegistry
+
+
+class Repository:
+    def load(self) -> int:
+        return 1
+
+    def save(self) -> None:
+        raise sqlite3.OperationalError("database is locked")
+
+
+class TestDatabaseExecutor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.executor = DatabaseExecutor(readers=4)
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+
+    async def test_writes_run_on_a_single_thread(self) -> None:
+        threads = await asyncio.gather(
+            *(self.executor.write(threading.get_ident) for _ in range(20))
+        )
+
+        self.assertEqual(len(set(threads)), 1)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    async def test_reads_run_concurrently(self) -> None:
+        barrier = threading.Barrier(4, timeout=1.0)
+
+        results = await asyncio.gather(
+            *(self.executor.read(barrier.wait) for _ in range(4))
+        )
+
+        self.assertEqual(sorted(results), [0, 1, 2, 3])
+
+    async def test_errors_propagate_to_the_caller(self) -> None:
+        with self.assertRaises(ZeroDivisionError):
+            await self.executor.read(lambda: 1 / 0)
+
+
+class TestDatabaseExecutorMetrics(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.registry = MetricsRegistry()
+        self.executor = DatabaseExecutor(readers=1, registry=self.registry)
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+
+    async def test_operations_are_timed_by_repository_method(self) -> None:
+        repository = Repository()
+        await self.executor.read(repository.load)
+        await self.executor.read(repository.load)
+
+        rendered = self.registry.render()
+
+        self.assertIn(
+            'db_operation_duration_seconds_count{operation="Repository.load"} 2',
+            rendered,
+        )
+        self.assertIn('db_queue_wait_seconds_count{queue="read"} 2', rendered)
+
+    async def test_locked_database_errors_are_counted(self) -> None:
+        with self.assertRaises(sqlite3.OperationalError):
+            await self.executor.write(Repository().save)
+
+        rendered = self.registry.render()
+
+        self.assertIn('db_locked_errors_total{operation="Repository.save"} 1', rendered)
+        self.assertIn('db_queue_wait_seconds_count{queue="write"} 1', rendered)
+
+
+if __name__ == "__main__":
+    unittest.main()
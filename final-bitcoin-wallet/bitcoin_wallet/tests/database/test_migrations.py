@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.migrations import MIGRATIONS, SchemaMigrator
+from bitcoin_wallet.core.database.schema import SchemaBootstrapper
+from bitcoin_wallet.core.repository.statistics_repository import (
+    BtcStatisticsRepository,
+)
+from bitcoin_wallet.core.statistics.platform_statistics import PlatformStatistics
+from bitcoin_wallet.core.transfer.reconciliation import LedgerReconciler
+
+LEGACY_SCHEMA = """
+create table users(
+    id INTEGER PRIMARY KEY,
+    mail TEXT,
+    first_wallet_id INTEGER DEFAULT 0,
+    second_wallet_id INTEGER DEFAULT 0,
+    third_wallet_id INTEGER DEFAULT 0
+);
+create table wallets(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER REFERENCES users(id),
+    balance REAL DEFAULT 1
+);
+create table transactions(
+    id INTEGER PRIMARY KEY,
+    from_wallet_id INTEGER,
+    to_wallet_id INTEGER,
+    amount_transferred REAL DEFAULT 0.0,
+    lost_amount REAL DEFAULT 0.0
+);
+insert into users values (1, 'first@gmail.com', 1, 2, 0);
+insert into users values (2, 'second@gmail.com', 3, 0, 0);
+insert into wallets values (1, 1, 0.5), (2, 1, 1.0), (3, 2, 1.4925);
+insert into transactions values (1, 1, 3, 0.5, 0.0075);
+"""
+
+
+class TestSchemaMigrations(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "legacy.db")
+        self.pool = ConnectionPool(self.db_path)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def test_legacy_wallet_columns_move_into_user_wallets(self) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript(LEGACY_SCHEMA)
+
+        SchemaBootstrapper(self.pool).create()
+
+        with sqlite3.connect(self.db_path) as conn:
+            ownership = conn.execute(
+                "SELECT user_id, wallet_id FROM user_wallets ORDER BY wallet_id"
+            ).fetchall()
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(users)")]
+        self.assertEqual(ownership, [(1, 1), (1, 2), (2, 3)])
+        self.assertEqual(columns, ["id", "mail", "wallets_generation"])
+        self.assertEqual(
+            SchemaMigrator(self.pool).current_version(), MIGRATIONS[-1].version
+        )
+
+    def test_real_amounts_become_satoshis_and_reconcile(self) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executescript(LEGACY_SCHEMA)
+
+        SchemaBootstrapper(self.pool).create()
+
+        with sqlite3.connect(self.db_path) as conn:
+            wallets = conn.execute(
+                "SELECT id, balance, minted, typeof(balance) FROM wallets"
+            ).fetchall()
+            transactions = conn.execute(
+                "SELECT amount_transferred, lost_amount FROM transactions"
+            ).fetchall()
+        self.assertEqual(
+            wallets,
+            [
+                (1, 50_000_000, 100_000_000, "integer"),
+                (2, 100_000_000, 100_000_000, "integer"),
+                (3, 149_250_000, 100_000_000, "integer"),
+            ],
+        )
+        self.assertEqual(transactions, [(50_000_000, 750_000)])
+        self.assertTrue(LedgerReconciler(self.pool).reconcile().balanced)
+        self.assertEqual(
+            BtcStatisticsRepository(pool=self.pool).read(),
+            PlatformStatistics(transactions=1, fees=750_000, volume=50_000_000),
+        )
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(
+                conn.execute("SELECT created_at FROM transactions").fetchall(),
+                [(None,)],
+            )
+
+    def test_fresh_database_is_stamped_and_migrations_are_idempotent(self) -> None:
+        SchemaBootstrapper(self.pool).create()
+        migrator = SchemaMigrator(self.pool)
+
+        self.assertEqual(migrator.current_version(), MIGRATIONS[-1].version)
+        self.assertEqual(migrator.migrate(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.slow_query_log import SlowQueryLog
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+
+class TestSlowQueryLog(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmp_dir.name, "slow.db")
+        SetupForTests.create_tables(db_path)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("INSERT INTO users (id, mail) VALUES (1, 'a@gmail.com')")
+            conn.execute(
+                "INSERT INTO wallets (id, user_id, balance) VALUES (1, 1, ?)", (BTC,)
+            )
+        self.log = SlowQueryLog(threshold=0.0)
+        self.pool = ConnectionPool(db_path, slow_query_log=self.log)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def test_full_table_scans_are_flagged(self) -> None:
+        BtcTransactionRepository(pool=self.pool).read_all()
+        with self.pool.connection() as conn:
+            conn.execute("SELECT balance FROM wallets WHERE id = ?", (1,)).fetchone()
+
+        by_statement = {entry.statement: entry for entry in self.log.entries()}
+        read_all = by_statement[
+            "SELECT id, from_wallet_id, to_wallet_id, amount_transferred, "
+            "lost_amount FROM transactions"
+        ]
+        lookup = by_statement["SELECT balance FROM wallets WHERE id = ?"]
+
+        self.assertTrue(read_all.full_scan)
+        self.assertEqual(read_all.plan, ("SCAN transactions",))
+        self.assertFalse(lookup.full_scan)
+        self.assertTrue(lookup.plan[0].startswith("SEARCH wallets"))
+
+    def test_parameters_and_literals_are_redacted(self) -> None:
+        with self.pool.connection() as conn:
+            conn.execute(
+                "SELECT id FROM users WHERE mail = 'a@gmail.com' AND id = ?", (1,)
+            ).fetchall()
+            conn.execute("SELECT id FROM users WHERE mail = ?", ("b@gmail.com",))
+
+        statements = [entry.statement for entry in self.log.entries()]
+        parameters = [entry.parameters for entry in self.log.entries()]
+
+        self.assertIn("SELECT id FROM users WHERE mail = '?' AND id = ?", statements)
+        self.assertNotIn("gmail", " ".join(statements + parameters))
+        self.assertIn("str", parameters)
+
+    def test_repeated_statements_are_aggregated_with_one_plan(self) -> None:
+        for wallet_id in (1, 2, 3):
+            with self.pool.connection() as conn:
+                conn.execute(
+                    "SELECT balance FROM wallets WHERE id = ?", (wallet_id,)
+                ).fetchone()
+
+        entries = [
+            entry
+            for entry in self.log.entries()
+            if entry.statement == "SELECT balance FROM wallets WHERE id = ?"
+        ]
+
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].calls, 3)
+        self.assertGreaterEqual(entries[0].total_seconds, entries[0].max_seconds)
+
+    def test_statements_under_the_threshold_are_ignored(self) -> None:
+        self.log.threshold = 60.0
+
+        BtcTransactionRepository(pool=self.pool).read_all()
+
+        self.assertEqual(len(self.log), 0)
+
+    def test_oldest_statements_are_evicted(self) -> None:
+        self.log.max_entries = 2
+        with self.pool.connection() as conn:
+            for column in ("id", "mail", "wallets_generation"):
+                conn.execute(f"SELECT {column} FROM users").fetchall()
+
+        statements = {entry.statement for entry in self.log.entries()}
+
+        self.assertEqual(
+            statements,
+            {"SELECT mail FROM users", "SELECT wallets_generation FROM users"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+import unittest
+
+from bitcoin_wallet.core.entity.transaction import BtcTransaction
+from bitcoin_wallet.core.export.ledger_export import (
+    EXPORT_FIELDS,
+    ExportFormat,
+    export_transactions,
+)
+
+BATCHES = [
+    [BtcTransaction(1, 1, 2, 100_000_000, 1_500_000)],
+    [BtcTransaction(2, 2, 1, 50_000_000, 0), BtcTransaction(5, 1, 3, 1, 0)],
+]
+
+
+class TestLedgerExport(unittest.TestCase):
+    def test_ndjson_writes_one_object_per_transaction(self) -> None:
+        chunks = list(export_transactions(iter(BATCHES), ExportFormat.NDJSON))
+
+        rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual([row["transaction_id"] for row in rows], [1, 2, 5])
+        self.assertEqual(
+            rows[0],
+            {
+                "transaction_id": 1,
+                "from_wallet_id": 1,
+                "to_wallet_id": 2,
+                "amount_transferred": 100_000_000,
+                "lost_amount": 1_500_000,
+            },
+        )
+
+    def test_csv_starts_with_a_header(self) -> None:
+        body = "".join(export_transactions(iter(BATCHES), ExportFormat.CSV))
+
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(tuple(rows[0]), EXPORT_FIELDS)
+        self.assertEqual(
+            rows[1:],
+            [
+                ["1", "1", "2", "100000000", "1500000"],
+                ["2", "2", "1", "50000000", "0"],
+                ["5", "1", "3", "1", "0"],
+            ],
+        )
+
+    def test_empty_history_exports_only_the_header(self) -> None:
+        self.assertEqual(list(export_transactions(iter([]), ExportFormat.NDJSON)), [])
+        self.assertEqual(
+            list(export_transactions(iter([]), ExportFormat.CSV)),
+            [",".join(EXPORT_FIELDS) + "\n"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+from bitcoin_wallet.core.metrics.collectors import track_shard_pools
+from bitcoin_wallet.core.metrics.registry import MetricsRegistry
+from bitcoin_wallet.core.shard.shard_map import ShardMap
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+
+
+class TestPoolCollectors(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.shards = [
+            os.path.join(self.tmp_dir.name, f"shard-{index:02d}.db")
+            for index in range(2)
+        ]
+        self.pools = ShardPools(
+            ShardMap.uniform(self.shards), DatabaseSettings(db_path="")
+        )
+
+    def tearDown(self) -> None:
+        self.pools.close()
+        self.tmp_dir.cleanup()
+
+    def test_every_shard_pool_gets_its_own_series(self) -> None:
+        registry = MetricsRegistry()
+        track_shard_pools(registry, self.pools)
+        with self.pools[self.shards[1]].connection():
+            metrics = registry.render()
+
+        self.assertIn(f'sqlite_pool_in_use{{shard="{self.shards[0]}"}} 0\n', metrics)
+        self.assertIn(f'sqlite_pool_in_use{{shard="{self.shards[1]}"}} 1\n', metrics)
+        self.assertIn(
+            f'sqlite_pool_checkouts_total{{shard="{self.shards[1]}"}} 1\n', metrics
+        )
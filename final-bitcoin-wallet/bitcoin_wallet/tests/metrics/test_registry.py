@@ -0,0 +1,83 @@
+import unittest
+
+from bitcoin_wallet.core.metrics.registry import MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = MetricsRegistry()
+
+    def test_counter_renders_one_series_per_label_set(self) -> None:
+        counter = self.registry.counter("requests_total", "Requests.", ("route",))
+        counter.labels("/b").inc()
+        counter.labels("/a").inc(2)
+        counter.labels("/b").inc()
+
+        self.assertEqual(
+            self.registry.render(),
+            "# HELP requests_total Requests.\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{route="/a"} 2\n'
+            'requests_total{route="/b"} 2\n',
+        )
+
+    def test_unlabelled_series_starts_at_zero(self) -> None:
+        self.registry.gauge("in_flight", "In flight.")
+
+        self.assertIn("in_flight 0\n", self.registry.render())
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        histogram = self.registry.histogram(
+            "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)
+        )
+        child = histogram.labels("/x")
+        for value in (0.05, 0.1, 0.5, 3.0):
+            child.observe(value)
+
+        lines = self.registry.render().splitlines()
+
+        self.assertEqual(
+            lines[2:],
+            [
+                'latency_seconds_bucket{route="/x",le="0.1"} 2',
+                'latency_seconds_bucket{route="/x",le="1"} 3',
+                'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+                'latency_seconds_sum{route="/x"} 3.65',
+                'latency_seconds_count{route="/x"} 4',
+            ],
+        )
+
+    def test_function_values_are_read_at_render_time(self) -> None:
+        counts = {"hits": 1}
+        self.registry.counter("hits_total", "Hits.").labels().set_function(
+            lambda: counts["hits"]
+        )
+        counts["hits"] = 7
+
+        self.assertIn("hits_total 7\n", self.registry.render())
+
+    def test_registering_twice_returns_the_same_metric(self) -> None:
+        first = self.registry.counter("hits_total", "Hits.")
+
+        self.assertIs(self.registry.counter("hits_total", "Hits."), first)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("hits_total", "Hits.")
+
+    def test_wrong_label_count_is_rejected(self) -> None:
+        counter = self.registry.counter("requests_total", "Requests.", ("route",))
+
+        with self.assertRaises(ValueError):
+            counter.labels("/a", "GET")
+
+    def test_label_values_are_escaped(self) -> None:
+        self.registry.counter("errors_total", "Errors.", ("detail",)).labels(
+            'say "hi"\n'
+        ).inc()
+
+        self.assertIn(
+            'errors_total{detail="say \\"hi\\"\\n"} 1', self.registry.render()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from bitcoin_wallet.core.exception.invalid_btc_amount import InvalidBtcAmountException
+from bitcoin_wallet.core.money.satoshi import (
+    btc_to_satoshi,
+    satoshi_to_btc,
+    transfer_fee,
+)
+
+
+class TestSatoshi(unittest.TestCase):
+    def test_btc_amounts_convert_exactly(self) -> None:
+        self.assertEqual(btc_to_satoshi(1), 100_000_000)
+        self.assertEqual(btc_to_satoshi(0.1), 10_000_000)
+        self.assertEqual(btc_to_satoshi(0.00000001), 1)
+        self.assertEqual(btc_to_satoshi("21.5"), 2_150_000_000)
+        self.assertEqual(satoshi_to_btc(2_150_000_000), 21.5)
+
+    def test_sub_satoshi_and_non_finite_amounts_are_rejected(self) -> None:
+        for amount in (0.000000001, 1.123456789, float("nan"), float("inf"), "abc"):
+            with self.assertRaises(InvalidBtcAmountException):
+                btc_to_satoshi(amount)
+
+    def test_fee_is_rounded_half_up_to_whole_satoshis(self) -> None:
+        self.assertEqual(transfer_fee(100_000_000), 1_500_000)
+        self.assertEqual(transfer_fee(33), 0)
+        self.assertEqual(transfer_fee(34), 1)
+        self.assertEqual(transfer_fee(100), 2)
+        self.assertEqual(transfer_fee(1), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.core.dto.page_request import PageRequest
+from bitcoin_wallet.core.repository.transaction_repository import (
+    ID_RANGE,
+    OWNED_WALLETS_FILTER,
+    TRANSACTION_COLUMNS,
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.repository.user_repository import BtcUserRepository
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+
+class TestTransactionQueries(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "queries.db")
+        SetupForTests.create_tables(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO users (id, mail) VALUES (?, ?)",
+                [(1, "first@gmail.com"), (2, "second@gmail.com")],
+            )
+            conn.executemany(
+                "INSERT INTO wallets (id, user_id, balance) VALUES (?, ?, ?)",
+                [(1, 1, 10 * BTC), (2, 2, 10 * BTC), (3, 2, 10 * BTC)],
+            )
+            conn.executemany(
+                "INSERT INTO user_wallets (user_id, wallet_id) VALUES (?, ?)",
+                [(1, 1), (2, 2), (2, 3)],
+            )
+        self.pool = ConnectionPool(self.db_path)
+        self.repository = BtcTransactionRepository(pool=self.pool)
+        self.users = BtcUserRepository(pool=self.pool)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def test_wallet_transactions_are_ordered_by_id(self) -> None:
+        self.repository.make_transaction(1, 2, BTC)
+        self.repository.make_transaction(2, 3, BTC)
+        self.repository.make_transaction(3, 1, BTC)
+
+        transactions = self.repository.get_wallet_transactions(1)
+
+        self.assertEqual([transaction.id for transaction in transactions], [1, 3])
+
+    def test_user_transactions_list_internal_transfers_once(self) -> None:
+        self.repository.make_transaction(2, 3, BTC)
+        self.repository.make_transaction(1, 2, BTC)
+        self.repository.make_transaction(3, 2, BTC)
+
+        transactions = self.repository.get_user_transactions(
+            self.users.load_auth_context(2)
+        )
+
+        self.assertEqual([transaction.id for transaction in transactions], [1, 2, 3])
+
+    def test_user_without_wallets_has_no_transactions(self) -> None:
+        self.repository.make_transaction(2, 3, BTC)
+
+        owner = AuthContext(2, frozenset())
+
+        self.assertEqual(self.repository.get_user_transactions(owner), [])
+        self.assertEqual(list(self.repository.iter_user_transactions(owner)), [])
+
+    def test_wallet_transactions_are_paged_by_id(self) -> None:
+        for _ in range(3):
+            self.repository.make_transaction(1, 2, BTC)
+            self.repository.make_transaction(3, 2, BTC)
+
+        def ids(page: PageRequest) -> list[int]:
+            transactions = self.repository.get_wallet_transactions(2, page)
+            return [transaction.id for transaction in transactions]
+
+        self.assertEqual(ids(PageRequest(limit=4)), [1, 2, 3, 4])
+        self.assertEqual(ids(PageRequest(limit=4, after=4)), [5, 6])
+        self.assertEqual(ids(PageRequest(limit=2, before=5)), [3, 4])
+        self.assertEqual(ids(PageRequest(limit=4, after=1, before=5)), [2, 3, 4])
+
+    def test_user_transactions_are_paged_by_id(self) -> None:
+        for _ in range(3):
+            self.repository.make_transaction(1, 2, BTC)
+
+        owner = self.users.load_auth_context(1)
+
+        transactions = self.repository.get_user_transactions(
+            owner, PageRequest(2, after=1)
+        )
+
+        self.assertEqual([transaction.id for transaction in transactions], [2, 3])
+        self.assertEqual(
+            self.repository.get_user_transactions(owner, PageRequest(2, 3)), []
+        )
+
+    def test_wallet_history_is_iterated_in_batches(self) -> None:
+        for _ in range(5):
+            self.repository.make_transaction(1, 2, BTC)
+        self.repository.make_transaction(2, 3, BTC)
+
+        batches = list(self.repository.iter_wallet_transactions(1, batch_size=2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual([tx.id for batch in batches for tx in batch], [1, 2, 3, 4, 5])
+        self.assertEqual(self.pool.metrics().in_use, 0)
+
+    def test_user_history_is_iterated_in_batches(self) -> None:
+        self.repository.make_transaction(2, 3, BTC)
+        self.repository.make_transaction(1, 2, BTC)
+        self.repository.make_transaction(1, 3, BTC)
+
+        batches = self.repository.iter_user_transactions(
+            self.users.load_auth_context(2), batch_size=2
+        )
+
+        self.assertEqual([[tx.id for tx in batch] for batch in batches], [[1, 2], [3]])
+
+    def test_more_exports_than_pooled_connections_interleave(self) -> None:
+        pool = ConnectionPool(self.db_path, max_size=2, timeout=0.5)
+        repository = BtcTransactionRepository(pool=pool)
+        for _ in range(6):
+            repository.make_transaction(1, 2, BTC)
+        exports = [
+            repository.iter_wallet_transactions(1, batch_size=2) for _ in range(4)
+        ]
+
+        seen: list[list[int]] = [[] for _ in exports]
+        for _ in range(3):
+            for ids, export in zip(seen, exports):
+                ids.extend(tx.id for tx in next(export))
+                self.assertEqual(pool.metrics().in_use, 0)
+            self.assertEqual(len(repository.get_wallet_transactions(2)), 6)
+        pool.close()
+
+        self.assertEqual(seen, [[1, 2, 3, 4, 5, 6]] * 4)
+
+    def test_authorize_transaction_checks_wallet_owner(self) -> None:
+        self.assertTrue(self.repository.authorize_transaction(3, 2))
+        self.assertFalse(self.repository.authorize_transaction(3, 1))
+        self.assertFalse(self.repository.authorize_transaction(42, 1))
+
+    def test_wallet_history_lookup_uses_indexes(self) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            plan = conn.execute(
+                f"EXPLAIN QUERY PLAN {TRANSACTION_COLUMNS} WHERE from_wallet_id = ? "
+                f"{ID_RANGE} UNION {TRANSACTION_COLUMNS} WHERE to_wallet_id = ? "
+                f"{ID_RANGE} ORDER BY id LIMIT ?",
+                (1, 0, 10, 1, 0, 10, 5),
+            ).fetchall()
+
+        details = " ".join(row[-1] for row in plan)
+        self.assertIn("idx_transactions_from_wallet", details)
+        self.assertIn("idx_transactions_to_wallet", details)
+        self.assertIn("MERGE (UNION)", details)
+        self.assertNotIn("TEMP B-TREE", details)
+        self.assertNotIn("SCAN transactions", details)
+
+    def test_owned_wallets_lookup_uses_indexes(self) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            plan = conn.execute(
+                f"EXPLAIN QUERY PLAN {TRANSACTION_COLUMNS} WHERE from_wallet_id "
+                f"{OWNED_WALLETS_FILTER} {ID_RANGE} UNION {TRANSACTION_COLUMNS} "
+                f"WHERE to_wallet_id {OWNED_WALLETS_FILTER} {ID_RANGE} "
+                "ORDER BY id LIMIT ?",
+                ("[2, 3]", 0, 10, "[2, 3]", 0, 10, 5),
+            ).fetchall()
+
+        details = " ".join(row[-1] for row in plan)
+        self.assertIn("idx_transactions_from_wallet", details)
+        self.assertIn("idx_transactions_to_wallet", details)
+        self.assertNotIn("SCAN transactions", details)
+
+
+if __name__ == "__main__":
+    unittest.main()
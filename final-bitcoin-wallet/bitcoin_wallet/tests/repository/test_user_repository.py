@@ -1,6 +1,7 @@
 import unittest
 
 from bitcoin_wallet.core.config.constants import USER_DEFAULT_ID
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
 from bitcoin_wallet.core.entity.user import BtcUser
 from bitcoin_wallet.core.exception.mail_already_present import (
     MailAlreadyPresentException,
@@ -18,8 +19,7 @@ from bitcoin_wallet.tests.repository.setup import SetupForTests
 class TestUserRepository(unittest.TestCase):
     def setUp(self) -> None:
         db_filename: str = "test_users.db"
-        self.repository = BtcUserRepository(db_file=db_filename)
-        self.repository.filename = db_filename
+        self.repository = BtcUserRepository(pool=ConnectionPool(db_filename))
         SetupForTests.create_tables(db_filename)
 
     def test_create_user(self) -> None:
@@ -82,6 +82,18 @@ class TestUserRepository(unittest.TestCase):
             UserNotFoundException, self.repository.register_new_wallet, 2, 1
         )
 
+    def test_load_auth_context(self) -> None:
+        btc_user = BtcUser(id=USER_DEFAULT_ID, mail="test7@gmail.com")
+        self.repository.create(btc_user)
+        self.assertEqual(self.repository.load_auth_context(1).wallet_ids, frozenset())
+        self.repository.register_new_wallet(1, 1)
+        self.repository.register_new_wallet(1, 2)
+
+        context = self.repository.load_auth_context(1)
+        self.assertEqual(context.user_id, 1)
+        self.assertEqual(context.wallet_ids, frozenset({1, 2}))
+        self.assertRaises(UserNotFoundException, self.repository.load_auth_context, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.executor import DatabaseExecutor
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.core.exception.user_not_found import UserNotFoundException
+from bitcoin_wallet.core.repository.async_repository import AsyncWalletRepository
+from bitcoin_wallet.core.repository.wallet_repository import BtcWalletRepository
+from bitcoin_wallet.tests.currencyconverter.stub_price_source import StubPriceSource
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+
+class TestWalletRepository(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "wallets.db")
+        SetupForTests.create_tables(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT INTO users (id, mail) VALUES (1, 'first@gmail.com')")
+        self.pool = ConnectionPool(self.db_path, pragmas={"busy_timeout": 0})
+        self.repository = BtcWalletRepository(
+            pool=self.pool, converter=StubPriceSource()
+        )
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def test_wallet_for_a_deleted_user_is_refused(self) -> None:
+        with self.assertRaises(UserNotFoundException):
+            self.repository.create_wallet(AuthContext(2, frozenset()), BTC)
+
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(
+                conn.execute("SELECT COUNT(*) FROM wallets").fetchone(), (0,)
+            )
+
+    def test_lock_contention_is_not_reported_as_a_missing_user(self) -> None:
+        blocker = sqlite3.connect(self.db_path, isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                self.repository.create_wallet(AuthContext(1, frozenset()), BTC)
+        finally:
+            blocker.execute("ROLLBACK")
+            blocker.close()
+
+        wallet = self.repository.create_wallet(AuthContext(1, frozenset()), BTC)
+        self.assertEqual(wallet.balance, BTC)
+
+
+class TestAsyncWalletRepository(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmp_dir.name, "wallets.db")
+        SetupForTests.create_tables(db_path)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("INSERT INTO users (id, mail) VALUES (1, 'first@gmail.com')")
+        self.pool = ConnectionPool(db_path)
+        self.executor = DatabaseExecutor(readers=1)
+        self.quote = StubPriceSource(delay=0.5)
+        self.wallets = AsyncWalletRepository(
+            BtcWalletRepository(pool=self.pool, converter=StubPriceSource()),
+            self.executor,
+            self.quote,
+        )
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    async def test_a_slow_quote_does_not_hold_up_other_writes(self) -> None:
+        creating = asyncio.create_task(
+            self.wallets.create_wallet(AuthContext(1, frozenset()), BTC)
+        )
+        await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        await self.executor.write(threading.get_ident)
+
+        self.assertLess(time.perf_counter() - started, 0.25)
+        wallet = await creating
+        self.assertEqual(wallet.btc_to_usd, self.quote.price)
+        self.assertEqual(self.quote.calls, 1)
@@ -1,6 +1,7 @@
 import sqlite3
 import unittest
 
+from bitcoin_wallet.core.dto.auth_context import AuthContext
 from bitcoin_wallet.core.repository.transaction_repository import (
     BtcTransactionRepository,
 )
@@ -32,18 +33,20 @@ class TestBtcTransactionRepository(unittest.TestCase):
             )
 
     def test_make_transaction(self) -> None:
-        transaction_id = self.repository.make_transaction(1, 2, 10.0)
+        transaction_id = self.repository.make_transaction(1, 2, 10)
         self.assertIsNotNone(transaction_id)
 
     def test_get_user_transactions(self) -> None:
-        self.repository.make_transaction(1, 2, 10.0)
-        transactions = self.repository.get_user_transactions(1)
+        self.repository.make_transaction(1, 2, 10)
+        transactions = self.repository.get_user_transactions(
+            AuthContext(1, frozenset({1}))
+        )
         self.assertEqual(len(transactions), 1)
         self.assertEqual(transactions[0].from_wallet_id, 1)
         self.assertEqual(transactions[0].to_wallet_id, 2)
 
     def test_get_wallet_transactions(self) -> None:
-        self.repository.make_transaction(1, 2, 10.0)
+        self.repository.make_transaction(1, 2, 10)
         transactions = self.repository.get_wallet_transactions(1)
         self.assertEqual(len(transactions), 1)
         self.assertEqual(transactions[0].from_wallet_id, 1)
@@ -56,8 +59,8 @@ class TestBtcTransactionRepository(unittest.TestCase):
         self.assertFalse(authorized)
 
     def test_read_all(self) -> None:
-        self.repository.make_transaction(1, 2, 10.0)
-        self.repository.make_transaction(2, 1, 5.0)
+        self.repository.make_transaction(1, 2, 10)
+        self.repository.make_transaction(2, 1, 5)
         transactions = self.repository.read_all()
         self.assertEqual(len(transactions), 2)
 
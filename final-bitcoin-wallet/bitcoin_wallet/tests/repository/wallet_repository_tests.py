@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 
 from fastapi import HTTPException
 
+from bitcoin_wallet.core.dto.auth_context import AuthContext
 from bitcoin_wallet.core.exception.no_more_wallets import NoMoreWalletsLeftException
 from bitcoin_wallet.core.repository.wallet_repository import BtcWalletRepository
 
@@ -60,7 +61,9 @@ class TestBtcWalletRepository(unittest.TestCase):
         mock_connect.return_value.cursor.return_value = mock_cursor
 
         with self.assertRaises(NoMoreWalletsLeftException):
-            self.repo.create_wallet(user_id=1, initial_balance=10)
+            self.repo.create_wallet(
+                owner=AuthContext(1, frozenset()), initial_balance=10
+            )
 
     @patch("sqlite3.connect")
     def test_retrieve_wallet_info_user_no_access(self, mock_connect: MagicMock) -> None:
@@ -72,7 +75,9 @@ class TestBtcWalletRepository(unittest.TestCase):
         mock_connect.return_value.cursor.return_value = mock_cursor
 
         with self.assertRaises(HTTPException):
-            self.repo.retrieve_wallet_info(user_id=1, wallet_id=2)
+            self.repo.retrieve_wallet_info(
+                owner=AuthContext(1, frozenset({1, 2, 3})), wallet_id=2
+            )
 
     @patch("sqlite3.connect")
     def test_create_wallet_max_wallets(self, mock_connect: MagicMock) -> None:
@@ -87,7 +92,9 @@ class TestBtcWalletRepository(unittest.TestCase):
         mock_connect.return_value.cursor.return_value = mock_cursor
 
         with self.assertRaises(NoMoreWalletsLeftException):
-            self.repo.create_wallet(user_id=1, initial_balance=10)
+            self.repo.create_wallet(
+                owner=AuthContext(1, frozenset({1, 2, 3})), initial_balance=10
+            )
 
     @patch("sqlite3.connect")
     def test_retrieve_wallet_info_persmission_error(
@@ -101,7 +108,9 @@ class TestBtcWalletRepository(unittest.TestCase):
         mock_connect.return_value.cursor.return_value = mock_cursor
 
         with self.assertRaises(HTTPException) as context:
-            self.repo.retrieve_wallet_info(user_id=1, wallet_id=5)
+            self.repo.retrieve_wallet_info(
+                owner=AuthContext(1, frozenset({1, 2, 3})), wallet_id=5
+            )
 
         self.assertEqual(context.exception.status_code, 405)
 
@@ -0,0 +1,498 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from dataclasses import replace
+from unittest.mock import patch
+
+import httpx
+from typer.testing import CliRunner, Result
+
+from bitcoin_wallet.bench.suite import SuiteResult
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+from bitcoin_wallet.core.entity.user import BtcUser
+from bitcoin_wallet.core.repository.sharded_repository import (
+    ShardedTransactionRepository,
+    ShardedUserRepository,
+    ShardedWalletRepository,
+)
+from bitcoin_wallet.core.shard.shard_map import ShardCatalog, ShardMap
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+from bitcoin_wallet.runner.cli import cli
+from bitcoin_wallet.tests.currencyconverter.stub_price_source import StubPriceSource
+
+
+class TestDatabaseCommands(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "cli.db")
+        self.runner = CliRunner()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _invoke(self, *args: str) -> None:
+        with patch.dict(os.environ, {"DB_PATH": self.db_path}):
+            result = self.runner.invoke(cli, list(args))
+        self.assertEqual(result.exit_code, 0, result.output)
+
+    def test_db_init_creates_schema_in_wal_mode(self) -> None:
+        self._invoke("db", "init")
+
+        with sqlite3.connect(self.db_path) as conn:
+            tables = {
+                row[0]
+                for row in conn.execute("SELECT name FROM sqlite_master")
+                if not row[0].startswith("sqlite_")
+            }
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertTrue({"users", "wallets", "transactions"} <= tables)
+        self.assertEqual(journal_mode, "wal")
+
+    def test_db_init_is_idempotent_unless_reset(self) -> None:
+        self._invoke("db", "init")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT INTO users (mail) VALUES ('kept@gmail.com')")
+
+        self._invoke("db", "init")
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(
+                conn.execute("SELECT COUNT(*) FROM users").fetchone(), (1,)
+            )
+
+        self._invoke("db", "init", "--reset")
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(
+                conn.execute("SELECT COUNT(*) FROM users").fetchone(), (0,)
+            )
+
+    def test_db_reconcile_fails_on_drift(self) -> None:
+        self._invoke("db", "init")
+        self._invoke("db", "reconcile")
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO wallets (user_id, balance, minted) VALUES (1, 2, 1)"
+            )
+        with patch.dict(os.environ, {"DB_PATH": self.db_path}):
+            result = self.runner.invoke(cli, ["db", "reconcile"])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("out of balance by 1 satoshis", result.output)
+
+    def test_db_rebuild_statistics_sums_the_ledger(self) -> None:
+        self._invoke("db", "init")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO transactions (from_wallet_id, to_wallet_id, "
+                "amount_transferred, lost_amount) VALUES (?, ?, ?, ?)",
+                [(1, 2, 100, 2), (2, 3, 50, 1)],
+            )
+
+        with patch.dict(os.environ, {"DB_PATH": self.db_path}):
+            result = self.runner.invoke(cli, ["db", "rebuild-statistics"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("transactions=2 fees=3 volume=150", result.output)
+
+    def test_seed_builds_a_consistent_ledger(self) -> None:
+        self._invoke("seed", "--users=200", "--transactions=5000", "--seed=7")
+
+        self._invoke("db", "reconcile")
+        with sqlite3.connect(self.db_path) as conn:
+            counts = conn.execute(
+                "SELECT (SELECT COUNT(*) FROM users), "
+                "(SELECT COUNT(*) FROM transactions), "
+                "(SELECT COUNT(*) FROM wallets WHERE balance < 0), "
+                "(SELECT COUNT(*) FROM transactions "
+                "WHERE from_wallet_id = to_wallet_id)"
+            ).fetchone()
+            indexes = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+            }
+            totals = conn.execute(
+                "SELECT transactions, fees, volume FROM platform_statistics"
+            ).fetchone()
+            ledger = conn.execute(
+                "SELECT COUNT(*), SUM(lost_amount), SUM(amount_transferred) "
+                "FROM transactions"
+            ).fetchone()
+        self.assertEqual(counts, (200, 5000, 0, 0))
+        self.assertIn("idx_transactions_from_wallet", indexes)
+        self.assertEqual(totals, ledger)
+
+    def test_seed_is_deterministic_and_refuses_a_populated_database(self) -> None:
+        def ledger() -> list[tuple[int, ...]]:
+            with sqlite3.connect(self.db_path) as conn:
+                return conn.execute(
+                    "SELECT from_wallet_id, to_wallet_id, amount_transferred "
+                    "FROM transactions ORDER BY id"
+                ).fetchall()
+
+        self._invoke("seed", "--users=50", "--transactions=300")
+        first = ledger()
+        with patch.dict(os.environ, {"DB_PATH": self.db_path}):
+            result = self.runner.invoke(cli, ["seed", "--users=50"])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("--reset", result.output)
+
+        self._invoke("seed", "--users=50", "--transactions=300", "--reset")
+        self.assertEqual(ledger(), first)
+
+    def test_export_streams_wallet_history_as_csv(self) -> None:
+        self._invoke("db", "init")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO transactions (from_wallet_id, to_wallet_id, "
+                "amount_transferred, lost_amount) VALUES (?, ?, ?, ?)",
+                [(1, 2, 100, 2), (2, 3, 50, 1), (3, 1, 10, 0)],
+            )
+        output = os.path.join(self.tmp_dir.name, "wallet-1.csv")
+
+        self._invoke(
+            "export", "--wallet-id", "1", "--format", "csv", "--output", output
+        )
+
+        with open(output) as export:
+            self.assertEqual(
+                export.read().splitlines(),
+                [
+                    "transaction_id,from_wallet_id,to_wallet_id,"
+                    "amount_transferred,lost_amount",
+                    "1,1,2,100,2",
+                    "3,3,1,10,0",
+                ],
+            )
+
+    def test_export_of_unknown_user_fails(self) -> None:
+        self._invoke("db", "init")
+        with patch.dict(os.environ, {"DB_PATH": self.db_path}):
+            result = self.runner.invoke(cli, ["export", "--user-id", "42"])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("User with ID 42 not found", result.output)
+
+
+class TestShardCommands(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.catalog = os.path.join(self.tmp_dir.name, "catalog.db")
+        self.runner = CliRunner()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _run(self, *args: str) -> Result:
+        with patch.dict(os.environ, {"SHARD_MAP": self.catalog}):
+            return self.runner.invoke(cli, list(args))
+
+    def _seed(self) -> list[int]:
+        pools = ShardPools(
+            ShardCatalog(self.catalog).load(), DatabaseSettings(db_path="")
+        )
+        users = ShardedUserRepository(pools)
+        wallets = ShardedWalletRepository(pools, StubPriceSource())
+        wallet_ids = [
+            wallets.create_wallet(
+                users.load_auth_context(users.create(BtcUser(0, f"u{index}@x.io"))),
+                BTC,
+            ).wallet_id
+            for index in range(8)
+        ]
+        transactions = ShardedTransactionRepository(pools)
+        for index, wallet_id in enumerate(wallet_ids):
+            transactions.make_transaction(wallet_id, wallet_ids[index - 1], 5000)
+        pools.close()
+        return wallet_ids
+
+    def test_init_split_and_reconcile(self) -> None:
+        result = self._run("shard", "init", "--shards=2")
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("shard-01.db", result.output)
+        self._seed()
+
+        result = self._run("shard", "split", "shard-00.db", "--into=hot.db")
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("to " + os.path.join(self.tmp_dir.name, "hot.db"), result.output)
+        self.assertIn("Ledger is balanced", result.output)
+
+        result = self._run("shard", "status")
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(len(result.output.splitlines()), 3)
+        self.assertEqual(self._run("shard", "reconcile").exit_code, 0)
+
+    def test_reconcile_fails_on_a_drifted_wallet(self) -> None:
+        self._run("shard", "init", "--shards=2")
+        self._seed()
+        with sqlite3.connect(os.path.join(self.tmp_dir.name, "shard-01.db")) as conn:
+            conn.execute("UPDATE wallets SET balance = balance + 1")
+
+        result = self._run("shard", "reconcile")
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("expected=", result.output)
+
+    def test_ledger_commands_read_every_shard(self) -> None:
+        self._run("shard", "init", "--shards=2")
+        wallet_ids = self._seed()
+
+        result = self._run("export", "--wallet-id", str(wallet_ids[3]))
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(len(result.output.splitlines()), 2)
+        result = self._run("db", "rebuild-statistics")
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("transactions=8 ", result.output)
+        result = self._run("db", "reconcile")
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Ledger is balanced", result.output)
+
+    def test_db_init_resets_every_shard(self) -> None:
+        self._run("shard", "init", "--shards=2")
+        self._seed()
+
+        result = self._run("db", "init", "--reset")
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(result.output.count("Shard ready at"), 2)
+        for name in ("shard-00.db", "shard-01.db"):
+            with sqlite3.connect(os.path.join(self.tmp_dir.name, name)) as conn:
+                self.assertEqual(
+                    conn.execute("SELECT COUNT(*) FROM users").fetchone()[0], 0
+                )
+                conn.execute("SELECT 1 FROM transfer_outbox")
+
+    def test_seed_refuses_a_shard_map(self) -> None:
+        self._run("shard", "init", "--shards=2")
+
+        result = self._run("seed", "--users=10", "--transactions=10")
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("unset SHARD_MAP", result.output)
+
+    def test_commands_need_a_shard_map(self) -> None:
+        for command in (["shard", "status"], ["db", "init"]):
+            result = self._run(*command)
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn("shard init", result.output)
+
+        self._run("shard", "init", "--shards=1")
+        result = self._run("shard", "init")
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("already holds a shard map", result.output)
+
+
+class TestRunCommand(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "run.db")
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_workers_serve_the_app_factory_and_recycle(self) -> None:
+        bootstrap: list[str | None] = []
+        with patch.dict(os.environ, {"DB_PATH": self.db_path}), patch(
+            "bitcoin_wallet.runner.cli.uvicorn.run",
+            side_effect=lambda *_, **__: bootstrap.append(
+                os.environ.get("DB_BOOTSTRAP_SCHEMA")
+            ),
+        ) as serve:
+            result = CliRunner().invoke(
+                cli, ["run", "--workers", "4", "--max-requests", "1000"]
+            )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(bootstrap, ["false"])
+        args, kwargs = serve.call_args
+        self.assertEqual(args, ("bitcoin_wallet.runner.setup:init_app",))
+        self.assertTrue(kwargs["factory"])
+        self.assertEqual(kwargs["workers"], 4)
+        self.assertEqual(kwargs["limit_max_requests"], 1000)
+        self.assertEqual(kwargs["limit_max_requests_jitter"], 100)
+        self.assertEqual(kwargs["timeout_graceful_shutdown"], 30)
+        with sqlite3.connect(self.db_path) as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        self.assertIn("transactions", tables)
+
+    def test_workers_migrate_every_shard_up_front(self) -> None:
+        catalog = ShardCatalog(os.path.join(self.tmp_dir.name, "catalog.db"))
+        shards = [catalog.shard_path(f"shard-{index}.db") for index in range(2)]
+        catalog.save(ShardMap.uniform(shards))
+        environment = {"DB_PATH": self.db_path, "SHARD_MAP": catalog.path}
+
+        with patch.dict(os.environ, environment), patch(
+            "bitcoin_wallet.runner.cli.uvicorn.run"
+        ):
+            result = CliRunner().invoke(cli, ["run", "--workers", "2"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        for shard in shards:
+            with sqlite3.connect(shard) as conn:
+                tables = {
+                    row[0] for row in conn.execute("SELECT name FROM sqlite_master")
+                }
+            self.assertIn("transfer_outbox", tables)
+        self.assertFalse(os.path.exists(self.db_path))
+
+    def test_max_requests_needs_several_workers(self) -> None:
+        with patch("bitcoin_wallet.runner.cli.uvicorn.run") as serve:
+            result = CliRunner().invoke(cli, ["run", "--max-requests", "1000"])
+        self.assertEqual(result.exit_code, 2)
+        serve.assert_not_called()
+
+
+class TestSlowQueriesReport(unittest.TestCase):
+    URL = "http://127.0.0.1:8000/admin/slow-queries"
+
+    def _invoke(self, report: dict[str, object], *args: str) -> str:
+        response = httpx.Response(
+            200, json=report, request=httpx.Request("GET", self.URL)
+        )
+        with patch("bitcoin_wallet.runner.cli.httpx.get", return_value=response):
+            result = CliRunner().invoke(cli, ["slow-queries", *args])
+        self.assertEqual(result.exit_code, 0, result.output)
+        return result.output
+
+    def test_prints_statements_with_plans_and_scans(self) -> None:
+        report = {
+            "enabled": True,
+            "threshold_ms": 100.0,
+            "queries": [
+                {
+                    "statement": "SELECT balance FROM wallets",
+                    "parameters": "",
+                    "calls": 3,
+                    "total_ms": 450.0,
+                    "max_ms": 200.0,
+                    "full_scan": True,
+                    "plan": ["SCAN wallets"],
+                },
+                {
+                    "statement": "SELECT mail FROM users WHERE id = ?",
+                    "parameters": "int",
+                    "calls": 1,
+                    "total_ms": 120.0,
+                    "max_ms": 120.0,
+                    "full_scan": False,
+                    "plan": ["SEARCH users USING INTEGER PRIMARY KEY (rowid=?)"],
+                },
+            ],
+        }
+
+        output = self._invoke(report)
+        scans_only = self._invoke(report, "--full-scans-only")
+
+        self.assertIn("2 statement(s) over 100 ms", output)
+        self.assertIn(
+            "     3 calls      450.0 ms total    200.0 ms max  FULL SCAN", output
+        )
+        self.assertIn("    SCAN wallets", output)
+        self.assertIn("  parameters: int", output)
+        self.assertIn("1 statement(s)", scans_only)
+        self.assertNotIn("users", scans_only)
+
+    def test_says_when_the_log_is_off(self) -> None:
+        output = self._invoke({"enabled": False, "queries": []})
+
+        self.assertIn("SLOW_QUERY_LOG_ENABLED=true", output)
+
+    def test_unreachable_server_fails(self) -> None:
+        with patch(
+            "bitcoin_wallet.runner.cli.httpx.get",
+            side_effect=httpx.ConnectError("refused"),
+        ):
+            result = CliRunner().invoke(cli, ["slow-queries"])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Could not fetch slow queries", result.output)
+
+
+class TestBenchmarkCommands(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.runner = CliRunner()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_run_times_every_case_and_compare_flags_regressions(self) -> None:
+        base = self._path("base.json")
+        result = self.runner.invoke(
+            cli,
+            [
+                "bench",
+                "run",
+                "--users=50",
+                "--transactions=500",
+                "--iterations=3",
+                f"--database={self._path('bench.db')}",
+                f"--output={base}",
+            ],
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+
+        with open(base, encoding="utf-8") as stream:
+            suite = SuiteResult.from_json(stream.read())
+        names = {case.name for case in suite.results}
+        self.assertIn("BtcTransactionRepository.make_transaction", names)
+        self.assertIn("POST /transactions", names)
+        self.assertEqual(sum(case.errors for case in suite.results), 0)
+
+        slower = SuiteResult(
+            suite.population,
+            suite.environment,
+            [replace(case, p50_ms=case.p50_ms * 2 + 1) for case in suite.results],
+        )
+        head = self._path("head.json")
+        with open(head, "w", encoding="utf-8") as stream:
+            stream.write(slower.to_json())
+
+        unchanged = self.runner.invoke(cli, ["bench", "compare", base, base])
+        regressed = self.runner.invoke(cli, ["bench", "compare", base, head])
+
+        self.assertEqual(unchanged.exit_code, 0, unchanged.output)
+        self.assertEqual(regressed.exit_code, 1)
+        self.assertIn("REGRESSION", regressed.output)
+
+    def test_stress_finds_no_violations_in_the_transfer_path(self) -> None:
+        result = self.runner.invoke(
+            cli,
+            [
+                "bench",
+                "stress",
+                "--wallets=6",
+                "--requests=120",
+                "--threads=6",
+                "--processes=1",
+            ],
+        )
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("120 requests", result.output)
+        self.assertIn("violations: none", result.output)
+
+    def test_stress_reports_a_ledger_that_does_not_add_up(self) -> None:
+        database = self._path("stress.db")
+        arguments = ["bench", "stress", "--requests=20", "--processes=1"]
+        first = self.runner.invoke(cli, [*arguments, f"--database={database}"])
+        self.assertEqual(first.exit_code, 0, first.output)
+        with sqlite3.connect(database) as conn:
+            conn.execute(
+                "INSERT INTO wallets (id, user_id, balance, minted) "
+                "VALUES (99, 1, -5, 0)"
+            )
+
+        second = self.runner.invoke(cli, [*arguments, f"--database={database}"])
+
+        self.assertEqual(second.exit_code, 1)
+        self.assertIn("wallet 99 has a negative balance of -5", second.output)
+        self.assertIn("balances plus fees differ from minted by -5", second.output)
+        self.assertIn("wallet 99 holds -5, its ledger says 0", second.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from itertools import count
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.core.entity.user import BtcUser
+from bitcoin_wallet.core.repository.sharded_repository import (
+    ShardedTransactionRepository,
+    ShardedUserRepository,
+    ShardedWalletRepository,
+)
+from bitcoin_wallet.core.shard.outbox import OutboxRelay
+from bitcoin_wallet.core.shard.shard_map import ShardCatalog, ShardMap, bucket_for_mail
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+from bitcoin_wallet.core.transfer.reconciliation import (
+    LedgerReconciler,
+    Reconciliation,
+)
+from bitcoin_wallet.tests.currencyconverter.stub_price_source import StubPriceSource
+
+
+def mail_on(shard_index: int, shards: int, taken: set[str]) -> str:
+    # A uniform map puts bucket b on shard b % shards.
+    for index in count():
+        mail = f"user{index}@gmail.com"
+        if bucket_for_mail(mail) % shards == shard_index and mail not in taken:
+            taken.add(mail)
+            return mail
+    raise AssertionError("unreachable")
+
+
+class TestOutboxRelay(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        catalog = ShardCatalog(os.path.join(self.tmp_dir.name, "catalog.db"))
+        shards = [catalog.shard_path(f"shard-{index}.db") for index in range(2)]
+        catalog.save(ShardMap.uniform(shards))
+        self.pools = ShardPools(catalog.load(), DatabaseSettings(db_path=""))
+        self.pools.create_schema()
+        self.shards = shards
+        self.users = ShardedUserRepository(self.pools)
+        self.wallets = ShardedWalletRepository(self.pools, StubPriceSource())
+        self.transactions = ShardedTransactionRepository(self.pools)
+        self.relay = OutboxRelay(self.pools)
+
+        taken: set[str] = set()
+        self.sender = self._user_with_wallet(mail_on(0, 2, taken))
+        self.neighbour = self._user_with_wallet(mail_on(0, 2, taken))
+        self.receiver = self._user_with_wallet(mail_on(1, 2, taken))
+
+    def tearDown(self) -> None:
+        self.pools.close()
+        self.tmp_dir.cleanup()
+
+    def _user_with_wallet(self, mail: str) -> tuple[AuthContext, int]:
+        owner = AuthContext(self.users.create(BtcUser(0, mail)), frozenset())
+        return owner, self.wallets.create_wallet(owner, BTC).wallet_id
+
+    def _balance(self, user: tuple[AuthContext, int]) -> int:
+        owner = self.users.load_auth_context(user[0].user_id)
+        wallet = self.wallets.retrieve_wallet_info(owner, user[1])
+        assert wallet is not None
+        return wallet.balance
+
+    def _pending(self, shard: str) -> int:
+        with self.pools[shard].connection() as conn:
+            return int(
+                conn.execute("SELECT COUNT(*) FROM transfer_outbox").fetchone()[0]
+            )
+
+    def _reconcile(self) -> Reconciliation:
+        return sum(
+            (LedgerReconciler(pool).reconcile() for _, pool in self.pools.items()),
+            Reconciliation(0, 0, 0),
+        )
+
+    def test_users_and_wallets_live_on_their_mail_shard(self) -> None:
+        self.assertEqual(self.pools.shard_map.shard_for(self.sender[1]), self.shards[0])
+        self.assertEqual(
+            self.pools.shard_map.shard_for(self.receiver[0].user_id), self.shards[1]
+        )
+        self.assertEqual(
+            self.users.read(self.receiver[0].user_id).id, self.receiver[0].user_id
+        )
+
+    def test_intra_shard_transfer_commits_in_place(self) -> None:
+        self.transactions.make_transaction(self.sender[1], self.neighbour[1], 1000)
+
+        self.assertEqual(self._pending(self.shards[0]), 0)
+        self.assertGreater(self._balance(self.neighbour), BTC)
+        self.assertTrue(self._reconcile().balanced)
+
+    def test_cross_shard_credit_waits_in_the_outbox(self) -> None:
+        transaction_id = self.transactions.make_transaction(
+            self.sender[1], self.receiver[1], 1000
+        )
+
+        self.assertEqual(self._pending(self.shards[0]), 1)
+        self.assertEqual(self._balance(self.sender), BTC - 1000)
+        self.assertEqual(self._balance(self.receiver), BTC)
+        result = self._reconcile()
+        self.assertGreater(result.in_flight, 0)
+        self.assertTrue(result.balanced)
+        assert transaction_id is not None
+        self.assertEqual(self.pools.shard_map.shard_for(transaction_id), self.shards[0])
+
+    def test_relay_credits_the_receiver_once(self) -> None:
+        self.transactions.make_transaction(self.sender[1], self.receiver[1], 1000)
+        with self.pools[self.shards[0]].connection() as conn:
+            pending = conn.execute(
+                "SELECT transaction_id FROM transfer_outbox"
+            ).fetchall()
+
+        self.assertEqual(self.relay.deliver_all(), 1)
+        credited = self._balance(self.receiver)
+        # A relay that crashed before clearing its outbox sends again.
+        with self.pools[self.shards[0]].connection() as conn:
+            conn.executemany(
+                "INSERT INTO transfer_outbox (transaction_id) VALUES (?)", pending
+            )
+        self.relay.deliver_all()
+
+        self.assertGreater(credited, BTC)
+        self.assertEqual(self._balance(self.receiver), credited)
+        self.assertEqual(self._pending(self.shards[0]), 0)
+        self.assertEqual(self._reconcile().in_flight, 0)
+        self.assertTrue(self._reconcile().balanced)
+        self.assertEqual(len(self.transactions.read_all()), 1)
+        self.assertEqual(
+            len(
+                self.transactions.get_user_transactions(
+                    self.users.load_auth_context(self.receiver[0].user_id)
+                )
+            ),
+            1,
+        )
+        for _, pool in self.pools.items():
+            self.assertEqual(LedgerReconciler(pool).drifted_wallets(), [])
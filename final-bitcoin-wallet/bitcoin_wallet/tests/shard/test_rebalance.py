@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.config.database_settings import DatabaseSettings
+from bitcoin_wallet.core.entity.user import BtcUser
+from bitcoin_wallet.core.exception.shard_not_splittable import (
+    ShardNotSplittableException,
+)
+from bitcoin_wallet.core.repository.sharded_repository import (
+    ShardedTransactionRepository,
+    ShardedUserRepository,
+    ShardedWalletRepository,
+)
+from bitcoin_wallet.core.shard.rebalance import ShardRebalancer
+from bitcoin_wallet.core.shard.shard_map import BUCKETS, ShardCatalog, ShardMap
+from bitcoin_wallet.core.shard.shard_pools import ShardPools
+from bitcoin_wallet.tests.currencyconverter.stub_price_source import StubPriceSource
+
+SETTINGS = DatabaseSettings(db_path="")
+
+
+class TestShardRebalancer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.catalog = ShardCatalog(os.path.join(self.tmp_dir.name, "catalog.db"))
+        self.source = self.catalog.shard_path("shard-00.db")
+        self.catalog.save(ShardMap.uniform([self.source]))
+        self.rebalancer = ShardRebalancer(self.catalog, SETTINGS)
+
+        pools = ShardPools(self.catalog.load(), SETTINGS)
+        pools.create_schema()
+        users = ShardedUserRepository(pools)
+        wallets = ShardedWalletRepository(pools, StubPriceSource())
+        transactions = ShardedTransactionRepository(pools)
+        self.wallet_ids = []
+        for index in range(12):
+            user_id = users.create(BtcUser(0, f"user{index}@gmail.com"))
+            self.wallet_ids.append(
+                wallets.create_wallet(users.load_auth_context(user_id), BTC).wallet_id
+            )
+        for index, wallet_id in enumerate(self.wallet_ids):
+            for step in (1, 5):
+                receiver = self.wallet_ids[(index + step) % len(self.wallet_ids)]
+                transactions.make_transaction(wallet_id, receiver, 10_000 + index)
+        pools.close()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_split_moves_half_the_buckets_and_keeps_the_ledger(self) -> None:
+        result = self.rebalancer.split()
+
+        shard_map = self.catalog.load()
+        self.assertEqual(result.source, self.source)
+        self.assertEqual(result.target, self.catalog.shard_path("shard-01.db"))
+        self.assertEqual(shard_map.buckets_on(result.target), result.buckets)
+        self.assertEqual(len(result.buckets), BUCKETS // 2)
+        loads = {load.shard: load for load in self.rebalancer.loads()}
+        self.assertEqual(loads[self.source].users + loads[result.target].users, 12)
+        self.assertEqual(
+            loads[self.source].transfers + loads[result.target].transfers, 24
+        )
+        self.assertGreater(loads[result.target].wallets, 0)
+        self.assertTrue(self.rebalancer.reconcile().balanced)
+        self.assertEqual(self.rebalancer.drifted_wallets(), [])
+
+    def test_routing_follows_the_new_map(self) -> None:
+        self.rebalancer.split()
+
+        pools = ShardPools(self.catalog.load(), SETTINGS)
+        transactions = ShardedTransactionRepository(pools)
+        for wallet_id in self.wallet_ids:
+            self.assertEqual(len(transactions.get_wallet_transactions(wallet_id)), 4)
+        for wallet_id in self.wallet_ids[1:]:
+            transactions.make_transaction(wallet_id, self.wallet_ids[0], 1000)
+        self.assertEqual(len(transactions.read_all()), 35)
+        pools.close()
+
+        self.assertTrue(self.rebalancer.reconcile().balanced)
+        self.assertEqual(self.rebalancer.drifted_wallets(), [])
+
+    def test_split_again_splits_the_busier_shard(self) -> None:
+        first = self.rebalancer.split()
+        second = self.rebalancer.split(first.target)
+
+        self.assertEqual(len(self.catalog.load().shards), 3)
+        self.assertEqual(second.target, self.catalog.shard_path("shard-02.db"))
+        self.assertTrue(self.rebalancer.reconcile().balanced)
+        self.assertEqual(self.rebalancer.drifted_wallets(), [])
+
+    def test_single_bucket_shard_cannot_split(self) -> None:
+        other = self.catalog.shard_path("shard-01.db")
+        self.catalog.save(self.catalog.load().move(range(1, BUCKETS), other))
+
+        with self.assertRaises(ShardNotSplittableException):
+            self.rebalancer.split(self.source)
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from bitcoin_wallet.core.exception.shard_map_missing import ShardMapMissingException
+from bitcoin_wallet.core.shard.shard_map import (
+    BUCKETS,
+    ShardCatalog,
+    ShardMap,
+    bucket_for_mail,
+    bucket_of,
+    bucket_range,
+)
+
+
+class TestShardMap(unittest.TestCase):
+    def test_ids_carry_their_bucket(self) -> None:
+        first, last = bucket_range(5)
+
+        self.assertEqual(bucket_of(first), 5)
+        self.assertEqual(bucket_of(last), 5)
+        self.assertEqual(bucket_of(last + 1), 6)
+        # Ids from a single-file database all sit in bucket 0.
+        self.assertEqual(bucket_of(123_456), 0)
+
+    def test_mail_bucket_is_stable(self) -> None:
+        bucket = bucket_for_mail("first@gmail.com")
+
+        self.assertEqual(bucket, bucket_for_mail("first@gmail.com"))
+        self.assertIn(bucket, range(BUCKETS))
+
+    def test_uniform_map_spreads_buckets_round_robin(self) -> None:
+        shard_map = ShardMap.uniform(["a.db", "b.db"])
+
+        self.assertEqual(shard_map.shards, ["a.db", "b.db"])
+        self.assertEqual(len(shard_map.buckets_on("a.db")), BUCKETS // 2)
+        self.assertEqual(shard_map.shard_for(bucket_range(3)[0]), "b.db")
+
+    def test_move_reassigns_only_the_given_buckets(self) -> None:
+        shard_map = ShardMap.uniform(["a.db"]).move([1, 2], "b.db")
+
+        self.assertEqual(shard_map.buckets_on("b.db"), [1, 2])
+        self.assertEqual(shard_map.shard_for_bucket(0), "a.db")
+
+
+class TestShardCatalog(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.catalog = ShardCatalog(os.path.join(self.tmp_dir.name, "catalog.db"))
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_round_trip_resolves_paths_next_to_the_catalog(self) -> None:
+        shards = [self.catalog.shard_path(name) for name in ("a.db", "b.db")]
+        self.catalog.save(ShardMap.uniform(shards))
+        self.catalog.save(self.catalog.load().move([0], shards[1]))
+
+        shard_map = self.catalog.load()
+
+        self.assertEqual(shard_map.shards, [shards[1], shards[0]])
+        self.assertEqual(
+            shard_map.shard_for_bucket(0), os.path.join(self.tmp_dir.name, "b.db")
+        )
+
+    def test_missing_catalog_is_reported(self) -> None:
+        self.assertFalse(self.catalog.exists())
+        with self.assertRaises(ShardMapMissingException):
+            self.catalog.load()
@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.dto.statistics_window import StatisticsWindow
+from bitcoin_wallet.core.exception.not_enough_balance import NotEnoughBalanceException
+from bitcoin_wallet.core.repository.statistics_repository import (
+    BtcStatisticsRepository,
+)
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.statistics.platform_statistics import (
+    Granularity,
+    PlatformStatistics,
+    StatisticsBucket,
+)
+from bitcoin_wallet.core.transfer.transfer_engine import TransferEngine
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+class TestPlatformStatistics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "statistics.db")
+        SetupForTests.create_tables(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO users (id, mail) VALUES (?, ?)",
+                [(1, "first@gmail.com"), (2, "second@gmail.com")],
+            )
+            conn.executemany(
+                "INSERT INTO wallets (id, user_id, balance) VALUES (?, ?, ?)",
+                [(1, 1, BTC), (2, 1, BTC), (3, 2, BTC)],
+            )
+        self.pool = ConnectionPool(self.db_path)
+        self.transactions = BtcTransactionRepository(pool=self.pool)
+        self.statistics = BtcStatisticsRepository(pool=self.pool)
+        self.now = 0.0
+        self.transactions.transfer_engine = TransferEngine(clock=lambda: self.now)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def test_fresh_database_starts_at_zero(self) -> None:
+        self.assertEqual(self.statistics.read(), PlatformStatistics(0, 0, 0))
+
+    def test_transfers_update_the_counters(self) -> None:
+        self.transactions.make_transaction(1, 2, BTC // 2)
+        self.transactions.make_transaction(1, 3, BTC // 4)
+
+        self.assertEqual(
+            self.statistics.read(),
+            PlatformStatistics(transactions=2, fees=375_000, volume=75_000_000),
+        )
+
+    def test_rejected_transfer_leaves_the_counters_alone(self) -> None:
+        self.transactions.make_transaction(1, 3, BTC // 2)
+        with self.assertRaises(NotEnoughBalanceException):
+            self.transactions.make_transaction(1, 3, BTC)
+
+        self.assertEqual(self.statistics.read().transactions, 1)
+
+    def test_rebuild_recomputes_the_counters_from_the_ledger(self) -> None:
+        self.transactions.make_transaction(1, 3, BTC // 2)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE platform_statistics SET transactions = 99, fees = 0")
+
+        rebuilt = self.statistics.rebuild()
+
+        self.assertEqual(
+            rebuilt,
+            PlatformStatistics(transactions=1, fees=750_000, volume=50_000_000),
+        )
+        self.assertEqual(self.statistics.read(), rebuilt)
+
+    def _transfer_at(self, moment: int, to_wallet_id: int, amount: int) -> None:
+        self.now = moment
+        self.transactions.make_transaction(1, to_wallet_id, amount)
+
+    def test_transfers_are_rolled_up_by_hour_and_day(self) -> None:
+        self._transfer_at(DAY + 10, 3, 10_000)
+        self._transfer_at(DAY + HOUR - 1, 2, 20_000)
+        self._transfer_at(DAY + 5 * HOUR, 3, 40_000)
+        self._transfer_at(3 * DAY, 3, 80_000)
+
+        hourly = self.statistics.read_buckets(
+            StatisticsWindow(DAY, 2 * DAY, Granularity.HOUR)
+        )
+        daily = self.statistics.read_buckets(
+            StatisticsWindow(0, 4 * DAY, Granularity.DAY)
+        )
+
+        self.assertEqual(
+            hourly,
+            [
+                StatisticsBucket(DAY, 2, 150, 30_000),
+                StatisticsBucket(DAY + 5 * HOUR, 1, 600, 40_000),
+            ],
+        )
+        self.assertEqual(
+            daily,
+            [
+                StatisticsBucket(DAY, 3, 750, 70_000),
+                StatisticsBucket(3 * DAY, 1, 1_200, 80_000),
+            ],
+        )
+
+    def test_window_snaps_to_whole_buckets(self) -> None:
+        self._transfer_at(DAY + 10, 3, 10_000)
+        self._transfer_at(2 * DAY + HOUR, 3, 10_000)
+
+        buckets = self.statistics.read_buckets(
+            StatisticsWindow(DAY + HOUR, 2 * DAY + 1, Granularity.DAY)
+        )
+
+        self.assertEqual([bucket.start for bucket in buckets], [DAY, 2 * DAY])
+
+    def test_rebuild_recomputes_the_rollups(self) -> None:
+        self._transfer_at(DAY + 10, 3, 10_000)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM statistics_rollups")
+            conn.execute(
+                "INSERT INTO transactions (from_wallet_id, to_wallet_id, "
+                "amount_transferred, lost_amount) VALUES (2, 1, 5, 0)"
+            )
+
+        self.statistics.rebuild()
+
+        self.assertEqual(
+            self.statistics.read_buckets(StatisticsWindow(0, DAY * 2, Granularity.DAY)),
+            [StatisticsBucket(DAY, 1, 150, 10_000)],
+        )
+        self.assertEqual(self.statistics.read().transactions, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
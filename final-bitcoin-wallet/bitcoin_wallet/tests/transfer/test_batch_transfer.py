@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.exception.not_enough_balance import NotEnoughBalanceException
+from bitcoin_wallet.core.exception.same_transfer_wallets import (
+    SameTransferWalletsException,
+)
+from bitcoin_wallet.core.exception.wallet_not_found import WalletNotFoundException
+from bitcoin_wallet.core.repository.statistics_repository import (
+    BtcStatisticsRepository,
+)
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.transfer.batch_transfer import BatchMode, TransferLeg
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+
+class TestBatchTransfer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "batch.db")
+        SetupForTests.create_tables(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO users (id, mail) VALUES (?, ?)",
+                [(1, "first@gmail.com"), (2, "second@gmail.com")],
+            )
+            conn.executemany(
+                "INSERT INTO wallets (id, user_id, balance, minted) "
+                "VALUES (?, ?, ?, ?)",
+                [(1, 1, BTC, BTC), (2, 1, BTC, BTC), (3, 2, BTC, BTC)],
+            )
+        self.pool = ConnectionPool(self.db_path)
+        self.repository = BtcTransactionRepository(pool=self.pool)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def _balances(self) -> dict[int, int]:
+        with sqlite3.connect(self.db_path) as conn:
+            return dict(conn.execute("SELECT id, balance FROM wallets").fetchall())
+
+    def test_all_legs_commit_together(self) -> None:
+        self.repository.make_transaction(3, 1, BTC // 10)
+        legs = [
+            TransferLeg(2, BTC // 10),
+            TransferLeg(3, BTC // 5),
+            TransferLeg(3, BTC // 10),
+        ]
+
+        results = self.repository.make_batch_transaction(
+            1, legs, BatchMode.ALL_OR_NOTHING
+        )
+
+        self.assertEqual([result.transaction_id for result in results], [2, 3, 4])
+        self.assertEqual(
+            [result.lost_amount for result in results], [0, 300_000, 150_000]
+        )
+        self.assertEqual(
+            self._balances(),
+            {
+                1: BTC + 98_500_000 // 10 - 40_000_000,
+                2: BTC + BTC // 10,
+                3: BTC - BTC // 10 + 30_000_000 - 450_000,
+            },
+        )
+        statistics = BtcStatisticsRepository(pool=self.pool).read()
+        self.assertEqual(statistics.transactions, 4)
+        self.assertEqual(statistics.fees, 150_000 + 450_000)
+
+    def test_one_bad_leg_rejects_the_whole_batch(self) -> None:
+        legs = [TransferLeg(2, BTC // 10), TransferLeg(42, BTC // 10)]
+
+        with self.assertRaises(WalletNotFoundException):
+            self.repository.make_batch_transaction(1, legs, BatchMode.ALL_OR_NOTHING)
+
+        self.assertEqual(self._balances(), {1: BTC, 2: BTC, 3: BTC})
+        self.assertEqual(self.repository.read_all(), [])
+
+    def test_total_is_checked_against_the_source_balance(self) -> None:
+        legs = [TransferLeg(2, BTC // 2), TransferLeg(3, BTC // 2 + 1)]
+
+        with self.assertRaises(NotEnoughBalanceException):
+            self.repository.make_batch_transaction(1, legs, BatchMode.ALL_OR_NOTHING)
+
+        self.assertEqual(self._balances()[1], BTC)
+
+    def test_best_effort_applies_the_legs_that_fit(self) -> None:
+        legs = [
+            TransferLeg(2, BTC // 2),
+            TransferLeg(1, BTC // 10),
+            TransferLeg(3, BTC),
+            TransferLeg(3, BTC // 2),
+        ]
+
+        results = self.repository.make_batch_transaction(1, legs, BatchMode.BEST_EFFORT)
+
+        self.assertEqual(
+            [result.transaction_id for result in results], [1, None, None, 2]
+        )
+        self.assertIsInstance(results[1].error, SameTransferWalletsException)
+        self.assertIsInstance(results[2].error, NotEnoughBalanceException)
+        self.assertEqual(self._balances()[1], 0)
+
+    def test_unknown_source_wallet_fails_in_every_mode(self) -> None:
+        for mode in BatchMode:
+            with self.subTest(mode=mode):
+                with self.assertRaises(WalletNotFoundException):
+                    self.repository.make_batch_transaction(
+                        42, [TransferLeg(1, 1)], mode
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.exception.not_enough_balance import NotEnoughBalanceException
+from bitcoin_wallet.core.exception.wallet_not_found import WalletNotFoundException
+from bitcoin_wallet.core.transfer.group_commit import GroupCommitWriter
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+
+class TestGroupCommitWriter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "group_commit.db")
+        SetupForTests.create_tables(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO users (id, mail) VALUES (?, ?)",
+                [(1, "first@gmail.com"), (2, "second@gmail.com")],
+            )
+            conn.executemany(
+                "INSERT INTO wallets (id, user_id, balance) VALUES (?, ?, ?)",
+                [(1, 1, BTC), (2, 1, BTC), (3, 2, BTC)],
+            )
+        self.pool = ConnectionPool(self.db_path, max_size=2)
+        self.writer = GroupCommitWriter(self.pool, batch_size=16, linger=0.05)
+        self.writer.start()
+
+    def tearDown(self) -> None:
+        self.writer.stop()
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def _balances(self) -> dict[int, int]:
+        with sqlite3.connect(self.db_path) as conn:
+            return dict(conn.execute("SELECT id, balance FROM wallets").fetchall())
+
+    def test_queued_transfers_commit_as_one_batch(self) -> None:
+        futures = [self.writer.submit(1, 2, BTC // 10) for _ in range(5)]
+
+        self.assertEqual(
+            [future.result(timeout=5) for future in futures], [1, 2, 3, 4, 5]
+        )
+        metrics = self.writer.metrics()
+        self.assertEqual((metrics.batches, metrics.transfers), (1, 5))
+        self.assertEqual(self._balances()[2], BTC * 3 // 2)
+
+    def test_rejected_transfer_does_not_affect_its_batch(self) -> None:
+        first = self.writer.submit(1, 3, 60_000_000)
+        overdrawn = self.writer.submit(1, 3, 60_000_000)
+        missing = self.writer.submit(1, 42, BTC // 10)
+        last = self.writer.submit(2, 1, BTC // 10)
+
+        self.assertEqual(first.result(timeout=5), 1)
+        with self.assertRaises(NotEnoughBalanceException):
+            overdrawn.result(timeout=5)
+        with self.assertRaises(WalletNotFoundException):
+            missing.result(timeout=5)
+        self.assertEqual(last.result(timeout=5), 2)
+        balances = self._balances()
+        self.assertEqual(balances[1], BTC // 2)
+        self.assertEqual(balances[3], BTC + 60_000_000 - 900_000)
+
+    def test_batches_are_capped_at_batch_size(self) -> None:
+        futures = [self.writer.submit(1, 2, BTC // 100) for _ in range(40)]
+        for future in futures:
+            future.result(timeout=5)
+
+        metrics = self.writer.metrics()
+        self.assertEqual(metrics.transfers, 40)
+        self.assertLessEqual(metrics.largest_batch, 16)
+        self.assertGreaterEqual(metrics.batches, 3)
+
+    def test_async_callers_await_their_transaction_id(self) -> None:
+        async def transfer_all() -> list[int]:
+            return list(
+                await asyncio.gather(
+                    *(self.writer.transfer(1, 2, BTC // 10) for _ in range(3))
+                )
+            )
+
+        self.assertEqual(sorted(asyncio.run(transfer_all())), [1, 2, 3])
+
+    def test_stop_commits_already_queued_transfers(self) -> None:
+        future = self.writer.submit(1, 2, BTC // 10)
+        self.writer.stop()
+
+        self.assertEqual(future.result(timeout=0), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.database.executor import DatabaseExecutor
+from bitcoin_wallet.core.exception.idempotency_key_reused import (
+    IdempotencyKeyReusedException,
+)
+from bitcoin_wallet.core.exception.not_enough_balance import NotEnoughBalanceException
+from bitcoin_wallet.core.repository.async_repository import AsyncTransactionRepository
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.transfer.group_commit import GroupCommitWriter
+from bitcoin_wallet.core.transfer.idempotency import (
+    IdempotencyCache,
+    IdempotencyKey,
+    IdempotencySweeper,
+    IdempotentResult,
+)
+from bitcoin_wallet.core.transfer.transfer_engine import TransferEngine
+from bitcoin_wallet.tests.currencyconverter.stub_price_source import FakeClock
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+KEY = IdempotencyKey(1, "payout-42")
+
+
+class TestIdempotentTransfers(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "idempotency.db")
+        SetupForTests.create_tables(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO users (id, mail) VALUES (?, ?)",
+                [(1, "first@gmail.com"), (2, "second@gmail.com")],
+            )
+            conn.executemany(
+                "INSERT INTO wallets (id, user_id, balance) VALUES (?, ?, ?)",
+                [(1, 1, BTC), (2, 2, BTC)],
+            )
+        self.pool = ConnectionPool(self.db_path)
+        self.repository = BtcTransactionRepository(pool=self.pool)
+        self.clock = FakeClock()
+        self.clock.now = 1_000.0
+        self.repository.transfer_engine = TransferEngine(clock=self.clock)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def _count(self, table: str) -> int:
+        with sqlite3.connect(self.db_path) as conn:
+            return int(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0])
+
+    def test_retry_returns_the_stored_result_without_moving_funds(self) -> None:
+        first = self.repository.make_transaction(1, 2, BTC // 10, KEY)
+        retry = self.repository.make_transaction(1, 2, BTC // 10, KEY)
+
+        self.assertEqual(first, retry)
+        self.assertEqual(self._count("transactions"), 1)
+        self.assertEqual(self._count("idempotency_keys"), 1)
+        self.assertEqual(self.repository.make_transaction(1, 2, BTC // 10), 2)
+
+    def test_expired_key_that_was_not_swept_starts_a_fresh_transfer(self) -> None:
+        self.repository.transfer_engine = TransferEngine(
+            clock=self.clock, idempotency_ttl=60.0
+        )
+        first = self.repository.make_transaction(1, 2, BTC // 10, KEY)
+        self.clock.now += 61.0
+
+        second = self.repository.make_transaction(1, 2, BTC // 5, KEY)
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(self._count("transactions"), 2)
+        self.assertEqual(self._count("idempotency_keys"), 1)
+        self.assertEqual(self.repository.make_transaction(1, 2, BTC // 5, KEY), second)
+
+    def test_key_reused_for_another_transfer_is_rejected(self) -> None:
+        self.repository.make_transaction(1, 2, BTC // 10, KEY)
+
+        with self.assertRaises(IdempotencyKeyReusedException):
+            self.repository.make_transaction(1, 2, BTC // 5, KEY)
+        self.assertEqual(
+            self.repository.make_transaction(
+                1, 2, BTC // 10, IdempotencyKey(2, KEY.key)
+            ),
+            2,
+        )
+
+    def test_failed_transfer_stores_no_result(self) -> None:
+        with self.assertRaises(NotEnoughBalanceException):
+            self.repository.make_transaction(1, 2, 2 * BTC, KEY)
+
+        self.assertEqual(self._count("idempotency_keys"), 0)
+        self.assertEqual(self.repository.make_transaction(1, 2, BTC // 2, KEY), 1)
+
+    def test_duplicates_within_one_group_commit_batch_apply_once(self) -> None:
+        writer = GroupCommitWriter(self.pool, batch_size=8, linger=0.05)
+        writer.start()
+        futures = [writer.submit(1, 2, BTC // 10, KEY) for _ in range(3)]
+        writer.stop()
+
+        self.assertEqual({future.result(timeout=5) for future in futures}, {1})
+        self.assertEqual(self._count("transactions"), 1)
+
+    def test_sweeper_deletes_expired_keys_in_bounded_batches(self) -> None:
+        for index in range(5):
+            self.clock.now = 1_000.0 + index
+            key = IdempotencyKey(1, f"key-{index}")
+            self.repository.make_transaction(1, 2, 1000, key)
+
+        executor = DatabaseExecutor(readers=1)
+        transactions = AsyncTransactionRepository(self.repository, executor)
+        calls: list[int] = []
+
+        async def sweep(before: int, limit: int) -> int:
+            deleted = await transactions.sweep_idempotency_keys(before, limit)
+            calls.append(deleted)
+            return deleted
+
+        sweeper = IdempotencySweeper(
+            sweep, ttl=100.0, batch_size=2, max_batches=10, clock=lambda: 1_104.5
+        )
+        removed = asyncio.run(sweeper.sweep_once())
+        executor.shutdown()
+
+        self.assertEqual(removed, 4)
+        self.assertEqual(calls, [2, 2, 0])
+        self.assertEqual(self._count("idempotency_keys"), 1)
+
+
+class TestIdempotencyCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.cache = IdempotencyCache(max_entries=2, ttl=10.0, clock=self.clock)
+
+    def test_cached_result_is_replayed_until_it_expires(self) -> None:
+        result = IdempotentResult(KEY, 1, 2, 100, 7)
+        self.cache.put(result)
+
+        self.assertEqual(self.cache.get(KEY), result)
+        self.assertEqual(result.replay(1, 2, 100), 7)
+        self.clock.now = 10.0
+        self.assertIsNone(self.cache.get(KEY))
+        metrics = self.cache.metrics()
+        self.assertEqual((metrics.hits, metrics.misses), (1, 1))
+
+    def test_least_recently_used_result_is_evicted(self) -> None:
+        for index in range(3):
+            self.cache.put(IdempotentResult(IdempotencyKey(1, str(index)), 1, 2, 1, 1))
+
+        self.assertIsNone(self.cache.get(IdempotencyKey(1, "0")))
+        self.assertEqual(self.cache.metrics().evictions, 1)
+
+    def test_async_repository_serves_retries_from_the_cache(self) -> None:
+        repository = MagicMock()
+        executor = DatabaseExecutor(readers=1)
+        transactions = AsyncTransactionRepository(
+            repository, executor, idempotency_cache=self.cache
+        )
+        self.cache.put(IdempotentResult(KEY, 1, 2, 100, 7))
+
+        self.assertEqual(asyncio.run(transactions.make_transaction(1, 2, 100, KEY)), 7)
+        with self.assertRaises(IdempotencyKeyReusedException):
+            asyncio.run(transactions.make_transaction(1, 2, 101, KEY))
+        executor.shutdown()
+        repository.make_transaction.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
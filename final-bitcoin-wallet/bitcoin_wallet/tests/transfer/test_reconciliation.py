@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.dto.auth_context import AuthContext
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.core.repository.wallet_repository import BtcWalletRepository
+from bitcoin_wallet.core.transfer.reconciliation import (
+    LedgerReconciler,
+    WalletDrift,
+)
+from bitcoin_wallet.tests.currencyconverter.stub_price_source import StubPriceSource
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+
+class TestLedgerReconciler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "reconcile.db")
+        SetupForTests.create_tables(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO users (id, mail) VALUES (?, ?)",
+                [(1, "first@gmail.com"), (2, "second@gmail.com")],
+            )
+        self.pool = ConnectionPool(self.db_path)
+        self.reconciler = LedgerReconciler(self.pool)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def test_fees_and_balances_add_up_to_minted_supply(self) -> None:
+        wallets = BtcWalletRepository(pool=self.pool, converter=StubPriceSource())
+        first = wallets.create_wallet(AuthContext(1, frozenset()), BTC).wallet_id
+        second = wallets.create_wallet(AuthContext(2, frozenset()), 2 * BTC).wallet_id
+        transactions = BtcTransactionRepository(pool=self.pool)
+        for amount in (1, 33, 34, 12_345_678):
+            transactions.make_transaction(first, second, amount)
+            transactions.make_transaction(second, first, amount)
+
+        result = self.reconciler.reconcile()
+
+        self.assertEqual(result.minted, 3 * BTC)
+        self.assertGreater(result.fees, 0)
+        self.assertTrue(result.balanced)
+
+    def test_drift_is_reported(self) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO wallets (user_id, balance, minted) VALUES (1, ?, ?)",
+                (BTC + 1, BTC),
+            )
+
+        self.assertFalse(self.reconciler.reconcile().balanced)
+
+    def test_wallets_out_of_step_with_the_ledger_are_listed(self) -> None:
+        wallets = BtcWalletRepository(pool=self.pool, converter=StubPriceSource())
+        first = wallets.create_wallet(AuthContext(1, frozenset()), BTC).wallet_id
+        second = wallets.create_wallet(AuthContext(2, frozenset()), BTC).wallet_id
+        BtcTransactionRepository(pool=self.pool).make_transaction(first, second, 1000)
+        self.assertEqual(self.reconciler.drifted_wallets(), [])
+
+        # A lost update: the credit is overwritten, but the ledger row stays.
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE wallets SET balance = ? WHERE id = ?", (BTC, second))
+
+        self.assertEqual(
+            self.reconciler.drifted_wallets(),
+            [WalletDrift(second, BTC, BTC + 1000 - 15)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
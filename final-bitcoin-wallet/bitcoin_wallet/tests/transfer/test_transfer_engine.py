@@ -0,0 +1,97 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from bitcoin_wallet.core.config.constants import SATOSHIS_PER_BTC as BTC
+from bitcoin_wallet.core.database.connection_pool import ConnectionPool
+from bitcoin_wallet.core.exception.invalid_transfer_amount import (
+    InvalidTransferAmountException,
+)
+from bitcoin_wallet.core.exception.not_enough_balance import NotEnoughBalanceException
+from bitcoin_wallet.core.exception.same_transfer_wallets import (
+    SameTransferWalletsException,
+)
+from bitcoin_wallet.core.exception.wallet_not_found import WalletNotFoundException
+from bitcoin_wallet.core.repository.transaction_repository import (
+    BtcTransactionRepository,
+)
+from bitcoin_wallet.tests.repository.setup import SetupForTests
+
+
+class TestTransferEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "transfer.db")
+        SetupForTests.create_tables(self.db_path)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO users (id, mail) VALUES (?, ?)",
+                [(1, "first@gmail.com"), (2, "second@gmail.com")],
+            )
+            conn.executemany(
+                "INSERT INTO wallets (id, user_id, balance) VALUES (?, ?, ?)",
+                [(1, 1, BTC), (2, 1, BTC), (3, 2, BTC)],
+            )
+        self.pool = ConnectionPool(self.db_path, max_size=16, timeout=10.0)
+        self.repository = BtcTransactionRepository(pool=self.pool)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def _balances(self) -> dict[int, int]:
+        with sqlite3.connect(self.db_path) as conn:
+            return dict(conn.execute("SELECT id, balance FROM wallets").fetchall())
+
+    def test_transfer_between_own_wallets_is_free(self) -> None:
+        transaction_id = self.repository.make_transaction(1, 2, BTC // 2)
+
+        self.assertEqual(transaction_id, 1)
+        self.assertEqual(self._balances(), {1: BTC // 2, 2: BTC * 3 // 2, 3: BTC})
+        self.assertEqual(self.repository.read_all()[0].lost_amount, 0)
+
+    def test_transfer_to_foreign_wallet_takes_fee(self) -> None:
+        self.repository.make_transaction(1, 3, 50_000_000)
+
+        balances = self._balances()
+        self.assertEqual(balances[1], 50_000_000)
+        self.assertEqual(balances[3], BTC + 49_250_000)
+        self.assertEqual(self.repository.read_all()[0].lost_amount, 750_000)
+
+    def test_insufficient_balance_changes_nothing(self) -> None:
+        with self.assertRaises(NotEnoughBalanceException):
+            self.repository.make_transaction(1, 3, BTC + 1)
+
+        self.assertEqual(self._balances(), {1: BTC, 2: BTC, 3: BTC})
+        self.assertEqual(self.repository.read_all(), [])
+
+    def test_invalid_transfers_are_rejected(self) -> None:
+        with self.assertRaises(SameTransferWalletsException):
+            self.repository.make_transaction(1, 1, BTC)
+        with self.assertRaises(InvalidTransferAmountException):
+            self.repository.make_transaction(1, 3, -BTC)
+        with self.assertRaises(WalletNotFoundException):
+            self.repository.make_transaction(1, 42, BTC)
+
+    def test_concurrent_transfers_cannot_double_spend(self) -> None:
+        def transfer(_: int) -> bool:
+            try:
+                self.repository.make_transaction(1, 3, 30_000_000)
+                return True
+            except NotEnoughBalanceException:
+                return False
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            succeeded = sum(executor.map(transfer, range(32)))
+
+        balances = self._balances()
+        self.assertEqual(succeeded, 3)
+        self.assertEqual(len(self.repository.read_all()), 3)
+        self.assertEqual(balances[1], 10_000_000)
+        self.assertEqual(balances[3], BTC + 3 * (30_000_000 - 450_000))
+
+
+if __name__ == "__main__":
+    unittest.main()
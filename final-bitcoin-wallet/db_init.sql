@@ -1,25 +1,71 @@
-PRAGMA foreign_keys = ON;
-drop table if exists users;
-create table users(
+create table if not exists users(
     id INTEGER PRIMARY KEY,
     mail TEXT,
-    first_wallet_id INTEGER DEFAULT 0,
-    second_wallet_id INTEGER DEFAULT 0,
-    third_wallet_id INTEGER DEFAULT 0
+    wallets_generation INTEGER NOT NULL DEFAULT 0
 );
 
-drop table if exists wallets;
-create table wallets(
+create table if not exists wallets(
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER REFERENCES users(id),
-    balance REAL DEFAULT 1
+    balance INTEGER NOT NULL DEFAULT 100000000,
+    minted INTEGER NOT NULL DEFAULT 0
 );
 
-drop table if exists transactions;
-create table transactions(
+create table if not exists user_wallets(
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    wallet_id INTEGER NOT NULL REFERENCES wallets(id),
+    PRIMARY KEY (user_id, wallet_id)
+) WITHOUT ROWID;
+
+create table if not exists transactions(
     id INTEGER PRIMARY KEY,
     from_wallet_id INTEGER,
     to_wallet_id INTEGER,
-    amount_transferred REAL DEFAULT 0.0,
-    lost_amount REAL DEFAULT 0.0
+    amount_transferred INTEGER NOT NULL DEFAULT 0,
+    lost_amount INTEGER NOT NULL DEFAULT 0,
+    created_at INTEGER
+);
+
+create table if not exists platform_statistics(
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    transactions INTEGER NOT NULL DEFAULT 0,
+    fees INTEGER NOT NULL DEFAULT 0,
+    volume INTEGER NOT NULL DEFAULT 0
 );
+insert or ignore into platform_statistics (id) values (1);
+
+create table if not exists statistics_rollups(
+    bucket_start INTEGER PRIMARY KEY,
+    transactions INTEGER NOT NULL DEFAULT 0,
+    fees INTEGER NOT NULL DEFAULT 0,
+    volume INTEGER NOT NULL DEFAULT 0
+);
+
+create table if not exists idempotency_keys(
+    user_id INTEGER NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    from_wallet_id INTEGER NOT NULL,
+    to_wallet_id INTEGER NOT NULL,
+    amount_transferred INTEGER NOT NULL,
+    transaction_id INTEGER NOT NULL,
+    created_at INTEGER NOT NULL,
+    PRIMARY KEY (user_id, idempotency_key)
+) WITHOUT ROWID;
+
+create table if not exists transfer_outbox(
+    transaction_id INTEGER PRIMARY KEY
+);
+
+create table if not exists transfer_inbox(
+    transaction_id INTEGER PRIMARY KEY
+);
+
+create index if not exists idx_transactions_from_wallet
+    on transactions(from_wallet_id, id);
+create index if not exists idx_transactions_to_wallet
+    on transactions(to_wallet_id, id);
+create index if not exists idx_wallets_user on wallets(user_id);
+create unique index if not exists idx_user_wallets_wallet on user_wallets(wallet_id);
+create unique index if not exists idx_users_mail on users(mail);
+create index if not exists idx_idempotency_keys_created
+    on idempotency_keys(created_at);